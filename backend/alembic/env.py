@@ -14,7 +14,7 @@ from app.core.config import settings
 from app.core.database import Base
 
 # Import all models to ensure they are registered with SQLAlchemy
-from app.models import user, project, task, file_operation, task_step, agent_model, system_metrics
+from app.models import user, project, project_budget_event, task, file_operation, task_step, agent_model, system_metrics, api_key, archived_task, deletion_job, file_snapshot, task_model_usage, environment_profile
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
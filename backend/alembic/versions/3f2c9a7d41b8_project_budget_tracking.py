@@ -0,0 +1,77 @@
+"""Project budget tracking counters and threshold events
+
+Revision ID: 3f2c9a7d41b8
+Revises: 60a949486b6e
+Create Date: 2026-10-19 09:12:40.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2c9a7d41b8'
+down_revision: Union[str, None] = '60a949486b6e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('projects', sa.Column('spent_usd', sa.DECIMAL(precision=15, scale=6), server_default='0', nullable=False))
+    op.add_column('projects', sa.Column('spent_tokens', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('projects', sa.Column('budget_alert_level', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('projects', sa.Column('first_spend_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('projects', sa.Column('last_spend_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_table('project_budget_events',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('project_id', sa.UUID(), nullable=False),
+    sa.Column('threshold', sa.Integer(), nullable=False),
+    sa.Column('spent_usd', sa.DECIMAL(precision=15, scale=6), nullable=False),
+    sa.Column('budget', sa.DECIMAL(precision=15, scale=2), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_project_budget_events_project_id'), 'project_budget_events', ['project_id'], unique=False)
+
+    # Backfill the running counters from existing tasks. The alert level is
+    # seeded without emitting events so history doesn't produce a burst of alerts.
+    op.execute("""
+        UPDATE projects AS p
+        SET spent_usd = s.cost,
+            spent_tokens = s.tokens,
+            first_spend_at = s.first_spend_at,
+            last_spend_at = s.last_spend_at
+        FROM (
+            SELECT project_id,
+                   COALESCE(SUM(cost_usd), 0) AS cost,
+                   COALESCE(SUM(input_tokens + output_tokens), 0) AS tokens,
+                   MIN(created_at) AS first_spend_at,
+                   MAX(updated_at) AS last_spend_at
+            FROM tasks
+            GROUP BY project_id
+        ) AS s
+        WHERE p.id = s.project_id
+    """)
+    op.execute("""
+        UPDATE projects
+        SET budget_alert_level = CASE
+            WHEN spent_usd >= budget THEN 100
+            WHEN spent_usd >= budget * 0.8 THEN 80
+            WHEN spent_usd >= budget * 0.5 THEN 50
+            ELSE 0
+        END
+        WHERE budget > 0
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_project_budget_events_project_id'), table_name='project_budget_events')
+    op.drop_table('project_budget_events')
+    op.drop_column('projects', 'last_spend_at')
+    op.drop_column('projects', 'first_spend_at')
+    op.drop_column('projects', 'budget_alert_level')
+    op.drop_column('projects', 'spent_tokens')
+    op.drop_column('projects', 'spent_usd')
@@ -0,0 +1,26 @@
+"""Add users.token_version for token revocation
+
+Revision ID: 8d41e6b2c0f7
+Revises: 3f2c9a7d41b8
+Create Date: 2026-10-19 10:02:17.542960
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41e6b2c0f7'
+down_revision: Union[str, None] = '3f2c9a7d41b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,30 @@
+"""Nested task steps: task_steps.parent_step_id
+
+Revision ID: a4d17f3b9e60
+Revises: f93d0a6c5e12
+Create Date: 2026-10-19 16:02:44.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d17f3b9e60'
+down_revision: Union[str, None] = 'f93d0a6c5e12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nullable without a default: no table rewrite, existing steps become roots
+    op.add_column('task_steps', sa.Column('parent_step_id', sa.UUID(), nullable=True))
+    # Serves the recursive step tree query (children of a step within a task)
+    op.create_index('ix_task_steps_task_id_parent_step_id', 'task_steps', ['task_id', 'parent_step_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_steps_task_id_parent_step_id', table_name='task_steps')
+    op.drop_column('task_steps', 'parent_step_id')
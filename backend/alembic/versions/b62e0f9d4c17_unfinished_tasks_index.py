@@ -0,0 +1,32 @@
+"""Partial index on unfinished tasks for the stale task sweeper
+
+Revision ID: b62e0f9d4c17
+Revises: d81c5a2f7b39
+Create Date: 2026-10-19 18:21:07.503912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b62e0f9d4c17'
+down_revision: Union[str, None] = 'd81c5a2f7b39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Only running/pending tasks are indexed, so the index (and the sweep that
+    # scans it) stays as small as the number of unfinished tasks
+    op.create_index(
+        'ix_tasks_unfinished_updated_at', 'tasks', ['updated_at'],
+        postgresql_where=sa.text("status IN ('running', 'pending')"),
+        sqlite_where=sa.text("status IN ('running', 'pending')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_unfinished_updated_at', table_name='tasks')
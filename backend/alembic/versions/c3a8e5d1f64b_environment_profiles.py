@@ -0,0 +1,54 @@
+"""Interned environment_info: environment_profiles and tasks.environment_profile_id
+
+Revision ID: c3a8e5d1f64b
+Revises: e4f19a7c2d58
+Create Date: 2026-10-19 21:12:47.530918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a8e5d1f64b'
+down_revision: Union[str, None] = 'e4f19a7c2d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('environment_profiles',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('environment_info', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('content_hash')
+    )
+    # On the partitioned parent, so every partition gets the column
+    op.add_column('tasks', sa.Column('environment_profile_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'tasks_environment_profile_id_fkey', 'tasks', 'environment_profiles', ['environment_profile_id'], ['id']
+    )
+    op.add_column('archived_tasks', sa.Column('environment_profile_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'archived_tasks_environment_profile_id_fkey', 'archived_tasks', 'environment_profiles',
+        ['environment_profile_id'], ['id']
+    )
+    # Existing tasks: python -m app.services.environments backfill
+
+
+def downgrade() -> None:
+    # Put the blobs back on the tasks that only reference a profile
+    op.execute(
+        "UPDATE tasks SET environment_info = environment_profiles.environment_info "
+        "FROM environment_profiles WHERE tasks.environment_profile_id = environment_profiles.id"
+    )
+    op.drop_constraint('archived_tasks_environment_profile_id_fkey', 'archived_tasks', type_='foreignkey')
+    op.drop_column('archived_tasks', 'environment_profile_id')
+    op.drop_constraint('tasks_environment_profile_id_fkey', 'tasks', type_='foreignkey')
+    op.drop_column('tasks', 'environment_profile_id')
+    op.drop_table('environment_profiles')
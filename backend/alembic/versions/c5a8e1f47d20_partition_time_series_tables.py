@@ -0,0 +1,123 @@
+"""Partition tasks, task_steps and file_operations monthly on created_at
+
+Revision ID: c5a8e1f47d20
+Revises: b7e5d2a9f316
+Create Date: 2026-10-19 12:41:52.370614
+
+PostgreSQL only; a no-op elsewhere. Partitioned tables need the partition key
+in every unique constraint, so:
+
+* primary keys become (id, created_at); ids are still globally unique UUIDs,
+* tasks.session_id is indexed but no longer unique at the database level,
+* task_steps loses uq_task_step_number (task_id, step_number), keeping a
+  plain index on the same columns,
+* task_steps/file_operations can't reference tasks(id) with a foreign key
+  any more; an AFTER DELETE trigger on tasks removes their rows instead.
+
+The dropped unique constraints are enforced by the API instead: session ids
+and step numbers are checked and assigned under a transaction-scoped
+advisory lock (app.core.partitioning.advisory_xact_lock). The models keep
+declaring them, so non-partitioned databases (SQLite) still enforce them.
+
+Existing rows are copied into the new layout, so run this during a
+maintenance window. Future partitions are created by
+app.core.partitioning.ensure_future_partitions (called at startup).
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a8e1f47d20'
+down_revision: Union[str, None] = 'b7e5d2a9f316'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('tasks', 'task_steps', 'file_operations')
+MONTHS_AHEAD = 3
+
+
+def _add_months(value: date, months: int) -> date:
+    month_index = value.year * 12 + value.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _months_to_create(bind, table: str):
+    first = bind.execute(sa.text(f"SELECT date_trunc('month', MIN(created_at))::date FROM {table}")).scalar()
+    current = bind.execute(sa.text("SELECT date_trunc('month', now())::date")).scalar()
+    month = first or current
+    last = _add_months(current, MONTHS_AHEAD)
+    while month <= last:
+        yield month
+        month = _add_months(month, 1)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.drop_constraint('task_steps_task_id_fkey', 'task_steps', type_='foreignkey')
+    op.drop_constraint('file_operations_task_id_fkey', 'file_operations', type_='foreignkey')
+
+    for table in TABLES:
+        op.execute(f"UPDATE {table} SET created_at = now() WHERE created_at IS NULL")
+        op.execute(f"CREATE TABLE {table}_new (LIKE {table} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)")
+        op.execute(f"ALTER TABLE {table}_new ALTER COLUMN created_at SET NOT NULL")
+        for month in _months_to_create(bind, table):
+            op.execute(
+                f"CREATE TABLE {table}_y{month.year}m{month.month:02d} PARTITION OF {table}_new "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+            )
+        # Catches rows outside the created ranges instead of failing inserts
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table}_new DEFAULT")
+        op.execute(f"INSERT INTO {table}_new SELECT * FROM {table}")
+        op.drop_table(table)
+        op.rename_table(f'{table}_new', table)
+        op.create_primary_key(f'{table}_pkey', table, ['id', 'created_at'])
+
+    op.create_foreign_key('tasks_project_id_fkey', 'tasks', 'projects', ['project_id'], ['id'], ondelete='CASCADE')
+    op.create_index('ix_tasks_session_id', 'tasks', ['session_id'])
+    op.create_index('ix_tasks_project_id_created_at', 'tasks', ['project_id', 'created_at'])
+    op.create_index('ix_task_steps_task_id_step_number', 'task_steps', ['task_id', 'step_number'])
+    op.create_index('ix_file_operations_task_id', 'file_operations', ['task_id', 'operation_timestamp'])
+
+    op.execute("""
+        CREATE FUNCTION tasks_delete_children() RETURNS trigger AS $$
+        BEGIN
+            DELETE FROM task_steps WHERE task_id = OLD.id;
+            DELETE FROM file_operations WHERE task_id = OLD.id;
+            RETURN OLD;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_delete_children AFTER DELETE ON tasks
+        FOR EACH ROW EXECUTE FUNCTION tasks_delete_children()
+    """)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP TRIGGER tasks_delete_children ON tasks")
+    op.execute("DROP FUNCTION tasks_delete_children()")
+
+    for table in TABLES:
+        op.execute(f"CREATE TABLE {table}_old (LIKE {table} INCLUDING DEFAULTS)")
+        op.execute(f"INSERT INTO {table}_old SELECT * FROM {table}")
+        op.drop_table(table)  # drops every partition with it
+        op.rename_table(f'{table}_old', table)
+        op.alter_column(table, 'created_at', nullable=True)
+        op.create_primary_key(f'{table}_pkey', table, ['id'])
+
+    op.create_foreign_key('tasks_project_id_fkey', 'tasks', 'projects', ['project_id'], ['id'], ondelete='CASCADE')
+    op.create_index('ix_tasks_session_id', 'tasks', ['session_id'], unique=True)
+    op.create_unique_constraint('uq_task_step_number', 'task_steps', ['task_id', 'step_number'])
+    op.create_foreign_key('task_steps_task_id_fkey', 'task_steps', 'tasks', ['task_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key('file_operations_task_id_fkey', 'file_operations', 'tasks', ['task_id'], ['id'], ondelete='CASCADE')
@@ -0,0 +1,37 @@
+"""Replay checkpoints: file_snapshots
+
+Revision ID: d81c5a2f7b39
+Revises: a4d17f3b9e60
+Create Date: 2026-10-19 16:48:12.630571
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81c5a2f7b39'
+down_revision: Union[str, None] = 'a4d17f3b9e60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('file_snapshots',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('task_id', sa.UUID(), nullable=False),
+    sa.Column('operation_count', sa.Integer(), nullable=False),
+    sa.Column('last_operation_id', sa.UUID(), nullable=False),
+    sa.Column('step_number', sa.Integer(), nullable=True),
+    sa.Column('files', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('task_id', 'operation_count', name='uq_file_snapshot_position')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('file_snapshots')
@@ -0,0 +1,51 @@
+"""Manifest of tasks moved to the cold archive
+
+Revision ID: e2b74c19a8d5
+Revises: c5a8e1f47d20
+Create Date: 2026-10-19 13:52:17.418266
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b74c19a8d5'
+down_revision: Union[str, None] = 'c5a8e1f47d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('archived_tasks',
+    sa.Column('task_id', sa.UUID(), nullable=False),
+    sa.Column('project_id', sa.UUID(), nullable=False),
+    sa.Column('session_id', sa.String(length=100), nullable=False),
+    sa.Column('archive_day', sa.Date(), nullable=False),
+    sa.Column('path', sa.String(length=500), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('duration_seconds', sa.Integer(), nullable=True),
+    sa.Column('total_steps', sa.Integer(), nullable=True),
+    sa.Column('input_tokens', sa.BigInteger(), nullable=True),
+    sa.Column('output_tokens', sa.BigInteger(), nullable=True),
+    sa.Column('cost_usd', sa.DECIMAL(precision=10, scale=6), nullable=True),
+    sa.Column('files_created', sa.Integer(), nullable=True),
+    sa.Column('files_modified', sa.Integer(), nullable=True),
+    sa.Column('files_deleted', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('task_id')
+    )
+    op.create_index(op.f('ix_archived_tasks_created_at'), 'archived_tasks', ['created_at'], unique=False)
+    op.create_index(op.f('ix_archived_tasks_project_id'), 'archived_tasks', ['project_id'], unique=False)
+    op.create_index(op.f('ix_archived_tasks_session_id'), 'archived_tasks', ['session_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_archived_tasks_session_id'), table_name='archived_tasks')
+    op.drop_index(op.f('ix_archived_tasks_project_id'), table_name='archived_tasks')
+    op.drop_index(op.f('ix_archived_tasks_created_at'), table_name='archived_tasks')
+    op.drop_table('archived_tasks')
@@ -0,0 +1,46 @@
+"""Per-model usage normalized from cost_breakdown: task_model_usage
+
+Revision ID: e4f19a7c2d58
+Revises: b62e0f9d4c17
+Create Date: 2026-10-19 19:05:33.817240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4f19a7c2d58'
+down_revision: Union[str, None] = 'b62e0f9d4c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('task_model_usage',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('task_id', sa.UUID(), nullable=False),
+    sa.Column('project_id', sa.UUID(), nullable=False),
+    sa.Column('agent_model_id', sa.UUID(), nullable=True),
+    sa.Column('model_name', sa.String(length=100), nullable=False),
+    sa.Column('input_tokens', sa.Integer(), nullable=True),
+    sa.Column('output_tokens', sa.Integer(), nullable=True),
+    sa.Column('cost_usd', sa.DECIMAL(precision=10, scale=6), nullable=True),
+    sa.Column('task_status', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['agent_model_id'], ['agent_models.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_task_model_usage_task_id'), 'task_model_usage', ['task_id'], unique=False)
+    op.create_index('ix_task_model_usage_created_at_model_name', 'task_model_usage', ['created_at', 'model_name'])
+    op.create_index('ix_task_model_usage_project_id_created_at', 'task_model_usage', ['project_id', 'created_at'])
+    # Existing tasks: python -m app.services.model_usage backfill
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_model_usage_project_id_created_at', table_name='task_model_usage')
+    op.drop_index('ix_task_model_usage_created_at_model_name', table_name='task_model_usage')
+    op.drop_index(op.f('ix_task_model_usage_task_id'), table_name='task_model_usage')
+    op.drop_table('task_model_usage')
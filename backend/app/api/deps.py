@@ -1,43 +1,123 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, APIKeyHeader
+from sqlalchemy import event, inspect
 from sqlalchemy.orm import Session
 from typing import Optional
+import hmac
+import uuid
+from ..core.cache import TTLCache
+from ..core.config import settings
 from ..core.database import get_db
-from ..core.security import verify_token
+from ..core.security import decode_token, hash_api_key, parse_api_key_prefix, verified_api_keys
+from ..models.api_key import ApiKey
 from ..models.user import User
 from ..schemas.auth import TokenData
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
+# Authenticated principals keyed by token subject (username). Entries are
+# column snapshots, not session-bound instances, so they can be shared
+# between requests. The TTL bounds staleness across worker processes; within
+# a process entries are dropped as soon as a user row changes.
+principal_cache = TTLCache(
+    maxsize=settings.auth_cache_max_size, ttl=settings.auth_cache_ttl_seconds
+)
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user"""
-    credentials_exception = HTTPException(
+_USER_COLUMNS = [column.key for column in User.__table__.columns]
+
+
+def _load_principal(db: Session, username: str) -> Optional[dict]:
+    principal = principal_cache.get(username)
+    if principal is not None:
+        return principal
+
+    user = db.query(User).filter(User.username == username).first()
+    if user is None:
+        return None
+
+    principal = {key: getattr(user, key) for key in _USER_COLUMNS}
+    principal_cache.set(username, principal)
+    return principal
+
+
+def invalidate_principal(username: str) -> None:
+    """Drop a cached principal, e.g. after an out-of-band user change"""
+    principal_cache.pop(username)
+
+
+@event.listens_for(User, "before_update")
+def _revoke_tokens_on_credential_change(mapper, connection, target):
+    """Bump token_version when a user is deactivated or changes password"""
+    state = inspect(target)
+    deactivated = state.attrs.is_active.history.has_changes() and not target.is_active
+    password_changed = (
+        state.attrs.password_hash.history.has_changes()
+        and not state.info.pop("password_rehash", False)
+    )
+    if deactivated or password_changed:
+        target.token_version = (target.token_version or 0) + 1
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_changed_principal(mapper, connection, target):
+    state = inspect(target)
+    usernames = {target.username}
+    usernames.update(state.attrs.username.history.deleted or ())
+    for username in usernames:
+        invalidate_principal(username)
+    # Drop again once the change is committed, in case a concurrent request
+    # re-cached the old row in between
+    state.session.info.setdefault("invalidate_principals", set()).update(usernames)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_principals(session):
+    for username in session.info.pop("invalidate_principals", ()):
+        invalidate_principal(username)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    token = credentials.credentials
-    username = verify_token(token)
-    
-    if username is None:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
-        raise credentials_exception
-    
-    if not user.is_active:
+
+
+def _user_from_token(token: str, db: Session) -> User:
+    payload = decode_token(token)
+
+    if payload is None:
+        raise _credentials_exception()
+
+    principal = _load_principal(db, payload["sub"])
+    if principal is None:
+        raise _credentials_exception()
+
+    # Tokens issued before the last revocation carry an older version
+    if payload.get("ver", 0) != principal["token_version"]:
+        raise _credentials_exception()
+
+    if not principal["is_active"]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
         )
-    
-    return user
+
+    # Detached, transient instance: callers read attributes only
+    return User(**principal)
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """Get current authenticated user"""
+    return _user_from_token(credentials.credentials, db)
 
 
 def get_current_active_user(
@@ -63,3 +143,121 @@ def get_current_admin_user(
         )
     return current_user
 
+
+# API keys keyed by their public prefix. A miss loads the key row once; after
+# that, authenticating an agent needs no database access at all. Unknown
+# prefixes go to a small short-lived cache of their own, so garbage keys
+# can't hammer the table or push real keys out.
+api_key_cache = TTLCache(
+    maxsize=settings.api_key_cache_max_size, ttl=settings.api_key_cache_ttl_seconds
+)
+unknown_api_key_cache = TTLCache(
+    maxsize=settings.api_key_miss_cache_max_size, ttl=settings.api_key_miss_cache_ttl_seconds
+)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Caller of an ingestion endpoint: a logged-in user or a project API key"""
+    user_id: Optional[uuid.UUID]
+    project_id: Optional[uuid.UUID] = None  # set for API keys: the only project they may touch
+    api_key_id: Optional[uuid.UUID] = None
+
+    def can_access_project(self, project_id) -> bool:
+        return self.project_id is None or str(self.project_id) == str(project_id)
+
+
+def _load_api_key(db: Session, prefix: str):
+    entry = api_key_cache.get(prefix)
+    if entry is not None:
+        return entry
+    if unknown_api_key_cache.get(prefix):
+        return None
+
+    api_key = db.query(ApiKey).filter(ApiKey.prefix == prefix).first()
+    if api_key is None:
+        unknown_api_key_cache.set(prefix, True)
+        return None
+    entry = {
+        "id": api_key.id,
+        "project_id": api_key.project_id,
+        "key_hash": api_key.key_hash,
+        "is_active": api_key.is_active,
+        "expires_at": api_key.expires_at,
+        "created_by": api_key.created_by,
+    }
+    api_key_cache.set(prefix, entry)
+    return entry
+
+
+def invalidate_api_key(prefix: str) -> None:
+    """Drop a cached API key, e.g. after it was revoked"""
+    api_key_cache.pop(prefix)
+    unknown_api_key_cache.pop(prefix)
+
+
+@event.listens_for(ApiKey, "after_insert")
+@event.listens_for(ApiKey, "after_update")
+@event.listens_for(ApiKey, "after_delete")
+def _invalidate_changed_api_key(mapper, connection, target):
+    invalidate_api_key(target.prefix)
+
+
+def _principal_from_api_key(key: str, db: Session) -> Principal:
+    invalid_key = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid API key",
+    )
+
+    prefix = parse_api_key_prefix(key)
+    if prefix is None:
+        raise invalid_key
+
+    key_hash = hash_api_key(key)
+    entry = _load_api_key(db, prefix)
+    if not entry or not hmac.compare_digest(key_hash, entry["key_hash"]):
+        raise invalid_key
+
+    if not entry["is_active"]:
+        raise invalid_key
+
+    expires_at = entry["expires_at"]
+    if expires_at is not None:
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if expires_at <= datetime.now(timezone.utc):
+            raise invalid_key
+
+    verified_api_keys.set(key_hash, prefix)  # quotas and replica pins may now go by the key
+    return Principal(
+        user_id=entry["created_by"],
+        project_id=entry["project_id"],
+        api_key_id=entry["id"],
+    )
+
+
+def get_api_key_principal(
+    api_key: Optional[str] = Depends(api_key_header),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """Authenticate a machine client by its X-API-Key header"""
+    if not api_key:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing API key",
+        )
+    return _principal_from_api_key(api_key, db)
+
+
+def get_ingest_principal(
+    api_key: Optional[str] = Depends(api_key_header),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """Accept either an X-API-Key header or a Bearer token"""
+    if api_key:
+        return _principal_from_api_key(api_key, db)
+    if credentials is None:
+        raise _credentials_exception()
+    user = _user_from_token(credentials.credentials, db)
+    return Principal(user_id=user.id)
@@ -1,66 +1,127 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from typing import List, Optional
+from sqlalchemy import func, desc, case
+from typing import Dict, List, Optional
+import uuid
 from datetime import datetime, timedelta, date
-from ...core.database import get_db
+from ...core.database import get_read_db
+from ...core.serialization import FastJSONResponse
+from ...models.agent_model import AgentModel
+from ...models.archived_task import ArchivedTask
+from ...models.environment_profile import EnvironmentProfile
 from ...models.task import Task
 from ...models.project import Project
 from ...models.system_metrics import SystemMetrics
+from ...models.task_model_usage import TaskModelUsage
+from ...services.archive import archive_may_contain
 from ...api.deps import get_current_user
 from ...models.user import User
 
 router = APIRouter()
 
 
+def _merge_rows(live_rows, archived_rows, key: str, sum_fields: List[str], max_fields: List[str] = ()) -> List[dict]:
+    """Combine live and archived group-by rows that share `key`.
+
+    Archived tasks only exist in the ArchivedTask manifest, so every
+    aggregate is computed on both sides and added up here.
+    """
+    merged: Dict[object, dict] = {}
+    for row in list(live_rows) + list(archived_rows):
+        row = row._asdict()
+        current = merged.get(row[key])
+        if current is None:
+            merged[row[key]] = row
+            continue
+        for field in sum_fields:
+            current[field] = (current[field] or 0) + (row[field] or 0)
+        for field in max_fields:
+            if row[field] is not None and (current[field] is None or row[field] > current[field]):
+                current[field] = row[field]
+    return list(merged.values())
+
+
+def _average(total, count) -> float:
+    return float(total) / count if count else 0.0
+
+
 @router.get("/dashboard")
 def get_dashboard_stats(
     days: int = Query(30, description="Number of days to look back"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get dashboard statistics"""
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
-    
+
     # Task statistics
     total_tasks = db.query(func.count(Task.id)).scalar()
-    
+    total_tasks += db.query(func.count(ArchivedTask.task_id)).scalar()
+
     recent_tasks = db.query(func.count(Task.id)).filter(
         Task.created_at >= start_date
     ).scalar()
-    
+
     completed_tasks = db.query(func.count(Task.id)).filter(
         Task.status == 'completed',
         Task.created_at >= start_date
     ).scalar()
-    
+
     failed_tasks = db.query(func.count(Task.id)).filter(
         Task.status == 'failed',
         Task.created_at >= start_date
     ).scalar()
-    
+
     # Cost and token statistics
     cost_stats = db.query(
         func.sum(Task.cost_usd).label('total_cost'),
         func.sum(Task.input_tokens).label('total_input_tokens'),
         func.sum(Task.output_tokens).label('total_output_tokens')
     ).filter(Task.created_at >= start_date).first()
-    
+
     # File operations statistics
     file_stats = db.query(
         func.sum(Task.files_created).label('total_files_created'),
         func.sum(Task.files_modified).label('total_files_modified'),
         func.sum(Task.files_deleted).label('total_files_deleted')
     ).filter(Task.created_at >= start_date).first()
-    
+
+    totals = {
+        "cost": cost_stats.total_cost or 0,
+        "input_tokens": cost_stats.total_input_tokens or 0,
+        "output_tokens": cost_stats.total_output_tokens or 0,
+        "files_created": file_stats.total_files_created or 0,
+        "files_modified": file_stats.total_files_modified or 0,
+        "files_deleted": file_stats.total_files_deleted or 0,
+    }
+
+    # Tasks moved to the cold archive, from the manifest rollups
+    if archive_may_contain(start_date):
+        archived = db.query(
+            func.count(ArchivedTask.task_id).label('recent'),
+            func.sum(case((ArchivedTask.status == 'completed', 1), else_=0)).label('completed'),
+            func.sum(case((ArchivedTask.status == 'failed', 1), else_=0)).label('failed'),
+            func.sum(ArchivedTask.cost_usd).label('cost'),
+            func.sum(ArchivedTask.input_tokens).label('input_tokens'),
+            func.sum(ArchivedTask.output_tokens).label('output_tokens'),
+            func.sum(ArchivedTask.files_created).label('files_created'),
+            func.sum(ArchivedTask.files_modified).label('files_modified'),
+            func.sum(ArchivedTask.files_deleted).label('files_deleted')
+        ).filter(ArchivedTask.created_at >= start_date).first()
+        recent_tasks += archived.recent or 0
+        completed_tasks += archived.completed or 0
+        failed_tasks += archived.failed or 0
+        for field in totals:
+            totals[field] += getattr(archived, field) or 0
+
     # Project statistics
     total_projects = db.query(func.count(Project.id)).scalar()
     active_projects = db.query(func.count(Project.id)).filter(
         Project.status == 'active'
     ).scalar()
-    
-    return {
+
+    return FastJSONResponse({
         "tasks": {
             "total": total_tasks,
             "recent": recent_tasks,
@@ -69,174 +130,398 @@ def get_dashboard_stats(
             "success_rate": (completed_tasks / recent_tasks * 100) if recent_tasks > 0 else 0
         },
         "costs": {
-            "total_cost": float(cost_stats.total_cost or 0),
-            "total_input_tokens": cost_stats.total_input_tokens or 0,
-            "total_output_tokens": cost_stats.total_output_tokens or 0,
-            "total_tokens": (cost_stats.total_input_tokens or 0) + (cost_stats.total_output_tokens or 0)
+            "total_cost": float(totals["cost"]),
+            "total_input_tokens": totals["input_tokens"],
+            "total_output_tokens": totals["output_tokens"],
+            "total_tokens": totals["input_tokens"] + totals["output_tokens"]
         },
         "files": {
-            "created": file_stats.total_files_created or 0,
-            "modified": file_stats.total_files_modified or 0,
-            "deleted": file_stats.total_files_deleted or 0,
-            "total": (file_stats.total_files_created or 0) + (file_stats.total_files_modified or 0) + (file_stats.total_files_deleted or 0)
+            "created": totals["files_created"],
+            "modified": totals["files_modified"],
+            "deleted": totals["files_deleted"],
+            "total": totals["files_created"] + totals["files_modified"] + totals["files_deleted"]
         },
         "projects": {
             "total": total_projects,
             "active": active_projects
         }
-    }
+    })
 
 
 @router.get("/tasks/performance")
 def get_task_performance(
     days: int = Query(30, description="Number of days to look back"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get task performance metrics"""
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
-    
-    # Daily task completion
-    daily_stats = db.query(
-        func.date(Task.created_at).label('date'),
-        func.count(Task.id).label('total_tasks'),
-        func.sum(func.case([(Task.status == 'completed', 1)], else_=0)).label('completed_tasks'),
-        func.sum(func.case([(Task.status == 'failed', 1)], else_=0)).label('failed_tasks'),
-        func.avg(Task.duration_seconds).label('avg_duration')
-    ).filter(
-        Task.created_at >= start_date
-    ).group_by(func.date(Task.created_at)).order_by(func.date(Task.created_at)).all()
-    
+    include_archive = archive_may_contain(start_date)
+
+    # Daily task completion. Durations are summed and counted rather than
+    # averaged so live and archived days can be combined.
+    def daily_query(model, id_column):
+        return db.query(
+            func.date(model.created_at).label('date'),
+            func.count(id_column).label('total_tasks'),
+            func.sum(case((model.status == 'completed', 1), else_=0)).label('completed_tasks'),
+            func.sum(case((model.status == 'failed', 1), else_=0)).label('failed_tasks'),
+            func.sum(model.duration_seconds).label('duration_sum'),
+            func.count(model.duration_seconds).label('duration_count')
+        ).filter(
+            model.created_at >= start_date
+        ).group_by(func.date(model.created_at)).all()
+
+    daily_fields = ['total_tasks', 'completed_tasks', 'failed_tasks', 'duration_sum', 'duration_count']
+    daily_stats = _merge_rows(
+        daily_query(Task, Task.id),
+        daily_query(ArchivedTask, ArchivedTask.task_id) if include_archive else [],
+        'date',
+        daily_fields
+    )
+    daily_stats.sort(key=lambda stat: str(stat['date']))
+
     # Average metrics
-    avg_metrics = db.query(
-        func.avg(Task.duration_seconds).label('avg_duration'),
-        func.avg(Task.total_steps).label('avg_steps'),
-        func.avg(Task.cost_usd).label('avg_cost'),
-        func.avg(Task.input_tokens + Task.output_tokens).label('avg_tokens')
-    ).filter(
-        Task.created_at >= start_date,
-        Task.status == 'completed'
-    ).first()
-    
-    return {
+    def average_query(model):
+        return db.query(
+            func.sum(model.duration_seconds).label('duration_sum'),
+            func.count(model.duration_seconds).label('duration_count'),
+            func.sum(model.total_steps).label('steps_sum'),
+            func.count(model.total_steps).label('steps_count'),
+            func.sum(model.cost_usd).label('cost_sum'),
+            func.count(model.cost_usd).label('cost_count'),
+            func.sum(model.input_tokens + model.output_tokens).label('tokens_sum'),
+            func.count(model.input_tokens + model.output_tokens).label('tokens_count')
+        ).filter(
+            model.created_at >= start_date,
+            model.status == 'completed'
+        ).first()
+
+    averages = average_query(Task)._asdict()
+    if include_archive:
+        for field, value in average_query(ArchivedTask)._asdict().items():
+            averages[field] = (averages[field] or 0) + (value or 0)
+
+    return FastJSONResponse({
         "daily_stats": [
             {
-                "date": str(stat.date),
-                "total_tasks": stat.total_tasks,
-                "completed_tasks": stat.completed_tasks,
-                "failed_tasks": stat.failed_tasks,
-                "avg_duration": float(stat.avg_duration or 0)
+                "date": str(stat['date']),
+                "total_tasks": stat['total_tasks'],
+                "completed_tasks": stat['completed_tasks'],
+                "failed_tasks": stat['failed_tasks'],
+                "avg_duration": _average(stat['duration_sum'] or 0, stat['duration_count'])
             }
             for stat in daily_stats
         ],
         "averages": {
-            "duration_seconds": float(avg_metrics.avg_duration or 0),
-            "steps": float(avg_metrics.avg_steps or 0),
-            "cost_usd": float(avg_metrics.avg_cost or 0),
-            "tokens": float(avg_metrics.avg_tokens or 0)
+            "duration_seconds": _average(averages['duration_sum'] or 0, averages['duration_count']),
+            "steps": _average(averages['steps_sum'] or 0, averages['steps_count']),
+            "cost_usd": _average(averages['cost_sum'] or 0, averages['cost_count']),
+            "tokens": _average(averages['tokens_sum'] or 0, averages['tokens_count'])
         }
-    }
+    })
 
 
 @router.get("/costs")
 def get_cost_analysis(
     days: int = Query(30, description="Number of days to look back"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get cost analysis"""
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
-    
+    include_archive = archive_may_contain(start_date)
+
     # Daily cost breakdown
-    daily_costs = db.query(
-        func.date(Task.created_at).label('date'),
-        func.sum(Task.cost_usd).label('total_cost'),
-        func.sum(Task.input_tokens).label('input_tokens'),
-        func.sum(Task.output_tokens).label('output_tokens')
-    ).filter(
-        Task.created_at >= start_date
-    ).group_by(func.date(Task.created_at)).order_by(func.date(Task.created_at)).all()
-    
-    # Cost by project
-    project_costs = db.query(
-        Project.name.label('project_name'),
-        func.sum(Task.cost_usd).label('total_cost'),
-        func.count(Task.id).label('task_count')
-    ).join(Task).filter(
-        Task.created_at >= start_date
-    ).group_by(Project.id, Project.name).order_by(desc(func.sum(Task.cost_usd))).limit(10).all()
-    
-    return {
+    def daily_query(model):
+        return db.query(
+            func.date(model.created_at).label('date'),
+            func.sum(model.cost_usd).label('total_cost'),
+            func.sum(model.input_tokens).label('input_tokens'),
+            func.sum(model.output_tokens).label('output_tokens')
+        ).filter(
+            model.created_at >= start_date
+        ).group_by(func.date(model.created_at)).all()
+
+    daily_costs = _merge_rows(
+        daily_query(Task),
+        daily_query(ArchivedTask) if include_archive else [],
+        'date',
+        ['total_cost', 'input_tokens', 'output_tokens']
+    )
+    daily_costs.sort(key=lambda cost: str(cost['date']))
+
+    # Cost by project. With archived tasks in range the top 10 can only be
+    # picked after merging, so the limit moves out of SQL.
+    def project_query(model, id_column):
+        query = db.query(
+            Project.id.label('project_id'),
+            Project.name.label('project_name'),
+            func.sum(model.cost_usd).label('total_cost'),
+            func.count(id_column).label('task_count')
+        ).join(model, model.project_id == Project.id).filter(
+            model.created_at >= start_date
+        ).group_by(Project.id, Project.name).order_by(desc(func.sum(model.cost_usd)))
+        return query if include_archive else query.limit(10)
+
+    project_costs = _merge_rows(
+        project_query(Task, Task.id),
+        project_query(ArchivedTask, ArchivedTask.task_id) if include_archive else [],
+        'project_id',
+        ['total_cost', 'task_count']
+    )
+    project_costs.sort(key=lambda cost: cost['total_cost'] or 0, reverse=True)
+
+    return FastJSONResponse({
         "daily_costs": [
             {
-                "date": str(cost.date),
-                "total_cost": float(cost.total_cost or 0),
-                "input_tokens": cost.input_tokens or 0,
-                "output_tokens": cost.output_tokens or 0
+                "date": str(cost['date']),
+                "total_cost": float(cost['total_cost'] or 0),
+                "input_tokens": cost['input_tokens'] or 0,
+                "output_tokens": cost['output_tokens'] or 0
             }
             for cost in daily_costs
         ],
         "project_costs": [
             {
-                "project_name": cost.project_name,
-                "total_cost": float(cost.total_cost or 0),
-                "task_count": cost.task_count
+                "project_name": cost['project_name'],
+                "total_cost": float(cost['total_cost'] or 0),
+                "task_count": cost['task_count']
             }
-            for cost in project_costs
+            for cost in project_costs[:10]
         ]
-    }
+    })
 
 
 @router.get("/usage-trends")
 def get_usage_trends(
     days: int = Query(90, description="Number of days to look back"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get usage trends"""
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
-    
+    include_archive = archive_may_contain(start_date)
+
     # Weekly trends
-    weekly_trends = db.query(
-        func.date_trunc('week', Task.created_at).label('week'),
-        func.count(Task.id).label('task_count'),
-        func.sum(Task.cost_usd).label('total_cost'),
-        func.sum(Task.input_tokens + Task.output_tokens).label('total_tokens'),
-        func.avg(Task.duration_seconds).label('avg_duration')
-    ).filter(
-        Task.created_at >= start_date
-    ).group_by(func.date_trunc('week', Task.created_at)).order_by(func.date_trunc('week', Task.created_at)).all()
-    
+    def weekly_query(model, id_column):
+        return db.query(
+            func.date_trunc('week', model.created_at).label('week'),
+            func.count(id_column).label('task_count'),
+            func.sum(model.cost_usd).label('total_cost'),
+            func.sum(model.input_tokens + model.output_tokens).label('total_tokens'),
+            func.sum(model.duration_seconds).label('duration_sum'),
+            func.count(model.duration_seconds).label('duration_count')
+        ).filter(
+            model.created_at >= start_date
+        ).group_by(func.date_trunc('week', model.created_at)).all()
+
+    weekly_trends = _merge_rows(
+        weekly_query(Task, Task.id),
+        weekly_query(ArchivedTask, ArchivedTask.task_id) if include_archive else [],
+        'week',
+        ['task_count', 'total_cost', 'total_tokens', 'duration_sum', 'duration_count']
+    )
+    weekly_trends.sort(key=lambda trend: trend['week'])
+
     # Most active projects
-    active_projects = db.query(
-        Project.name.label('project_name'),
-        func.count(Task.id).label('task_count'),
-        func.max(Task.created_at).label('last_activity')
-    ).join(Task).filter(
-        Task.created_at >= start_date
-    ).group_by(Project.id, Project.name).order_by(desc(func.count(Task.id))).limit(10).all()
-    
-    return {
+    def project_query(model, id_column):
+        query = db.query(
+            Project.id.label('project_id'),
+            Project.name.label('project_name'),
+            func.count(id_column).label('task_count'),
+            func.max(model.created_at).label('last_activity')
+        ).join(model, model.project_id == Project.id).filter(
+            model.created_at >= start_date
+        ).group_by(Project.id, Project.name).order_by(desc(func.count(id_column)))
+        return query if include_archive else query.limit(10)
+
+    active_projects = _merge_rows(
+        project_query(Task, Task.id),
+        project_query(ArchivedTask, ArchivedTask.task_id) if include_archive else [],
+        'project_id',
+        ['task_count'],
+        ['last_activity']
+    )
+    active_projects.sort(key=lambda project: project['task_count'], reverse=True)
+
+    return FastJSONResponse({
         "weekly_trends": [
             {
-                "week": trend.week.isoformat() if trend.week else None,
-                "task_count": trend.task_count,
-                "total_cost": float(trend.total_cost or 0),
-                "total_tokens": trend.total_tokens or 0,
-                "avg_duration": float(trend.avg_duration or 0)
+                "week": trend['week'].isoformat() if trend['week'] else None,
+                "task_count": trend['task_count'],
+                "total_cost": float(trend['total_cost'] or 0),
+                "total_tokens": trend['total_tokens'] or 0,
+                "avg_duration": _average(trend['duration_sum'] or 0, trend['duration_count'])
             }
             for trend in weekly_trends
         ],
         "active_projects": [
             {
-                "project_name": project.project_name,
-                "task_count": project.task_count,
-                "last_activity": project.last_activity.isoformat() if project.last_activity else None
+                "project_name": project['project_name'],
+                "task_count": project['task_count'],
+                "last_activity": project['last_activity'].isoformat() if project['last_activity'] else None
             }
-            for project in active_projects
+            for project in active_projects[:10]
         ]
+    })
+
+
+def _model_usage_columns() -> list:
+    return [
+        func.count(TaskModelUsage.id).label('tasks'),
+        func.sum(case((TaskModelUsage.task_status == 'completed', 1), else_=0)).label('successful_tasks'),
+        func.sum(TaskModelUsage.input_tokens).label('input_tokens'),
+        func.sum(TaskModelUsage.output_tokens).label('output_tokens'),
+        func.sum(TaskModelUsage.cost_usd).label('total_cost'),
+    ]
+
+
+def _model_usage_filters(start_date: datetime, project_id: Optional[uuid.UUID]) -> list:
+    filters = [TaskModelUsage.created_at >= start_date]
+    if project_id:
+        filters.append(TaskModelUsage.project_id == project_id)
+    return filters
+
+
+def _model_usage_stats(row) -> dict:
+    successful = row.successful_tasks or 0
+    return {
+        "tasks": row.tasks,
+        "successful_tasks": successful,
+        "input_tokens": row.input_tokens or 0,
+        "output_tokens": row.output_tokens or 0,
+        "total_cost": float(row.total_cost or 0),
+        # Everything spent on the model, failures included, per completed task
+        "cost_per_success": _average(row.total_cost or 0, successful),
     }
 
+
+@router.get("/models")
+def get_model_usage(
+    days: int = Query(30, description="Number of days to look back"),
+    project_id: Optional[uuid.UUID] = Query(None, description="Only this project's tasks"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get spend, tokens and cost per successful task for each LLM model"""
+    start_date = datetime.utcnow() - timedelta(days=days)
+
+    # From task_model_usage, which also covers archived tasks
+    usage = db.query(
+        TaskModelUsage.model_name,
+        TaskModelUsage.agent_model_id,
+        *_model_usage_columns()
+    ).filter(
+        *_model_usage_filters(start_date, project_id)
+    ).group_by(TaskModelUsage.model_name, TaskModelUsage.agent_model_id).subquery()
+    rows = db.query(usage, AgentModel.provider).outerjoin(
+        AgentModel, AgentModel.id == usage.c.agent_model_id
+    ).order_by(desc(usage.c.total_cost)).all()
+
+    return FastJSONResponse({
+        "models": [
+            {
+                "model_name": row.model_name,
+                "agent_model_id": row.agent_model_id,
+                "provider": row.provider,
+                **_model_usage_stats(row)
+            }
+            for row in rows
+        ]
+    })
+
+
+@router.get("/models/daily")
+def get_model_usage_daily(
+    days: int = Query(30, description="Number of days to look back"),
+    project_id: Optional[uuid.UUID] = Query(None, description="Only this project's tasks"),
+    model_name: Optional[str] = Query(None, description="Only this model"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get daily spend, tokens and cost per successful task for each LLM model"""
+    start_date = datetime.utcnow() - timedelta(days=days)
+
+    query = db.query(
+        func.date(TaskModelUsage.created_at).label('date'),
+        TaskModelUsage.model_name,
+        *_model_usage_columns()
+    ).filter(*_model_usage_filters(start_date, project_id))
+    if model_name:
+        query = query.filter(TaskModelUsage.model_name == model_name)
+    rows = query.group_by(
+        func.date(TaskModelUsage.created_at), TaskModelUsage.model_name
+    ).order_by(func.date(TaskModelUsage.created_at), TaskModelUsage.model_name).all()
+
+    return FastJSONResponse({
+        "daily_usage": [
+            {
+                "date": str(row.date),
+                "model_name": row.model_name,
+                **_model_usage_stats(row)
+            }
+            for row in rows
+        ]
+    })
+
+
+@router.get("/environments")
+def get_environment_usage(
+    days: int = Query(30, description="Number of days to look back"),
+    project_id: Optional[uuid.UUID] = Query(None, description="Only this project's tasks"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get task outcomes, duration and spend for each environment profile"""
+    start_date = datetime.utcnow() - timedelta(days=days)
+
+    # Grouped on the integer profile id; the blobs are fetched once per profile
+    def profile_query(model, id_column):
+        query = db.query(
+            model.environment_profile_id,
+            func.count(id_column).label('total_tasks'),
+            func.sum(case((model.status == 'completed', 1), else_=0)).label('completed_tasks'),
+            func.sum(case((model.status == 'failed', 1), else_=0)).label('failed_tasks'),
+            func.sum(model.duration_seconds).label('duration_sum'),
+            func.count(model.duration_seconds).label('duration_count'),
+            func.sum(model.cost_usd).label('total_cost'),
+            func.sum(model.input_tokens + model.output_tokens).label('total_tokens')
+        ).filter(model.created_at >= start_date)
+        if project_id:
+            query = query.filter(model.project_id == project_id)
+        return query.group_by(model.environment_profile_id).all()
+
+    stats = _merge_rows(
+        profile_query(Task, Task.id),
+        profile_query(ArchivedTask, ArchivedTask.task_id) if archive_may_contain(start_date) else [],
+        'environment_profile_id',
+        ['total_tasks', 'completed_tasks', 'failed_tasks', 'duration_sum', 'duration_count', 'total_cost', 'total_tokens']
+    )
+    stats.sort(key=lambda stat: stat['total_tasks'], reverse=True)
+    profile_ids = [stat['environment_profile_id'] for stat in stats if stat['environment_profile_id'] is not None]
+    profiles = dict(
+        db.query(EnvironmentProfile.id, EnvironmentProfile.environment_info)
+        .filter(EnvironmentProfile.id.in_(profile_ids)).all()
+    ) if profile_ids else {}
+
+    return FastJSONResponse({
+        "environments": [
+            {
+                # null: tasks sent without environment_info (or not backfilled yet)
+                "environment_profile_id": stat['environment_profile_id'],
+                "environment_info": profiles.get(stat['environment_profile_id']),
+                "total_tasks": stat['total_tasks'],
+                "completed_tasks": stat['completed_tasks'] or 0,
+                "failed_tasks": stat['failed_tasks'] or 0,
+                "success_rate": _average((stat['completed_tasks'] or 0) * 100, stat['total_tasks']),
+                "avg_duration": _average(stat['duration_sum'] or 0, stat['duration_count']),
+                "total_cost": float(stat['total_cost'] or 0),
+                "total_tokens": stat['total_tokens'] or 0
+            }
+            for stat in stats
+        ]
+    })
@@ -1,87 +1,72 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 from datetime import datetime
+from typing import Optional
 from ...core.database import get_db
-from ...core.security import verify_password, get_password_hash, create_access_token, create_refresh_token
+from ...core.security import (
+    verify_password_async, get_password_hash_async, create_access_token, create_refresh_token,
+    PasswordHasherBusy
+)
 from ...models.user import User
 from ...schemas.user import User as UserSchema, UserCreate
 from ...schemas.auth import Token, UserLogin
-from ...api.deps import get_current_user
+from ...api.deps import get_current_user, get_current_admin_user, principal_cache
 
 router = APIRouter()
 
 
-@router.post("/register", response_model=UserSchema)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    """Register new user"""
-    # Check if user already exists
-    db_user = db.query(User).filter(
-        (User.username == user.username) | (User.email == user.email)
-    ).first()
-    
-    if db_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username or email already registered"
-        )
-    
-    # Create new user
-    hashed_password = get_password_hash(user.password)
-    db_user = User(
-        username=user.username,
-        email=user.email,
-        password_hash=hashed_password,
-        full_name=user.full_name,
-        role=user.role
+def _hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service busy, retry shortly",
+        headers={"Retry-After": "1"},
     )
-    
+
+
+def _find_user(db: Session, username: str, email: Optional[str] = None) -> Optional[User]:
+    query = db.query(User)
+    if email is None:
+        return query.filter(User.username == username).first()
+    return query.filter((User.username == username) | (User.email == email)).first()
+
+
+def _add_user(db: Session, db_user: User) -> User:
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
-    
     return db_user
 
 
-@router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    """Login user"""
-    user = db.query(User).filter(User.username == form_data.username).first()
-    
-    if not user or not verify_password(form_data.password, user.password_hash):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect username or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Inactive user"
-        )
-    
-    # Update last login
+def _record_login(db: Session, user: User, new_hash: Optional[str]) -> dict:
+    if new_hash:
+        # Same password, new cost factor: must not revoke issued tokens
+        inspect(user).info["password_rehash"] = True
+        user.password_hash = new_hash
     user.last_login = datetime.utcnow()
     db.commit()
     
-    # Create tokens
-    access_token = create_access_token(subject=user.username)
-    refresh_token = create_refresh_token(subject=user.username)
-    
     return {
-        "access_token": access_token,
-        "refresh_token": refresh_token,
+        "access_token": create_access_token(subject=user.username, token_version=user.token_version),
+        "refresh_token": create_refresh_token(subject=user.username, token_version=user.token_version),
         "token_type": "bearer"
     }
 
 
-@router.post("/login-json", response_model=Token)
-def login_json(user_login: UserLogin, db: Session = Depends(get_db)):
-    """Login user with JSON"""
-    user = db.query(User).filter(User.username == user_login.username).first()
+async def _authenticate(db: Session, username: str, password: str) -> dict:
+    """Check credentials and issue tokens without blocking request threads on bcrypt"""
+    user = await run_in_threadpool(_find_user, db, username)
+    
+    valid, new_hash = False, None
+    if user:
+        try:
+            valid, new_hash = await verify_password_async(password, user.password_hash)
+        except PasswordHasherBusy:
+            raise _hashing_busy()
     
-    if not user or not verify_password(user_login.password, user.password_hash):
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -94,19 +79,48 @@ def login_json(user_login: UserLogin, db: Session = Depends(get_db)):
             detail="Inactive user"
         )
     
-    # Update last login
-    user.last_login = datetime.utcnow()
-    db.commit()
+    return await run_in_threadpool(_record_login, db, user, new_hash)
+
+
+@router.post("/register", response_model=UserSchema)
+async def register(user: UserCreate, db: Session = Depends(get_db)):
+    """Register new user"""
+    # Check if user already exists
+    db_user = await run_in_threadpool(_find_user, db, user.username, user.email)
     
-    # Create tokens
-    access_token = create_access_token(subject=user.username)
-    refresh_token = create_refresh_token(subject=user.username)
+    if db_user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username or email already registered"
+        )
     
-    return {
-        "access_token": access_token,
-        "refresh_token": refresh_token,
-        "token_type": "bearer"
-    }
+    # Create new user
+    try:
+        hashed_password = await get_password_hash_async(user.password)
+    except PasswordHasherBusy:
+        raise _hashing_busy()
+    
+    db_user = User(
+        username=user.username,
+        email=user.email,
+        password_hash=hashed_password,
+        full_name=user.full_name,
+        role=user.role
+    )
+    
+    return await run_in_threadpool(_add_user, db, db_user)
+
+
+@router.post("/login", response_model=Token)
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    """Login user"""
+    return await _authenticate(db, form_data.username, form_data.password)
+
+
+@router.post("/login-json", response_model=Token)
+async def login_json(user_login: UserLogin, db: Session = Depends(get_db)):
+    """Login user with JSON"""
+    return await _authenticate(db, user_login.username, user_login.password)
 
 
 @router.get("/me", response_model=UserSchema)
@@ -115,6 +129,12 @@ def read_users_me(current_user: User = Depends(get_current_user)):
     return current_user
 
 
+@router.get("/cache-stats")
+def read_auth_cache_stats(current_user: User = Depends(get_current_admin_user)):
+    """Get authenticated principal cache statistics (admin only)"""
+    return principal_cache.stats()
+
+
 @router.post("/logout")
 def logout():
     """Logout user (client should remove token)"""
@@ -1,17 +1,73 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, asc
-from typing import List, Optional
-from ...core.database import get_db
+from sqlalchemy import func, desc, asc, case
+from typing import Dict, List, Optional
+import uuid
+from ...core.database import get_db, get_read_db
 from ...models.project import Project
+from ...models.archived_task import ArchivedTask
 from ...models.task import Task
-from ...schemas.project import Project as ProjectSchema, ProjectCreate, ProjectUpdate, ProjectStats, ProjectListResponse
-from ...api.deps import get_current_user
+from ...models.project_budget_event import ProjectBudgetEvent
+from ...models.api_key import ApiKey
+from ...models.deletion_job import DeletionJob
+from ...schemas.project import Project as ProjectSchema, ProjectCreate, ProjectUpdate, ProjectStats, ProjectWithStats, ProjectListResponse, ProjectBudget
+from ...schemas.api_key import ApiKey as ApiKeySchema, ApiKeyCreate, ApiKeyCreated
+from ...schemas.deletion_job import DeletionJob as DeletionJobSchema
+from ...services.budget import check_budget_thresholds, get_budget_status
+from ...services.deletion import DELETING_STATUS, start_project_deletion, run_project_deletion
+from ...core.security import generate_api_key, hash_api_key
+from ...api.deps import get_current_user, invalidate_api_key
 from ...models.user import User
 
 router = APIRouter()
 
 
+def _task_stats_columns(model, id_column, activity_column) -> list:
+    return [
+        func.count(id_column).label('total_tasks'),
+        func.sum(case((model.status == 'completed', 1), else_=0)).label('completed_tasks'),
+        func.sum(case((model.status == 'failed', 1), else_=0)).label('failed_tasks'),
+        func.sum(case((model.status == 'pending', 1), else_=0)).label('pending_tasks'),
+        func.sum(model.cost_usd).label('total_cost'),
+        func.sum(model.input_tokens + model.output_tokens).label('total_tokens'),
+        func.sum(model.files_created + model.files_modified + model.files_deleted).label('total_files_affected'),
+        func.max(activity_column).label('last_activity_at'),
+    ]
+
+
+_SUMMED_STATS = (
+    'total_tasks', 'completed_tasks', 'failed_tasks', 'pending_tasks',
+    'total_cost', 'total_tokens', 'total_files_affected',
+)
+
+
+def _stats_by_project(db: Session, project_ids: list) -> Dict[uuid.UUID, ProjectStats]:
+    """Task statistics for several projects, live and archived tasks, in one grouped query each"""
+    if not project_ids:
+        return {}
+    live = db.query(
+        Task.project_id, *_task_stats_columns(Task, Task.id, Task.updated_at)
+    ).filter(Task.project_id.in_(project_ids)).group_by(Task.project_id).all()
+    # Archived tasks only exist in the manifest, which keeps the rollup columns
+    archived = db.query(
+        ArchivedTask.project_id, *_task_stats_columns(ArchivedTask, ArchivedTask.task_id, ArchivedTask.created_at)
+    ).filter(ArchivedTask.project_id.in_(project_ids)).group_by(ArchivedTask.project_id).all()
+
+    merged: Dict[uuid.UUID, dict] = {}
+    for row in list(live) + list(archived):
+        row = row._asdict()
+        current = merged.setdefault(row['project_id'], {'last_activity_at': None})
+        for field in _SUMMED_STATS:
+            current[field] = current.get(field, 0) + (row[field] or 0)
+        activity = row['last_activity_at']
+        if activity is not None and (current['last_activity_at'] is None or activity > current['last_activity_at']):
+            current['last_activity_at'] = activity
+    return {
+        project_id: ProjectStats(**stats)
+        for project_id, stats in merged.items()
+    }
+
+
 @router.get("/", response_model=ProjectListResponse)
 def read_projects(
     page: int = Query(1, ge=1, description="Page number"),
@@ -21,7 +77,8 @@ def read_projects(
     priority: Optional[str] = Query(None, description="Filter by priority"),
     sort_by: Optional[str] = Query("created_at", description="Sort field"),
     sort_order: Optional[str] = Query("desc", description="Sort order: asc or desc"),
-    db: Session = Depends(get_db),
+    include_stats: bool = Query(False, description="Embed each project's task statistics"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all projects with pagination and filtering"""
@@ -38,6 +95,9 @@ def read_projects(
     
     if status:
         query = query.filter(Project.status == status)
+    else:
+        # Projects pending background deletion are hidden unless asked for
+        query = query.filter(Project.status != DELETING_STATUS)
         
     if priority:
         query = query.filter(Project.priority == priority)
@@ -61,8 +121,17 @@ def read_projects(
     has_next = page < total_pages
     has_prev = page > 1
     
+    items = projects
+    if include_stats:
+        # One grouped query for the whole page instead of a /stats call per row
+        stats = _stats_by_project(db, [project.id for project in projects])
+        items = [
+            ProjectWithStats.model_validate(project).model_copy(update={"stats": stats.get(project.id, ProjectStats())})
+            for project in projects
+        ]
+    
     return ProjectListResponse(
-        items=projects,
+        items=items,
         total=total,
         page=page,
         page_size=page_size,
@@ -100,8 +169,8 @@ def create_project(
 
 @router.get("/{project_id}", response_model=ProjectSchema)
 def read_project(
-    project_id: str,
-    db: Session = Depends(get_db),
+    project_id: uuid.UUID,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get project by ID"""
@@ -116,7 +185,7 @@ def read_project(
 
 @router.put("/{project_id}", response_model=ProjectSchema)
 def update_project(
-    project_id: str,
+    project_id: uuid.UUID,
     project_update: ProjectUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -142,19 +211,28 @@ def update_project(
     for field, value in update_data.items():
         setattr(project, field, value)
     
+    if "budget" in update_data:
+        db.flush()
+        check_budget_thresholds(db, project.id)
+    
     db.commit()
     db.refresh(project)
     
     return project
 
 
-@router.delete("/{project_id}")
+@router.delete("/{project_id}", response_model=DeletionJobSchema, status_code=status.HTTP_202_ACCEPTED)
 def delete_project(
-    project_id: str,
+    project_id: uuid.UUID,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Delete project"""
+    """Delete project in the background.
+    
+    Returns the deletion job right away; poll /projects/deletion-jobs/{job_id}
+    for progress.
+    """
     project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
         raise HTTPException(
@@ -162,16 +240,40 @@ def delete_project(
             detail="Project not found"
         )
     
-    db.delete(project)
-    db.commit()
+    if project.status == DELETING_STATUS:
+        job = db.query(DeletionJob).filter(
+            DeletionJob.project_id == project.id,
+            DeletionJob.status.in_(["pending", "running"])
+        ).first()
+        if job:
+            return job
+    
+    job = start_project_deletion(db, project, current_user.id)
+    background_tasks.add_task(run_project_deletion, job.id)
     
-    return {"message": "Project deleted successfully"}
+    return job
+
+
+@router.get("/deletion-jobs/{job_id}", response_model=DeletionJobSchema)
+def read_deletion_job(
+    job_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get progress of a project deletion job"""
+    job = db.query(DeletionJob).filter(DeletionJob.id == job_id).first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Deletion job not found"
+        )
+    return job
 
 
 @router.get("/{project_id}/stats", response_model=ProjectStats)
 def get_project_stats(
-    project_id: str,
-    db: Session = Depends(get_db),
+    project_id: uuid.UUID,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get project statistics"""
@@ -182,24 +284,96 @@ def get_project_stats(
             detail="Project not found"
         )
     
-    # Get task statistics
-    task_stats = db.query(
-        func.count(Task.id).label('total_tasks'),
-        func.sum(func.case([(Task.status == 'completed', 1)], else_=0)).label('completed_tasks'),
-        func.sum(func.case([(Task.status == 'failed', 1)], else_=0)).label('failed_tasks'),
-        func.sum(func.case([(Task.status == 'pending', 1)], else_=0)).label('pending_tasks'),
-        func.sum(Task.cost_usd).label('total_cost'),
-        func.sum(Task.input_tokens + Task.output_tokens).label('total_tokens'),
-        func.sum(Task.files_created + Task.files_modified + Task.files_deleted).label('total_files_affected')
-    ).filter(Task.project_id == project_id).first()
-    
-    return ProjectStats(
-        total_tasks=task_stats.total_tasks or 0,
-        completed_tasks=task_stats.completed_tasks or 0,
-        failed_tasks=task_stats.failed_tasks or 0,
-        pending_tasks=task_stats.pending_tasks or 0,
-        total_cost=task_stats.total_cost or 0,
-        total_tokens=task_stats.total_tokens or 0,
-        total_files_affected=task_stats.total_files_affected or 0
+    return _stats_by_project(db, [project_id]).get(project_id, ProjectStats())
+
+
+
+@router.get("/{project_id}/budget", response_model=ProjectBudget)
+def get_project_budget(
+    project_id: uuid.UUID,
+    events_limit: int = Query(20, ge=0, le=100, description="Number of recent threshold events"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get project budget usage, burn rate and threshold events"""
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    events = db.query(ProjectBudgetEvent).filter(
+        ProjectBudgetEvent.project_id == project.id
+    ).order_by(desc(ProjectBudgetEvent.created_at)).limit(events_limit).all()
+    
+    return ProjectBudget(**get_budget_status(project), events=events)
+
+
+@router.post("/{project_id}/api-keys", response_model=ApiKeyCreated)
+def create_project_api_key(
+    project_id: uuid.UUID,
+    api_key_in: ApiKeyCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Create an API key for agents reporting into this project.
+    
+    The plain key is only returned here; store it on the agent side.
+    """
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    key, prefix = generate_api_key()
+    api_key = ApiKey(
+        project_id=project.id,
+        name=api_key_in.name,
+        prefix=prefix,
+        key_hash=hash_api_key(key),
+        created_by=current_user.id,
+        expires_at=api_key_in.expires_at
     )
+    db.add(api_key)
+    db.commit()
+    db.refresh(api_key)
+    
+    return ApiKeyCreated(**ApiKeySchema.model_validate(api_key).model_dump(), key=key)
+
+
+@router.get("/{project_id}/api-keys", response_model=List[ApiKeySchema])
+def read_project_api_keys(
+    project_id: uuid.UUID,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List API keys of a project (without the secrets)"""
+    return db.query(ApiKey).filter(ApiKey.project_id == project_id).order_by(desc(ApiKey.created_at)).all()
 
+
+@router.delete("/{project_id}/api-keys/{key_id}")
+def revoke_project_api_key(
+    project_id: uuid.UUID,
+    key_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Revoke an API key"""
+    api_key = db.query(ApiKey).filter(
+        ApiKey.id == key_id,
+        ApiKey.project_id == project_id
+    ).first()
+    if not api_key:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="API key not found"
+        )
+    
+    api_key.is_active = False
+    db.commit()
+    invalidate_api_key(api_key.prefix)
+    
+    return {"message": "API key revoked successfully"}
@@ -1,19 +1,138 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import status as status_codes
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, func, or_, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
+from datetime import datetime
+import base64
 import uuid
-from ...core.database import get_db
+from ...core.config import settings
+from ...core.database import get_db, get_read_db
+from ...core.partitioning import advisory_xact_lock, created_at_window
+from ...core.serialization import FastJSONResponse
+from ...models.archived_task import ArchivedTask
+from ...models.environment_profile import EnvironmentProfile
 from ...models.task import Task
 from ...models.file_operation import FileOperation
+from ...models.file_snapshot import FileSnapshot
+from ...models.task_model_usage import TaskModelUsage
 from ...models.task_step import TaskStep
-from ...schemas.task import Task as TaskSchema, TaskCreate, TaskUpdate
+from ...schemas.task import Task as TaskSchema, TaskCreate, TaskUpdate, TaskBulkUpdate, TaskBulkUpdateResult
+from ...schemas.task_detail import TaskDetail, TaskStepPage, FileOperationPage
+from ...schemas.environment_profile import EnvironmentProfile as EnvironmentProfileSchema
 from ...schemas.file_operation import FileOperation as FileOperationSchema
-from ...schemas.task_step import TaskStep as TaskStepSchema
-from ...api.deps import get_current_user
+from ...schemas.event import TaskEventBatch, TaskEventBatchResult
+from ...schemas.replay import WorkspaceState
+from ...schemas.task_step import TaskStep as TaskStepSchema, TaskStepCreate, TaskStepNode
+from ...services import archive, environments, events, export, model_usage, replay
+from ...services.step_tree import build_step_tree, load_step_tree
+from ...services.budget import apply_task_cost_change
+from ...api.deps import get_current_user, get_ingest_principal, Principal
 from ...models.user import User
 
 router = APIRouter()
 
+# The Task response schema's fields, selected as plain columns by read_tasks
+_TASK_LIST_COLUMNS = [getattr(Task, name).label(name) for name in TaskSchema.model_fields]
+
+
+def _task_filters(task_id: uuid.UUID) -> list:
+    """Filters for a task lookup by id.
+    
+    Time-ordered ids also bound created_at, so on the partitioned tables only
+    the matching month is probed instead of every partition's index.
+    """
+    filters = [Task.id == task_id]
+    window = created_at_window(task_id)
+    if window:
+        filters.append(Task.created_at.between(*window))
+    return filters
+
+
+def _child_filters(model, task_id: uuid.UUID) -> list:
+    """Filters for a task's steps/file operations, which are created after the task"""
+    filters = [model.task_id == task_id]
+    window = created_at_window(task_id)
+    if window:
+        filters.append(model.created_at >= window[0])
+    return filters
+
+
+def _list_filters(
+    project_id: Optional[uuid.UUID],
+    status: Optional[str],
+    search: Optional[str],
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+) -> list:
+    """Filters shared by the task list and the export"""
+    filters = []
+    
+    # A time range lets PostgreSQL skip partitions outside it
+    if start_date:
+        filters.append(Task.created_at >= start_date)
+    
+    if end_date:
+        filters.append(Task.created_at < end_date)
+    
+    if project_id:
+        filters.append(Task.project_id == project_id)
+    
+    if status:
+        filters.append(Task.status == status)
+    
+    if search:
+        filters.append(
+            (Task.name.contains(search)) |
+            (Task.description.contains(search)) |
+            (Task.session_id.contains(search))
+        )
+    return filters
+
+
+def _match_filter(ids: List[uuid.UUID], session_ids: List[str]):
+    """Tasks with any of `ids` or `session_ids`"""
+    if len(ids) + len(session_ids) > settings.bulk_max_tasks:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.bulk_max_tasks} ids and session ids per request"
+        )
+    conditions = []
+    if ids:
+        id_condition = Task.id.in_(ids)
+        windows = [created_at_window(task_id) for task_id in ids]
+        if all(windows):
+            # One created_at range spanning every id's month, to prune partitions
+            id_condition = and_(id_condition, Task.created_at.between(
+                min(window[0] for window in windows), max(window[1] for window in windows)
+            ))
+        conditions.append(id_condition)
+    if session_ids:
+        conditions.append(Task.session_id.in_(session_ids))
+    return or_(*conditions)
+
+
+def _split_values(values: Optional[List[str]]) -> List[str]:
+    """Query values given repeated (?ids=a&ids=b), comma-separated (?ids=a,b) or both"""
+    return [value.strip() for item in values or [] for value in item.split(",") if value.strip()]
+
+
+def _task_exists(db: Session, task_id: uuid.UUID) -> bool:
+    return db.query(Task.id).filter(*_task_filters(task_id)).first() is not None
+
+
+def _archived_task_or_404(db: Session, task_id: uuid.UUID) -> ArchivedTask:
+    """Manifest entry for a task that is no longer in the live tables"""
+    entry = archive.find_archived(db, task_id)
+    if not entry:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    return entry
+
 
 @router.get("/", response_model=List[TaskSchema])
 def read_tasks(
@@ -22,66 +141,331 @@ def read_tasks(
     project_id: Optional[uuid.UUID] = None,
     status: Optional[str] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db),
+    start_date: Optional[datetime] = Query(None, description="Only tasks created at or after this time"),
+    end_date: Optional[datetime] = Query(None, description="Only tasks created before this time"),
+    ids: Optional[List[str]] = Query(None, description="Only these task ids (repeated or comma-separated)"),
+    session_ids: Optional[List[str]] = Query(None, description="Only these session ids (repeated or comma-separated)"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all tasks with filtering"""
-    query = db.query(Task)
+    filters = _list_filters(project_id, status, search, start_date, end_date)
+    if ids or session_ids:
+        try:
+            task_ids = [uuid.UUID(value) for value in _split_values(ids)]
+        except ValueError:
+            raise HTTPException(
+                status_code=status_codes.HTTP_400_BAD_REQUEST,
+                detail="Invalid task id"
+            )
+        filters.append(_match_filter(task_ids, _split_values(session_ids)))
+    rows = db.execute(
+        select(*_TASK_LIST_COLUMNS)
+        .where(*filters)
+        .offset(skip)
+        .limit(limit)
+    ).mappings().all()
+    # Plain rows straight to orjson: no ORM objects, no response model validation
+    return FastJSONResponse(environments.attach(db, [dict(row) for row in rows]))
+
+
+@router.get("/export")
+def export_tasks(
+    export_format: str = Query("ndjson", alias="format", description="ndjson, csv or parquet"),
+    columns: Optional[str] = Query(None, description="Comma-separated task columns (default: all)"),
+    compression: Optional[str] = Query(None, description="gzip (ndjson and csv only)"),
+    project_id: Optional[uuid.UUID] = None,
+    status: Optional[str] = None,
+    search: Optional[str] = None,
+    start_date: Optional[datetime] = Query(None, description="Only tasks created at or after this time"),
+    end_date: Optional[datetime] = Query(None, description="Only tasks created before this time"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream every matching task, oldest first, without paging"""
+    if export_format not in export.FORMATS:
+        raise HTTPException(
+            status_code=status_codes.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format, use one of: {', '.join(export.FORMATS)}"
+        )
+    if compression not in (None, "gzip") or (compression and export_format == "parquet"):
+        raise HTTPException(
+            status_code=status_codes.HTTP_400_BAD_REQUEST,
+            detail="Only gzip compression of ndjson or csv is supported"
+        )
     
-    if project_id:
-        query = query.filter(Task.project_id == project_id)
+    selected = None
+    if columns:
+        selected = [name.strip() for name in columns.split(",") if name.strip()]
+        unknown = [name for name in selected if name not in export.EXPORT_COLUMNS]
+        if unknown:
+            raise HTTPException(
+                status_code=status_codes.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown columns: {', '.join(unknown)}"
+            )
     
-    if status:
-        query = query.filter(Task.status == status)
+    media_type, extension = export.FORMATS[export_format]
+    filename = f"tasks.{extension}"
+    if compression:
+        media_type, filename = "application/gzip", f"{filename}.gz"
     
-    if search:
-        query = query.filter(
-            (Task.name.contains(search)) |
-            (Task.description.contains(search)) |
-            (Task.session_id.contains(search))
+    chunks = export.export_tasks(
+        db,
+        _list_filters(project_id, status, search, start_date, end_date),
+        export_format,
+        selected,
+        gzip=compression == "gzip",
+    )
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.patch("/bulk", response_model=TaskBulkUpdateResult)
+def bulk_update_tasks(
+    bulk: TaskBulkUpdate,
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_ingest_principal)
+):
+    """Apply the same changes to many tasks in one UPDATE (Bearer token or project API key)"""
+    changes = bulk.changes.dict(exclude_unset=True)
+    if not changes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No changes given"
+        )
+    if not bulk.ids and not bulk.session_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Give ids or session_ids"
+        )
+    environments.intern_fields(db, changes)
+    
+    tasks = Task.__table__
+    filters = [_match_filter(bulk.ids, bulk.session_ids)]
+    if principal.project_id is not None:
+        # API keys only reach their own project's tasks
+        filters.append(Task.project_id == principal.project_id)
+    
+    old_totals = {}
+    if changes.keys() & {"cost_usd", "input_tokens", "output_tokens"}:
+        # Lock the rows and read what the UPDATE will replace, for the budget deltas
+        locked = db.execute(
+            select(tasks.c.id, tasks.c.cost_usd, tasks.c.input_tokens + tasks.c.output_tokens)
+            .where(*filters)
+            .with_for_update()
+        ).all()
+        old_totals = {task_id: (cost or 0, tokens or 0) for task_id, cost, tokens in locked}
+        filters.append(tasks.c.id.in_(list(old_totals)))
+    
+    rows = db.execute(
+        update(tasks)
+        .where(*filters)
+        .values(**changes)
+        .returning(
+            tasks.c.id,
+            tasks.c.project_id,
+            tasks.c.status,
+            tasks.c.created_at,
+            tasks.c.cost_usd,
+            (tasks.c.input_tokens + tasks.c.output_tokens).label("tokens"),
         )
+    ).mappings().all()
     
-    tasks = query.offset(skip).limit(limit).all()
-    return tasks
+    if old_totals:
+        deltas = {}
+        for row in rows:
+            old_cost, old_tokens = old_totals[row["id"]]
+            cost_delta, token_delta = deltas.get(row["project_id"], (0, 0))
+            deltas[row["project_id"]] = (
+                cost_delta + (row["cost_usd"] or 0) - old_cost,
+                token_delta + (row["tokens"] or 0) - old_tokens,
+            )
+        for project_id, (cost_delta, token_delta) in deltas.items():
+            apply_task_cost_change(db, project_id, cost_delta, token_delta)
+    if "cost_breakdown" in changes:
+        model_usage.replace_usage(db, [{**row, "cost_breakdown": changes["cost_breakdown"]} for row in rows])
+    elif "status" in changes:
+        model_usage.set_usage_status(db, [row["id"] for row in rows], changes["status"])
+    db.commit()
+    
+    return TaskBulkUpdateResult(updated=len(rows), ids=[row["id"] for row in rows])
 
 
 @router.post("/", response_model=TaskSchema)
 def create_task(
     task: TaskCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_ingest_principal)
 ):
-    """Create new task"""
-    # Check if session_id already exists
+    """Create new task (Bearer token or project API key)"""
+    if not principal.can_access_project(task.project_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="API key is not valid for this project"
+        )
+    
+    # Check if session_id already exists (under a lock: the partitioned table
+    # can't enforce its uniqueness itself)
+    advisory_xact_lock(db, f"tasks.session_id:{task.session_id}")
     existing_task = db.query(Task).filter(Task.session_id == task.session_id).first()
+    if not existing_task:
+        # Archived tasks keep their session ids
+        existing_task = db.query(ArchivedTask).filter(ArchivedTask.session_id == task.session_id).first()
     if existing_task:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Session ID already exists"
         )
     
-    db_task = Task(**task.dict())
+    db_task = Task(**environments.intern_fields(db, task.dict()))
     db.add(db_task)
+    db.flush()
+    apply_task_cost_change(
+        db, db_task.project_id, task.cost_usd, task.input_tokens + task.output_tokens
+    )
+    if task.cost_breakdown:
+        model_usage.replace_usage(db, [db_task])
     db.commit()
     db.refresh(db_task)
     
-    return db_task
+    return environments.attach(db, [db_task])[0]
+
+
+EXPAND_OPTIONS = ("steps", "files", "environment")
+
+
+def _encode_cursor(*values) -> str:
+    return base64.urlsafe_b64encode("|".join(str(value) for value in values).encode()).decode()
+
+
+def _decode_cursor(cursor: str, *parsers) -> list:
+    """Cursor values, each converted by its parser; 400 if the cursor is malformed"""
+    try:
+        values = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        if len(values) != len(parsers):
+            raise ValueError(cursor)
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except ValueError:  # also covers bad base64 and UnicodeDecodeError
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
 
 
-@router.get("/{task_id}", response_model=TaskSchema)
+def _file_key(operation) -> tuple:
+    """Keyset order of a task's file operations (ORM object or archived row)"""
+    get = operation.get if isinstance(operation, dict) else lambda name: getattr(operation, name)
+    return get("operation_timestamp"), get("id")
+
+
+def _page(items: list, limit: int, cursor_of) -> dict:
+    """A page from `limit + 1` fetched items; the extra one only says there is more"""
+    more = len(items) > limit
+    items = items[:limit]
+    return {"items": items, "next_cursor": cursor_of(items[-1]) if more else None}
+
+
+def _steps_page(db: Session, task_id: uuid.UUID, limit: int, cursor: Optional[str]) -> dict:
+    query = db.query(TaskStep).filter(*_child_filters(TaskStep, task_id))
+    if cursor:
+        after, = _decode_cursor(cursor, int)
+        query = query.filter(TaskStep.step_number > after)
+    steps = query.order_by(TaskStep.step_number).limit(limit + 1).all()
+    return _page(steps, limit, lambda step: _encode_cursor(step.step_number))
+
+
+def _files_page(db: Session, task_id: uuid.UUID, limit: int, cursor: Optional[str]) -> dict:
+    query = db.query(FileOperation).filter(*_child_filters(FileOperation, task_id))
+    if cursor:
+        after = _decode_cursor(cursor, datetime.fromisoformat, uuid.UUID)
+        query = query.filter(tuple_(FileOperation.operation_timestamp, FileOperation.id) > tuple_(*after))
+    files = query.order_by(FileOperation.operation_timestamp, FileOperation.id).limit(limit + 1).all()
+    return _page(files, limit, lambda operation: _encode_cursor(*_file_key(operation)))
+
+
+def _archived_page(items: List[dict], limit: int, cursor: Optional[str], key, cursor_of) -> dict:
+    """Same paging over an archived task's rows, which are loaded whole"""
+    items = sorted(items, key=key)
+    if cursor:
+        after = next((index for index, item in enumerate(items) if cursor_of(item) == cursor), None)
+        if after is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        items = items[after + 1:]
+    return _page(items[:limit + 1], limit, cursor_of)
+
+
+def _environment_profile(db: Session, profile_id: Optional[int]) -> Optional[EnvironmentProfileSchema]:
+    profile = db.get(EnvironmentProfile, profile_id) if profile_id is not None else None
+    return EnvironmentProfileSchema.model_validate(profile) if profile else None
+
+
+@router.get("/{task_id}", response_model=TaskDetail)
 def read_task(
     task_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    expand: Optional[str] = Query(None, description="Comma-separated parts to include: steps, files, environment"),
+    steps_limit: int = Query(100, ge=1, le=1000, description="Steps per page when expanding steps"),
+    steps_cursor: Optional[str] = Query(None, description="next_cursor of the previous steps page"),
+    files_limit: int = Query(100, ge=1, le=1000, description="File operations per page when expanding files"),
+    files_cursor: Optional[str] = Query(None, description="next_cursor of the previous files page"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get task by ID"""
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
+    """Get task by ID (falls back to the cold archive).
+    
+    With `expand`, the task's steps and/or file operations come back in the
+    same response, one query each, a page at a time, and/or its environment
+    profile.
+    """
+    expanded = {name.strip() for name in expand.split(",") if name.strip()} if expand else set()
+    unknown = expanded.difference(EXPAND_OPTIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown expand option(s): {', '.join(sorted(unknown))}"
+        )
+    
+    task = db.query(Task).filter(*_task_filters(task_id)).first()
+    if task:
+        # Only the Task fields: `steps` would otherwise lazy-load the relationship
+        fields = {name: getattr(task, name) for name in TaskSchema.model_fields}
+        detail = TaskDetail.model_validate(environments.attach(db, [fields])[0])
+        if "environment" in expanded:
+            detail.environment = _environment_profile(db, task.environment_profile_id)
+        if "steps" in expanded:
+            detail.steps = TaskStepPage.model_validate(_steps_page(db, task_id, steps_limit, steps_cursor))
+        if "files" in expanded:
+            detail.files = FileOperationPage.model_validate(_files_page(db, task_id, files_limit, files_cursor))
+        return detail
+    
+    entry = _archived_task_or_404(db, task_id)
+    archived = archive.load_task(entry)
+    if archived is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
-    return task
+    detail = TaskDetail.model_validate(environments.attach(db, [archived])[0])
+    if "environment" in expanded:
+        detail.environment = _environment_profile(db, archived.get("environment_profile_id"))
+    if "steps" in expanded:
+        detail.steps = TaskStepPage.model_validate(_archived_page(
+            archive.load_steps(entry), steps_limit, steps_cursor,
+            key=lambda step: step["step_number"],
+            cursor_of=lambda step: _encode_cursor(step["step_number"]),
+        ))
+    if "files" in expanded:
+        detail.files = FileOperationPage.model_validate(_archived_page(
+            archive.load_file_operations(entry), files_limit, files_cursor,
+            key=lambda operation: (operation["operation_timestamp"] is None, *_file_key(operation)),
+            cursor_of=lambda operation: _encode_cursor(*_file_key(operation)),
+        ))
+    return detail
 
 
 @router.put("/{task_id}", response_model=TaskSchema)
@@ -89,24 +473,37 @@ def update_task(
     task_id: uuid.UUID,
     task_update: TaskUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_ingest_principal)
 ):
-    """Update task"""
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
+    """Update task (Bearer token or project API key)"""
+    task = db.query(Task).filter(*_task_filters(task_id)).first()
+    if not task or not principal.can_access_project(task.project_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
     
-    update_data = task_update.dict(exclude_unset=True)
+    old_cost = task.cost_usd or 0
+    old_tokens = (task.input_tokens or 0) + (task.output_tokens or 0)
+    
+    update_data = environments.intern_fields(db, task_update.dict(exclude_unset=True))
     for field, value in update_data.items():
         setattr(task, field, value)
     
+    apply_task_cost_change(
+        db,
+        task.project_id,
+        (task.cost_usd or 0) - old_cost,
+        (task.input_tokens or 0) + (task.output_tokens or 0) - old_tokens
+    )
+    if "cost_breakdown" in update_data:
+        model_usage.replace_usage(db, [task])
+    elif "status" in update_data:
+        model_usage.set_usage_status(db, [task.id], task.status)
     db.commit()
     db.refresh(task)
     
-    return task
+    return environments.attach(db, [task])[0]
 
 
 @router.delete("/{task_id}")
@@ -116,13 +513,25 @@ def delete_task(
     current_user: User = Depends(get_current_user)
 ):
     """Delete task"""
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = db.query(Task).filter(*_task_filters(task_id)).first()
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
     
+    apply_task_cost_change(
+        db,
+        task.project_id,
+        -(task.cost_usd or 0),
+        -((task.input_tokens or 0) + (task.output_tokens or 0))
+    )
+    # Explicitly: the relationships are passive_deletes, and SQLite enforces
+    # neither the FK cascade nor the partition trigger
+    for model in (TaskStep, FileOperation):
+        db.query(model).filter(*_child_filters(model, task_id)).delete(synchronize_session=False)
+    db.query(FileSnapshot).filter(FileSnapshot.task_id == task_id).delete(synchronize_session=False)
+    db.query(TaskModelUsage).filter(TaskModelUsage.task_id == task_id).delete(synchronize_session=False)
     db.delete(task)
     db.commit()
     
@@ -132,52 +541,192 @@ def delete_task(
 @router.get("/{task_id}/steps", response_model=List[TaskStepSchema])
 def get_task_steps(
     task_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all steps for a task"""
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
+    steps = db.query(TaskStep).filter(*_child_filters(TaskStep, task_id)).order_by(TaskStep.step_number).all()
+    # Only an empty result needs the task looked up
+    if not steps and not _task_exists(db, task_id):
+        return archive.load_steps(_archived_task_or_404(db, task_id))
+    return steps
+
+
+@router.post("/{task_id}/steps", response_model=TaskStepSchema)
+def create_task_step(
+    task_id: uuid.UUID,
+    step: TaskStepCreate,
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_ingest_principal)
+):
+    """Record a step, optionally nested under another (Bearer token or project API key)"""
+    task = db.query(Task.project_id).filter(*_task_filters(task_id)).first()
+    if not task or not principal.can_access_project(task.project_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
     
-    steps = db.query(TaskStep).filter(TaskStep.task_id == task_id).order_by(TaskStep.step_number).all()
-    return steps
+    if step.parent_step_id is not None:
+        parent = db.query(TaskStep.id).filter(
+            TaskStep.id == step.parent_step_id, *_child_filters(TaskStep, task_id)
+        ).first()
+        if not parent:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Parent step not found in this task"
+            )
+    
+    # Numbers are unique per task, enforced here for the partitioned table
+    advisory_xact_lock(db, f"task_steps:{task_id}")
+    step_data = step.dict()
+    if step_data["step_number"] is None:
+        last_number = db.query(func.max(TaskStep.step_number)).filter(*_child_filters(TaskStep, task_id)).scalar()
+        step_data["step_number"] = (last_number or 0) + 1
+    elif db.query(TaskStep.id).filter(
+        TaskStep.step_number == step_data["step_number"], *_child_filters(TaskStep, task_id)
+    ).first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Step number already exists"
+        )
+    
+    db_step = TaskStep(task_id=task_id, **step_data)
+    db.add(db_step)
+    # Activity keeps the task from being swept as stale
+    db.query(Task).filter(*_task_filters(task_id)).update(
+        {Task.updated_at: func.now()}, synchronize_session=False
+    )
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Step number already exists"
+        )
+    db.refresh(db_step)
+    
+    return db_step
 
 
-@router.get("/{task_id}/files", response_model=List[FileOperationSchema])
-def get_task_files(
+@router.post("/{task_id}/events", response_model=TaskEventBatchResult)
+def record_task_events(
     task_id: uuid.UUID,
+    batch: TaskEventBatch,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_ingest_principal)
 ):
-    """Get all file operations for a task"""
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
+    """Record a batch of steps, log entries and file operations (Bearer token or project API key)"""
+    task_filters = _task_filters(task_id)
+    task = db.query(Task.project_id).filter(*task_filters).first()
+    if not task or not principal.can_access_project(task.project_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
     
-    files = db.query(FileOperation).filter(FileOperation.task_id == task_id).order_by(FileOperation.operation_timestamp).all()
+    window = created_at_window(task_id)
+    try:
+        result = events.record_events(db, task_id, task_filters, batch, window[0] if window else None)
+        db.commit()
+    except events.IdConflict as exc:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(exc)
+        )
+    except events.InvalidBatch as exc:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Step number already exists"
+        )
+    
+    return result
+
+
+@router.get("/{task_id}/steps/tree", response_model=List[TaskStepNode])
+def get_task_step_tree(
+    task_id: uuid.UUID,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a task's steps as a tree, with duration, token and cost totals per subtree"""
+    window = created_at_window(task_id)
+    tree = load_step_tree(db, task_id, window[0] if window else None)
+    if not tree and not _task_exists(db, task_id):
+        return build_step_tree(archive.load_steps(_archived_task_or_404(db, task_id)))
+    return tree
+
+
+@router.get("/{task_id}/files", response_model=List[FileOperationSchema])
+def get_task_files(
+    task_id: uuid.UUID,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get all file operations for a task"""
+    files = db.query(FileOperation).filter(*_child_filters(FileOperation, task_id)).order_by(FileOperation.operation_timestamp).all()
+    if not files and not _task_exists(db, task_id):
+        return archive.load_file_operations(_archived_task_or_404(db, task_id))
     return files
 
 
+@router.get("/{task_id}/replay", response_model=WorkspaceState)
+def replay_task_files(
+    task_id: uuid.UUID,
+    step_number: Optional[int] = Query(None, description="Replay up to the end of this step (default: all operations)"),
+    path: Optional[str] = Query(None, description="Only return this file"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Rebuild the task's files as they were after a step"""
+    if not _task_exists(db, task_id):
+        operations = archive.load_file_operations(_archived_task_or_404(db, task_id))
+        workspace = replay.replay_operations(task_id, operations, step_number)
+    else:
+        window = created_at_window(task_id)
+        workspace = replay.rebuild_workspace(db, task_id, step_number, window[0] if window else None)
+        # Checkpoints are best effort; a concurrent replay may have stored them
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+    
+    files = workspace.files
+    if path is not None:
+        files = {path: files[path]} if path in files else {}
+    return {
+        "task_id": task_id,
+        "step_number": step_number,
+        "operations_applied": workspace.operations_applied,
+        "checkpoint_operations": workspace.checkpoint_operations,
+        "from_cache": workspace.from_cache,
+        "files": [
+            {"path": file_path, "content": content, "content_known": content is not None}
+            for file_path, content in sorted(files.items())
+        ],
+    }
+
+
 @router.get("/{task_id}/logs")
 def get_task_logs(
     task_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get task execution logs"""
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = db.query(Task).filter(*_task_filters(task_id)).first()
     if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
-        )
+        archived = archive.load_task(_archived_task_or_404(db, task_id))
+        return {"logs": archived["logs"] if archived else []}
     
     return {"logs": task.logs}
 
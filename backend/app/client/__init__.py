@@ -0,0 +1,10 @@
+"""Python client for agents reporting tasks to the monitoring API.
+
+Steps, log entries and file operations are buffered and sent in batches by
+a background thread, so instrumenting an agent costs microseconds per event.
+See MonitoringClient for usage.
+"""
+from .session import MonitoringClient, Step, TaskSession
+from .transport import ClientError
+
+__all__ = ["MonitoringClient", "TaskSession", "Step", "ClientError"]
@@ -0,0 +1,179 @@
+"""Background batching of task events.
+
+Events are appended to an in-memory buffer and sent by one worker thread,
+grouped per task into POST /tasks/{task_id}/events calls. A batch goes out
+once `max_batch_events` are waiting or `flush_interval` seconds after the
+last one, whichever comes first, so recording an event never waits on the
+network.
+
+The buffer holds at most `max_buffer_events`. When the API can't keep up
+and it fills, low-priority events (debug and info logs) are dropped first:
+a new low-priority event is discarded, a new high-priority one evicts the
+oldest low-priority event, and only a buffer full of high-priority events
+drops high-priority ones. Drops are counted in `stats`.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Log levels that may be dropped under backpressure
+LOW_PRIORITY_LEVELS = ("debug", "info")
+
+KINDS = ("steps", "logs", "file_operations")
+
+
+@dataclass
+class Event:
+    task_id: str
+    kind: str  # one of KINDS
+    payload: object  # a pydantic model or a JSON-ready dict
+    low_priority: bool = False
+
+
+@dataclass
+class BatcherStats:
+    enqueued: int = 0
+    sent: int = 0
+    failed: int = 0  # sent but rejected, or out of retries
+    dropped_low: int = 0
+    dropped_high: int = 0
+    batches: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+def _json_ready(payload) -> object:
+    return payload.model_dump(mode="json", exclude_none=True) if hasattr(payload, "model_dump") else payload
+
+
+class EventBatcher:
+    """Buffers events and sends them in batches from a background thread"""
+
+    def __init__(
+        self,
+        send: Callable[[str, Dict[str, list]], None],
+        flush_interval: float = 1.0,
+        max_batch_events: int = 500,
+        max_buffer_events: int = 10000,
+    ):
+        self.send = send
+        self.flush_interval = flush_interval
+        self.max_batch_events = max_batch_events
+        self.max_buffer_events = max_buffer_events
+        self.stats = BatcherStats()
+        self._buffer: Deque[Event] = deque()
+        self._low_count = 0
+        self._in_flight = 0
+        self._flush_requested = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._worker = threading.Thread(target=self._run, name="monitoring-event-batcher", daemon=True)
+        self._worker.start()
+
+    def put(self, event: Event) -> bool:
+        """Queue an event; False if it was dropped"""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Event batcher is closed")
+            self.stats.enqueued += 1
+            if len(self._buffer) >= self.max_buffer_events and not self._make_room(event):
+                return False
+            self._buffer.append(event)
+            self._low_count += event.low_priority
+            if len(self._buffer) >= self.max_batch_events:
+                self._condition.notify_all()
+        return True
+
+    def _make_room(self, event: Event) -> bool:
+        if event.low_priority or not self._low_count:
+            if event.low_priority:
+                self.stats.dropped_low += 1
+            else:
+                self.stats.dropped_high += 1
+                if self.stats.dropped_high == 1:
+                    logger.warning("Event buffer full of high-priority events; dropping events")
+            return False
+        for index, queued in enumerate(self._buffer):
+            if queued.low_priority:
+                del self._buffer[index]
+                self._low_count -= 1
+                self.stats.dropped_low += 1
+                return True
+        return False  # unreachable while _low_count is right
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Send everything queued so far; False if `timeout` ran out first"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            while self._buffer or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Flush, then stop the worker thread"""
+        flushed = self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._worker.join(timeout)
+        return flushed
+
+    def _take_batch(self) -> List[Event]:
+        """Wait for a batch to be due and take it off the buffer (called holding the lock)"""
+        deadline = time.monotonic() + self.flush_interval
+        while not self._closed:
+            if len(self._buffer) >= self.max_batch_events or (self._flush_requested and self._buffer):
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if self._buffer:
+                    break
+                deadline = time.monotonic() + self.flush_interval
+                remaining = self.flush_interval
+            self._condition.wait(remaining)
+        count = min(len(self._buffer), self.max_batch_events)
+        batch = [self._buffer.popleft() for _ in range(count)]
+        self._low_count -= sum(event.low_priority for event in batch)
+        if not self._buffer:
+            self._flush_requested = False
+        self._in_flight = len(batch)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                batch = self._take_batch()
+                if not batch and self._closed:
+                    return
+            try:
+                self._send_batch(batch)
+            finally:
+                with self._condition:
+                    self._in_flight = 0
+                    self._condition.notify_all()
+
+    def _send_batch(self, batch: List[Event]) -> None:
+        per_task: Dict[str, Dict[str, list]] = {}
+        for event in batch:
+            events = per_task.setdefault(event.task_id, {kind: [] for kind in KINDS})
+            events[event.kind].append(_json_ready(event.payload))
+        for task_id, events in per_task.items():
+            count = sum(len(items) for items in events.values())
+            try:
+                self.send(task_id, events)
+            except Exception as exc:  # the worker must survive any failure
+                logger.error("Dropping %d events for task %s: %s", count, task_id, exc)
+                self.stats.failed += count
+                self.stats.errors = (self.stats.errors + [str(exc)])[-10:]
+            else:
+                self.stats.sent += count
+                self.stats.batches += 1
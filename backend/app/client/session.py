@@ -0,0 +1,225 @@
+"""Client entry points: MonitoringClient and the TaskSession context manager."""
+import contextvars
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from ..core.ids import uuid7
+from ..schemas.file_operation import FileOperationCreate
+from ..schemas.task import TaskCreate, TaskUpdate
+from ..schemas.task_step import TaskStepCreate
+from .batcher import LOW_PRIORITY_LEVELS, Event, EventBatcher
+from .transport import Transport
+
+# The innermost open step of the current thread/task, parent of new steps
+_current_step: contextvars.ContextVar[Optional["Step"]] = contextvars.ContextVar("monitoring_step", default=None)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class Step:
+    """An open step (span); recorded when the `with` block ends"""
+
+    def __init__(self, session: "TaskSession", step_number: int, parent: Optional["Step"], fields: Dict[str, Any]):
+        self.session = session
+        self.id = uuid7()
+        self.step_number = step_number
+        self.parent = parent
+        self.fields = fields
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost_usd = Decimal(0)
+        self.result_data: Dict[str, Any] = fields.pop("result_data", None) or {}
+        self._token = None
+
+    def record_usage(self, input_tokens: int = 0, output_tokens: int = 0, cost_usd=0, model: Optional[str] = None) -> None:
+        """Tokens and cost this step used itself (not its children); added to the task totals"""
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.cost_usd += Decimal(str(cost_usd))
+        self.session.record_usage(input_tokens, output_tokens, cost_usd, model)
+
+    def __enter__(self) -> "Step":
+        self.start_time = _now()
+        self._token = _current_step.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        _current_step.reset(self._token)
+        end_time = _now()
+        failed = exc_type is not None
+        self.session._step_finished(failed)
+        self.session._enqueue("steps", TaskStepCreate(
+            id=self.id,
+            parent_step_id=self.parent.id if self.parent else None,
+            step_number=self.step_number,
+            status="failed" if failed else "completed",
+            start_time=self.start_time,
+            end_time=end_time,
+            duration_seconds=int((end_time - self.start_time).total_seconds()),
+            input_tokens=self.input_tokens,
+            output_tokens=self.output_tokens,
+            step_cost_usd=self.cost_usd,
+            result_data=self.result_data,
+            error_message=str(exc) if failed else None,
+            **self.fields,
+        ))
+
+
+class TaskSession:
+    """One monitored task, from creation to its final status.
+
+    Entering creates the task; leaving flushes its events and records the
+    final status and totals (failed, with the error, if the block raised).
+    """
+
+    def __init__(self, client: "MonitoringClient", task: TaskCreate):
+        self.client = client
+        self.task = task
+        self.task_id: Optional[str] = None
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost_usd = Decimal(0)
+        self.total_steps = self.completed_steps = self.failed_steps = 0
+        self.files = {"create": 0, "modify": 0, "delete": 0}
+        self.cost_breakdown: Dict[str, Dict[str, Any]] = {}
+
+    def __enter__(self) -> "TaskSession":
+        self.start_time = _now()
+        task = self.task.model_copy(update={"status": "running", "start_time": self.start_time})
+        # Not idempotent: a retried create could collide with its own session_id
+        created = self.client.transport.request("POST", "/tasks/", task.model_dump(mode="json"), idempotent=False)
+        self.task_id = created["id"]
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.client.batcher.flush(self.client.flush_timeout)
+        end_time = _now()
+        update = TaskUpdate(
+            status="failed" if exc_type is not None else "completed",
+            end_time=end_time,
+            duration_seconds=int((end_time - self.start_time).total_seconds()),
+            input_tokens=self.input_tokens,
+            output_tokens=self.output_tokens,
+            cost_usd=self.cost_usd,
+            total_steps=self.total_steps,
+            completed_steps=self.completed_steps,
+            failed_steps=self.failed_steps,
+            files_created=self.files["create"],
+            files_modified=self.files["modify"],
+            files_deleted=self.files["delete"],
+            cost_breakdown=self.cost_breakdown or None,
+            error_message=str(exc) if exc_type is not None else None,
+        )
+        self.client.transport.request(
+            "PUT", f"/tasks/{self.task_id}", update.model_dump(mode="json", exclude_none=True)
+        )
+
+    def _enqueue(self, kind: str, payload, low_priority: bool = False) -> bool:
+        return self.client.batcher.put(Event(self.task_id, kind, payload, low_priority))
+
+    def _step_finished(self, failed: bool) -> None:
+        if failed:
+            self.failed_steps += 1
+        else:
+            self.completed_steps += 1
+
+    def record_usage(self, input_tokens: int = 0, output_tokens: int = 0, cost_usd=0, model: Optional[str] = None) -> None:
+        """Add to the task's token and cost totals, and per `model` to its cost_breakdown (sent when the session ends)"""
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.cost_usd += Decimal(str(cost_usd))
+        if model is not None:
+            usage = self.cost_breakdown.setdefault(model, {"input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0})
+            usage["input_tokens"] += input_tokens
+            usage["output_tokens"] += output_tokens
+            usage["cost_usd"] += float(cost_usd)
+
+    def step(self, step_name: str, step_type: Optional[str] = None, **fields) -> Step:
+        """A step, nested under the step open around it:
+
+            with session.step("plan") as plan:
+                with session.step("call llm", step_type="llm_call") as call:
+                    call.record_usage(input_tokens=1200, output_tokens=300, cost_usd="0.004", model="gpt-4o")
+        """
+        self.total_steps += 1
+        return Step(self, self.total_steps, _current_step.get(), dict(step_name=step_name, step_type=step_type, **fields))
+
+    def log(self, message: str, level: str = "info", **fields) -> bool:
+        """Append a log entry; debug and info entries may be dropped under backpressure"""
+        entry = {"timestamp": _now().isoformat(), "level": level, "message": message, **fields}
+        return self._enqueue("logs", entry, low_priority=level.lower() in LOW_PRIORITY_LEVELS)
+
+    def file_operation(self, file_path: str, operation_type: str, **fields) -> bool:
+        """Record a create/modify/delete of a file"""
+        step = _current_step.get()
+        if step is not None:
+            fields.setdefault("step_number", step.step_number)
+        fields.setdefault("operation_timestamp", _now())
+        if operation_type in self.files:
+            self.files[operation_type] += 1
+        return self._enqueue("file_operations", FileOperationCreate(
+            id=uuid7(), file_path=file_path, operation_type=operation_type, **fields
+        ))
+
+
+class MonitoringClient:
+    """Client for agents reporting to the monitoring API.
+
+        client = MonitoringClient("https://monitor.example.com/api/v1", api_key="...")
+        with client.session(project_id=..., name="Fix login bug", session_id=run_id) as session:
+            session.log("starting")
+            with session.step("edit files"):
+                session.file_operation("app/login.py", "modify", diff_content=diff)
+        client.close()
+
+    Events are batched in a background thread (see batcher.py); `stats`
+    counts what was sent, failed and dropped.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str] = None,
+        token: Optional[str] = None,
+        flush_interval: float = 1.0,
+        max_batch_events: int = 500,
+        max_buffer_events: int = 10000,
+        flush_timeout: Optional[float] = 30.0,
+        **transport_options,
+    ):
+        self.transport = Transport(base_url, api_key=api_key, token=token, **transport_options)
+        self.flush_timeout = flush_timeout
+        self.batcher = EventBatcher(
+            self._send_events,
+            flush_interval=flush_interval,
+            max_batch_events=max_batch_events,
+            max_buffer_events=max_buffer_events,
+        )
+
+    @property
+    def stats(self):
+        return self.batcher.stats
+
+    def _send_events(self, task_id: str, events: Dict[str, List[Any]]) -> None:
+        self.transport.request("POST", f"/tasks/{task_id}/events", events)
+
+    def session(self, project_id, name: str, session_id: Optional[str] = None, **fields) -> TaskSession:
+        """A TaskSession for a new task; fields are those of TaskCreate"""
+        task = TaskCreate(project_id=project_id, name=name, session_id=session_id or str(uuid.uuid4()), **fields)
+        return TaskSession(self, task)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        return self.batcher.flush(timeout)
+
+    def close(self) -> None:
+        self.batcher.close(self.flush_timeout)
+        self.transport.close()
+
+    def __enter__(self) -> "MonitoringClient":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
@@ -0,0 +1,110 @@
+"""HTTP transport for the client: auth, JSON, gzip request bodies, retries."""
+import gzip
+import json
+import logging
+import random
+import time
+from typing import Any, Optional
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Worth retrying: the server was busy (admission control) or unreachable
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+class ClientError(Exception):
+    """A request failed for good (non-retryable status, or out of retries)"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class Transport:
+    """Sends JSON requests to the monitoring API.
+
+    Failed attempts are retried with full-jitter exponential backoff (a
+    random wait up to `backoff_base * 2**attempt`, capped at `backoff_max`)
+    or after the server's Retry-After. Bodies of at least
+    `compress_min_bytes` are sent gzipped.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str] = None,
+        token: Optional[str] = None,
+        timeout: float = 10.0,
+        max_retries: int = 5,
+        backoff_base: float = 0.2,
+        backoff_max: float = 10.0,
+        compress_min_bytes: int = 1024,
+        http_client: Optional[httpx.Client] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.compress_min_bytes = compress_min_bytes
+        self.headers = {"Content-Type": "application/json", "Accept-Encoding": "gzip"}
+        if api_key:
+            self.headers["X-API-Key"] = api_key
+        elif token:
+            self.headers["Authorization"] = f"Bearer {token}"
+        self._owns_client = http_client is None
+        self.http = http_client or httpx.Client(timeout=timeout)
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass  # an HTTP date; fall back to backoff
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def request(self, method: str, path: str, payload: Any = None, idempotent: bool = True) -> Any:
+        """Send a request and return the decoded JSON response.
+
+        Requests that are not `idempotent` are only retried when the server
+        cannot have acted on them: connection failures and 429/503 (turned
+        away by admission control).
+        """
+        headers = dict(self.headers)
+        content = None
+        if payload is not None:
+            content = json.dumps(payload, separators=(",", ":")).encode()
+            if len(content) >= self.compress_min_bytes:
+                content = gzip.compress(content, compresslevel=6)
+                headers["Content-Encoding"] = "gzip"
+
+        url = f"{self.base_url}{path}"
+        attempt = 0
+        while True:
+            response = None
+            try:
+                response = self.http.request(method, url, content=content, headers=headers)
+            except httpx.TransportError as exc:
+                retryable = idempotent or isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout))
+                if not retryable or attempt >= self.max_retries:
+                    raise ClientError(f"{method} {path} failed: {exc}") from exc
+            else:
+                if response.status_code < 400:
+                    return response.json() if response.content else None
+                retryable = response.status_code in RETRY_STATUSES and (
+                    idempotent or response.status_code in (429, 503)
+                )
+                if not retryable or attempt >= self.max_retries:
+                    raise ClientError(
+                        f"{method} {path} returned {response.status_code}: {response.text}",
+                        response.status_code,
+                    )
+            delay = self._backoff(attempt, response)
+            logger.debug("Retrying %s %s in %.2fs (attempt %d)", method, path, delay, attempt + 1)
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self) -> None:
+        if self._owns_client:
+            self.http.close()
@@ -0,0 +1,200 @@
+import asyncio
+import json
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from .cache import TTLCache
+from .config import settings
+from .security import client_key
+
+# Paths that are never throttled (probes, docs)
+EXEMPT_PATHS = {"/", "/health", "/metrics", "/docs", "/redoc", "/openapi.json"}
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+@dataclass
+class RouteClass:
+    """Admission limits shared by a group of routes"""
+    name: str
+    max_concurrency: int
+    max_wait_seconds: float  # queueing budget before a request is shed
+    rate_per_second: float  # token-bucket refill per client
+    burst: int  # token-bucket capacity per client
+    yields_to: Optional[str] = None  # shed immediately while this class has a queue
+
+    def __post_init__(self):
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> float:
+        """Consume one token; returns 0 if allowed, else seconds until one is available"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """Per-route-class concurrency limits plus per-client token-bucket quotas.
+
+    Ingestion and analytics get separate concurrency pools so a burst of heavy
+    dashboard queries can't take the request threads ingestion needs, and
+    analytics is shed outright while ingestion has requests queued.
+    """
+
+    def __init__(self):
+        self.classes: Dict[str, RouteClass] = {
+            "ingestion": RouteClass(
+                name="ingestion",
+                max_concurrency=settings.ingestion_max_concurrency,
+                max_wait_seconds=settings.ingestion_max_wait_ms / 1000,
+                rate_per_second=settings.ingestion_rate_per_second,
+                burst=settings.ingestion_burst,
+            ),
+            "analytics": RouteClass(
+                name="analytics",
+                max_concurrency=settings.analytics_max_concurrency,
+                max_wait_seconds=settings.analytics_max_wait_ms / 1000,
+                rate_per_second=settings.analytics_rate_per_second,
+                burst=settings.analytics_burst,
+                yields_to="ingestion",
+            ),
+            "default": RouteClass(
+                name="default",
+                max_concurrency=settings.default_max_concurrency,
+                max_wait_seconds=settings.default_max_wait_ms / 1000,
+                rate_per_second=settings.default_rate_per_second,
+                burst=settings.default_burst,
+            ),
+        }
+        # Idle buckets expire; a returning client simply starts with a full bucket
+        self._buckets = TTLCache(maxsize=100000, ttl=600)
+        self._buckets_lock = threading.Lock()
+
+    def classify(self, method: str, path: str) -> Optional[RouteClass]:
+        if path in EXEMPT_PATHS:
+            return None
+        api = settings.api_v1_str
+        if path.startswith(f"{api}/analytics") or path.startswith(f"{api}/tasks/export"):
+            return self.classes["analytics"]
+        if method in WRITE_METHODS and path.startswith(f"{api}/tasks"):
+            return self.classes["ingestion"]
+        return self.classes["default"]
+
+    def _bucket(self, route_class: RouteClass, client: str) -> TokenBucket:
+        key = (route_class.name, client)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._buckets_lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = TokenBucket(route_class.rate_per_second, route_class.burst)
+                    self._buckets.set(key, bucket)
+        return bucket
+
+    def check_quota(self, route_class: RouteClass, client: str) -> float:
+        return self._bucket(route_class, client).take()
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                "in_flight": route_class.in_flight,
+                "waiting": route_class.waiting,
+                "rejected": route_class.rejected,
+                "max_concurrency": route_class.max_concurrency,
+            }
+            for name, route_class in self.classes.items()
+        }
+
+
+async def _reject(send, status_code: int, detail: str, retry_after: float) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """ASGI middleware enforcing AdmissionController limits.
+
+    Over-quota clients get 429, requests that would queue past their class's
+    latency budget get 503; both carry Retry-After.
+    """
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = self.controller.classify(scope["method"], scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = self.controller.check_quota(route_class, client_key(scope))
+        if retry_after:
+            route_class.rejected += 1
+            await _reject(send, 429, "Rate limit exceeded", retry_after)
+            return
+
+        if route_class.yields_to:
+            preferred = self.controller.classes[route_class.yields_to]
+            if preferred.waiting:
+                route_class.rejected += 1
+                await _reject(send, 503, f"Server busy with {preferred.name} traffic", 1)
+                return
+
+        if not await self._acquire(route_class):
+            route_class.rejected += 1
+            await _reject(send, 503, "Server busy, retry shortly", route_class.max_wait_seconds)
+            return
+
+        route_class.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route_class.in_flight -= 1
+            route_class.semaphore.release()
+
+    async def _acquire(self, route_class: RouteClass) -> bool:
+        if not route_class.semaphore.locked():
+            await route_class.semaphore.acquire()
+            return True
+        if route_class.max_wait_seconds <= 0:
+            return False
+        route_class.waiting += 1
+        try:
+            await asyncio.wait_for(route_class.semaphore.acquire(), route_class.max_wait_seconds)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            route_class.waiting -= 1
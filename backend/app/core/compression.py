@@ -0,0 +1,251 @@
+"""Compressed request and response bodies.
+
+Responses: compressible content types (JSON, NDJSON, CSV, text) of at least
+`compression_min_size` bytes are compressed with zstd or gzip, whichever
+the client's Accept-Encoding prefers (zstd on a tie). Streaming responses
+are compressed chunk by chunk and flushed after each one, so exports keep
+streaming. Bodies that already have a Content-Encoding are left alone.
+
+Requests: bodies sent with `Content-Encoding: gzip` or `zstd` are
+decompressed as they are read, before the endpoint parses them. Bodies
+inflating past `max_decompressed_body_bytes` get 413, corrupt ones 400,
+other encodings 415.
+
+zstd needs the `zstandard` package; without it only gzip is offered.
+"""
+import json
+import zlib
+from typing import List, Optional, Tuple
+from fastapi import HTTPException
+from .config import settings
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/x-ndjson", "application/problem+json",
+    "application/javascript", "application/xml", "text/",
+)
+
+# zstd's decompressobj can't cap its output and zstd can inflate ~32000:1,
+# so input is fed in small pieces and the limit checked after each: a bomb
+# overshoots by at most ~32 MiB before it is rejected
+_ZSTD_PIECE = 1024
+
+
+def supported_encodings() -> List[str]:
+    return ["zstd", "gzip"] if zstandard is not None else ["gzip"]
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Best supported encoding allowed by an Accept-Encoding header"""
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip().lower()] = quality
+    candidates = [
+        (weights.get(encoding, weights.get("*", 0.0)), -index, encoding)
+        for index, encoding in enumerate(supported_encodings())
+    ]
+    quality, _, encoding = max(candidates)
+    return encoding if quality > 0 else None
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        if encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=settings.zstd_level).compressobj()
+            self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        else:
+            self._compressor = zlib.compressobj(settings.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._flush_block = zlib.Z_SYNC_FLUSH
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        output = self._compressor.compress(data)
+        return output + (self._compressor.flush() if final else self._compressor.flush(self._flush_block))
+
+
+# HTTPExceptions, so FastAPI turns them into responses while parsing the body
+class BodyTooLarge(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=413,
+            detail=f"Decompressed body exceeds {settings.max_decompressed_body_bytes} bytes",
+        )
+
+
+class BadBody(HTTPException):
+    def __init__(self, encoding: str):
+        super().__init__(status_code=400, detail=f"Body is not valid {encoding} data")
+
+
+class _Decompressor:
+    """Incremental decompression bounded by `limit` bytes of output"""
+
+    def __init__(self, encoding: str, limit: int):
+        self.encoding = encoding
+        self.remaining = limit
+        self.received = 0
+        if encoding == "zstd":
+            self._decompressor = zstandard.ZstdDecompressor().decompressobj()
+        else:
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def _take(self, output: bytes) -> bytes:
+        self.remaining -= len(output)
+        if self.remaining < 0:
+            raise BodyTooLarge()
+        return output
+
+    def decompress(self, data: bytes) -> bytes:
+        self.received += len(data)
+        try:
+            if self.encoding == "zstd":
+                return b"".join(
+                    self._take(self._decompressor.decompress(data[offset:offset + _ZSTD_PIECE]))
+                    for offset in range(0, len(data), _ZSTD_PIECE)
+                )
+            # Ask for one byte more than allowed: getting it means too large
+            output = self._take(self._decompressor.decompress(data, self.remaining + 1))
+            if self._decompressor.unconsumed_tail:
+                raise BodyTooLarge()
+            return output
+        except (zlib.error, getattr(zstandard, "ZstdError", zlib.error)) as exc:
+            raise BadBody(self.encoding) from exc
+
+    def finish(self) -> None:
+        # An empty body is fine (clients may send the header on every request)
+        if self.encoding == "gzip" and self.received and not self._decompressor.eof:
+            raise BadBody(self.encoding)
+
+
+async def _error(send, status_code: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class CompressionMiddleware:
+    """ASGI middleware for compressed request and response bodies (see module docstring)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        request_encoding = headers.get(b"content-encoding", b"identity").decode("latin-1").strip().lower()
+        if request_encoding not in ("identity", *supported_encodings()):
+            await _error(send, 415, f"Unsupported Content-Encoding: {request_encoding}")
+            return
+        if request_encoding != "identity":
+            scope = dict(scope)
+            # The endpoint sees the decompressed body, whose length is unknown
+            scope["headers"] = [
+                (name, value) for name, value in scope["headers"]
+                if name not in (b"content-encoding", b"content-length")
+            ]
+            receive = self._decompressing(receive, request_encoding)
+
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        response_started = False
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            response_started = True
+            await send(message)
+
+        wrapped_send = send_wrapper
+        if encoding is not None:
+            wrapped_send = _CompressingSend(send_wrapper, encoding)
+
+        try:
+            await self.app(scope, receive, wrapped_send)
+        except (BodyTooLarge, BadBody) as exc:
+            # Raised outside FastAPI's body parsing (e.g. by another middleware)
+            if response_started:
+                raise
+            await _error(send, exc.status_code, exc.detail)
+
+    @staticmethod
+    def _decompressing(receive, encoding: str):
+        decompressor = _Decompressor(encoding, settings.max_decompressed_body_bytes)
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] != "http.request":
+                return message
+            body = decompressor.decompress(message.get("body", b""))
+            if not message.get("more_body", False):
+                decompressor.finish()
+            return {**message, "body": body}
+
+        return receive_wrapper
+
+
+class _CompressingSend:
+    """Wraps `send`, compressing the response once its first body chunk shows it is worth it"""
+
+    def __init__(self, send, encoding: str):
+        self.send = send
+        self.encoding = encoding
+        self.start: Optional[dict] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    def _compressible(self, headers: List[Tuple[bytes, bytes]]) -> bool:
+        names = {name.lower(): value for name, value in headers}
+        if b"content-encoding" in names:
+            return False
+        content_type = names.get(b"content-type", b"").decode("latin-1").lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            if self._compressible(message.get("headers", [])):
+                self.start = message  # held until the first body chunk
+            else:
+                self.passthrough = True
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            if not more_body and len(body) < settings.compression_min_size:
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send(message)
+                return
+            self.compressor = _Compressor(self.encoding)
+            headers = [
+                (name, value) for name, value in self.start.get("headers", [])
+                if name.lower() != b"content-length"
+            ]
+            headers += [(b"content-encoding", self.encoding.encode()), (b"vary", b"Accept-Encoding")]
+            await self.send({**self.start, "headers": headers})
+
+        await self.send({
+            "type": "http.response.body",
+            "body": self.compressor.compress(body, final=not more_body),
+            "more_body": more_body,
+        })
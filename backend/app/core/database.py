@@ -1,10 +1,35 @@
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .config import settings
+from .replicas import replica_router
+from .security import client_key
+
+
+# The models use PostgreSQL column types. Let SQLite render them too so the
+# API can run against a throwaway SQLite file (local benchmarks, smoke runs).
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+connect_args = {}
+if settings.database_url.startswith("sqlite"):
+    # Sessions are handed between threadpool workers
+    connect_args["check_same_thread"] = False
 
 # Create SQLAlchemy engine
 engine = create_engine(
-    settings.database_url
+    settings.database_url,
+    connect_args=connect_args
 )
 
 # Create SessionLocal class
@@ -14,10 +39,33 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
-def get_db():
+def get_db(request: Request):
     """Dependency to get database session"""
     db = SessionLocal()
+    # Lets replicas.py pin this client to the primary once it commits
+    db.info["client_scope"] = request.scope
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db(request: Request):
+    """Dependency to get a session for read-only endpoints.
+    
+    Bound to a read replica when one is configured, healthy and caught up,
+    and the client hasn't just written; otherwise to the primary.
+    """
+    replica = None
+    if replica_router.replicas and not replica_router.is_pinned(client_key(request.scope)):
+        replica = replica_router.choose()
+    
+    db = replica.session_factory() if replica else SessionLocal()
     try:
         yield db
+    except OperationalError:
+        if replica:
+            replica_router.mark_unhealthy(replica)
+        raise
     finally:
         db.close()
@@ -0,0 +1,22 @@
+"""Time-ordered ids, shared by the server and the client package.
+
+Standard library only: app.client imports this without pulling in any of
+the server's dependencies.
+"""
+import os
+import time
+import uuid
+
+
+def uuid7() -> uuid.UUID:
+    """Time-ordered UUID (RFC 9562 version 7): 48-bit ms timestamp + random"""
+    return uuid7_at(int(time.time() * 1000), int.from_bytes(os.urandom(10), "big"))
+
+
+def uuid7_at(unix_ms: int, random_bits: int) -> uuid.UUID:
+    """Version-7 UUID for a given timestamp, e.g. for backfilled or generated rows"""
+    value = (unix_ms & ((1 << 48) - 1)) << 80
+    value |= random_bits & ((1 << 80) - 1)
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # variant
+    return uuid.UUID(int=value)
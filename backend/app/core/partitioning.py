@@ -0,0 +1,196 @@
+"""Monthly range partitioning of the high-volume tables on created_at.
+
+The partitioned layout is created by the Alembic migration
+`c5a8e1f47d20_partition_time_series_tables`. This module creates future
+partitions, detaches old ones for retention, and maps time-ordered ids back
+to a created_at window so lookups by id still prune partitions.
+
+    python -m app.core.partitioning ensure --months-ahead 3
+    python -m app.core.partitioning detach 2025-01 [--drop]
+
+Workers also run `ensure` at startup and every
+`partition_check_interval_seconds` (see app/main.py).
+"""
+import argparse
+import logging
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("tasks", "task_steps", "file_operations")
+
+# Allowance for clock skew between the app (which stamps ids) and the
+# database (which stamps created_at)
+ID_CLOCK_SLACK = timedelta(days=1)
+
+
+def created_at_window(record_id) -> Optional[Tuple[datetime, datetime]]:
+    """created_at bounds implied by a version-7 id, None for other ids"""
+    if not isinstance(record_id, uuid.UUID):
+        try:
+            record_id = uuid.UUID(str(record_id))
+        except ValueError:
+            return None
+    if record_id.version != 7:
+        return None
+    stamped = datetime.fromtimestamp((record_id.int >> 80) / 1000, tz=timezone.utc)
+    return stamped - ID_CLOCK_SLACK, stamped + ID_CLOCK_SLACK
+
+
+def advisory_xact_lock(db, key: str) -> None:
+    """Serialize writers on `key` until the current transaction ends.
+
+    Partitioned tables can't have unique constraints without the partition
+    key, so tasks.session_id and task_steps (task_id, step_number) are checked
+    under this lock instead. PostgreSQL only; elsewhere the tables are not
+    partitioned and keep their constraints.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": key})
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    month_index = value.year * 12 + value.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+def is_partitioned(connection: Connection, table: str) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+    return bool(connection.execute(
+        text("SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+             "WHERE c.relname = :table AND pg_table_is_visible(c.oid)"),
+        {"table": table},
+    ).scalar())
+
+
+def list_partitions(connection: Connection, table: str) -> List[str]:
+    return list(connection.execute(
+        text("SELECT child.relname FROM pg_inherits "
+             "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+             "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+             "WHERE parent.relname = :table ORDER BY child.relname"),
+        {"table": table},
+    ).scalars())
+
+
+def default_partition_name(table: str) -> str:
+    """The DEFAULT partition created by the migration, catching rows outside every month"""
+    return f"{table}_default"
+
+
+def create_month_partition(connection: Connection, table: str, month: date) -> bool:
+    """Create the partition holding `month`; returns False if it already exists.
+
+    Rows of that month already caught by the DEFAULT partition would make a
+    plain CREATE fail, so they are moved into the new partition: DEFAULT is
+    detached, the month created, the rows moved (with DEFAULT's triggers off,
+    so moving tasks doesn't delete their children) and DEFAULT re-attached.
+    """
+    name = partition_name(table, month)
+    partitions = list_partitions(connection, table)
+    if name in partitions:
+        return False
+    bounds = f"FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    in_month = f"created_at >= '{month.isoformat()}' AND created_at < '{add_months(month, 1).isoformat()}'"
+    default = default_partition_name(table)
+    stranded = default in partitions and connection.execute(
+        text(f"SELECT 1 FROM {default} WHERE {in_month} LIMIT 1")
+    ).scalar()
+    if not stranded:
+        connection.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}"))
+        return True
+
+    connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    connection.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}"))
+    connection.execute(text(f"ALTER TABLE {default} DISABLE TRIGGER USER"))
+    moved = connection.execute(text(
+        f"WITH moved AS (DELETE FROM {default} WHERE {in_month} RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    )).rowcount
+    connection.execute(text(f"ALTER TABLE {default} ENABLE TRIGGER USER"))
+    connection.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+    logger.warning("Moved %d rows of %s from %s into the new partition %s", moved, month, default, name)
+    return True
+
+
+def ensure_future_partitions(connection: Connection, months_ahead: int = 3) -> List[str]:
+    """Make sure partitions exist from the current month to `months_ahead` out.
+
+    Safe to call repeatedly (startup, periodically, CLI). Each partition is
+    created in its own savepoint: one that fails is logged and skipped, and
+    the rest are still created. No-op unless the tables are partitioned, so
+    it also does nothing on SQLite.
+    """
+    created = []
+    if connection.dialect.name == "postgresql":
+        # Every worker runs this; let one at a time create partitions
+        connection.execute(text("SELECT pg_advisory_xact_lock(hashtext('ensure_future_partitions'))"))
+    current = month_start(datetime.now(timezone.utc).date())
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(connection, table):
+            continue
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            try:
+                with connection.begin_nested():
+                    if create_month_partition(connection, table, month):
+                        created.append(partition_name(table, month))
+            except Exception:
+                logger.exception("Creating partition %s failed", partition_name(table, month))
+    return created
+
+
+def detach_month(connection: Connection, month: date, drop: bool = False) -> List[str]:
+    """Detach (and optionally drop) one month from every partitioned table.
+
+    Detaching is a metadata-only operation, so retention no longer needs huge
+    DELETEs; the detached tables can be archived or dropped at leisure.
+    """
+    detached = []
+    month = month_start(month)
+    for table in PARTITIONED_TABLES:
+        name = partition_name(table, month)
+        if name not in list_partitions(connection, table):
+            continue
+        connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        if drop:
+            connection.execute(text(f"DROP TABLE {name}"))
+        detached.append(name)
+    return detached
+
+
+def main():
+    from .database import engine
+
+    parser = argparse.ArgumentParser(description="Manage monthly partitions")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ensure = commands.add_parser("ensure", help="Create upcoming monthly partitions")
+    ensure.add_argument("--months-ahead", type=int, default=3)
+    detach = commands.add_parser("detach", help="Detach one month from all partitioned tables")
+    detach.add_argument("month", help="Month to detach, YYYY-MM")
+    detach.add_argument("--drop", action="store_true", help="Drop the detached tables")
+    args = parser.parse_args()
+
+    with engine.begin() as connection:
+        if args.command == "ensure":
+            names = ensure_future_partitions(connection, args.months_ahead)
+        else:
+            names = detach_month(connection, datetime.strptime(args.month, "%Y-%m").date(), args.drop)
+    print("\n".join(names) if names else "Nothing to do")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Per-request SQL profiler.
+
+While a profile is active every statement run through any engine is
+recorded with its parameters and duration (engine cursor events, attributed
+through a context variable, as in metrics.py). At the end of the request:
+
+* statement shapes (SQL with IN lists collapsed) run at least
+  `sql_profiler_repeat_threshold` times are logged as likely N+1 queries,
+* statements slower than `slow_query_threshold_ms` are logged with their
+  EXPLAIN plan,
+* in debug mode the summary is returned in X-SQL-* response headers.
+
+Profiling is on for every request with SQL_PROFILER_ENABLED, or, in debug
+mode, for requests sending `X-Profile-SQL: 1`. Outside requests (scripts,
+benchmarks) use `with profile() as result: ...`.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile-sql"
+
+_IN_LIST = re.compile(r"\bIN\s*\((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement with IN lists collapsed, so batches of one query compare equal"""
+    return _WHITESPACE.sub(" ", _IN_LIST.sub("IN (...)", statement)).strip()
+
+
+@dataclass
+class QueryRecord:
+    statement: str
+    parameters: Any
+    duration: float
+    engine: Engine
+    explain: Optional[List[str]] = None
+
+    @property
+    def shape(self) -> str:
+        return statement_shape(self.statement)
+
+
+@dataclass
+class Profile:
+    queries: List[QueryRecord] = field(default_factory=list)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(query.duration for query in self.queries)
+
+    def repeated(self, threshold: Optional[int] = None) -> List[tuple]:
+        """(shape, count) for shapes run at least `threshold` times, most frequent first"""
+        threshold = threshold or settings.sql_profiler_repeat_threshold
+        counts = Counter(query.shape for query in self.queries)
+        return [(shape, count) for shape, count in counts.most_common() if count >= threshold]
+
+    def slow(self, threshold_ms: Optional[float] = None) -> List[QueryRecord]:
+        threshold_ms = settings.slow_query_threshold_ms if threshold_ms is None else threshold_ms
+        return [query for query in self.queries if query.duration * 1000 >= threshold_ms]
+
+    def summary(self) -> dict:
+        return {
+            "queries": len(self.queries),
+            "time_ms": round(self.total_seconds * 1000, 2),
+            "repeated": len(self.repeated()),
+            "slow": len(self.slow()),
+        }
+
+
+_current_profile: ContextVar[Optional[Profile]] = ContextVar("sql_profile", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _statement_started(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current_profile.get() is not None:
+        context._profile_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _statement_finished(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    started = getattr(context, "_profile_started", None)
+    if profile is None or started is None:
+        return
+    profile.queries.append(QueryRecord(statement, parameters, time.perf_counter() - started, conn.engine))
+
+
+def explain(query: QueryRecord) -> Optional[List[str]]:
+    """Plan for a recorded SELECT, re-planned on a fresh connection"""
+    if not query.statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    prefix = "EXPLAIN QUERY PLAN " if query.engine.dialect.name == "sqlite" else "EXPLAIN "
+    # Raw DBAPI cursor: the recorded statement and parameters are already in
+    # the driver's paramstyle
+    connection = query.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(prefix + query.statement, query.parameters)
+        return [" ".join(str(value) for value in row) for row in cursor.fetchall()]
+    except Exception:
+        logger.debug("EXPLAIN failed", exc_info=True)
+        return None
+    finally:
+        connection.close()
+
+
+def _truncate(value: Any, limit: int = 500) -> str:
+    text = repr(value)
+    return text if len(text) <= limit else f"{text[:limit]}..."
+
+
+def report(profile: Profile, label: str) -> None:
+    """Log repeated statement shapes and slow statements (with EXPLAIN)"""
+    for shape, count in profile.repeated():
+        logger.warning("%s: possible N+1, %d queries of shape: %s", label, count, _truncate(shape, 1000))
+    for query in profile.slow():
+        if query.explain is None:
+            query.explain = explain(query)
+        logger.warning(
+            "%s: slow query (%.1f ms): %s\nparameters: %s\nplan:\n%s",
+            label, query.duration * 1000, _truncate(query.statement, 2000), _truncate(query.parameters),
+            "\n".join(query.explain or ["(unavailable)"]),
+        )
+
+
+@contextmanager
+def profile():
+    """Profile the statements run in this block (and in threads it hands work to)"""
+    result = Profile()
+    token = _current_profile.set(result)
+    try:
+        yield result
+    finally:
+        _current_profile.reset(token)
+
+
+class SQLProfilerMiddleware:
+    """ASGI middleware profiling selected requests (see module docstring)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _wanted(self, scope) -> bool:
+        if settings.sql_profiler_enabled:
+            return True
+        if not settings.debug:
+            return False
+        return dict(scope.get("headers") or []).get(PROFILE_HEADER, b"").strip() in (b"1", b"true")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and settings.debug:
+                summary = result.summary()
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-sql-queries", str(summary["queries"]).encode()),
+                    (b"x-sql-time-ms", str(summary["time_ms"]).encode()),
+                    (b"x-sql-repeated", str(summary["repeated"]).encode()),
+                    (b"x-sql-slow", str(summary["slow"]).encode()),
+                ]
+            await send(message)
+
+        with profile() as result:
+            await self.app(scope, receive, send_wrapper)
+        # Off the event loop: EXPLAIN hits the database
+        await run_in_threadpool(report, result, f"{scope['method']} {scope['path']}")
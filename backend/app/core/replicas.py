@@ -0,0 +1,149 @@
+"""Routing of read-only sessions to PostgreSQL streaming replicas.
+
+Endpoints that only read take their session from `get_read_db`
+(app/core/database.py), which asks `replica_router` for a replica:
+
+* replicas are used round-robin, skipping any that failed their last health
+  check or lag the primary by more than `replica_max_lag_seconds`,
+* health and lag are re-checked at most every
+  `replica_health_check_interval_seconds`, by whichever request needs it
+  first; everyone else uses the last result,
+* a client that committed a write is pinned to the primary for
+  `read_your_writes_seconds`, so it always sees its own changes,
+* with no usable replica (or none configured) reads go to the primary.
+
+Pins are kept per process. With several workers a client's next read may
+land on another worker, which then relies on the lag limit alone.
+"""
+import itertools
+import threading
+import time
+from typing import List, Optional
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, sessionmaker
+from .cache import TTLCache
+from .config import settings
+from .security import client_key
+
+# 0 on a primary or a fully replayed standby, else seconds since the last
+# replayed transaction
+_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+def replication_lag(connection: Connection) -> float:
+    if connection.dialect.name != "postgresql":
+        return 0.0
+    return float(connection.execute(_LAG_QUERY).scalar() or 0)
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.url = url
+        connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+        self.engine = create_engine(url, connect_args=connect_args, pool_pre_ping=True)
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self.checked_at = 0.0
+        self.check_lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        urls: List[str],
+        max_lag_seconds: float = 5.0,
+        check_interval_seconds: float = 5.0,
+        pin_seconds: float = 5.0,
+    ):
+        self.replicas = [Replica(url) for url in urls]
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self._pins = TTLCache(maxsize=100000, ttl=pin_seconds) if pin_seconds > 0 else None
+        self._next = itertools.count()
+        self.primary_fallbacks = 0
+
+    def check(self, replica: Replica) -> None:
+        """Probe one replica's health and replication lag"""
+        try:
+            with replica.engine.connect() as connection:
+                replica.lag = replication_lag(connection)
+            replica.healthy = True
+        except Exception:
+            replica.healthy = False
+            replica.lag = None
+        replica.checked_at = time.monotonic()
+
+    def _refresh(self, replica: Replica) -> None:
+        if time.monotonic() - replica.checked_at < self.check_interval_seconds:
+            return
+        # One request re-checks; the others keep using the previous result
+        if replica.check_lock.acquire(blocking=False):
+            try:
+                self.check(replica)
+            finally:
+                replica.check_lock.release()
+
+    def is_usable(self, replica: Replica) -> bool:
+        self._refresh(replica)
+        return replica.healthy and replica.lag is not None and replica.lag <= self.max_lag_seconds
+
+    def choose(self) -> Optional[Replica]:
+        """Next usable replica in round-robin order, None to use the primary"""
+        if not self.replicas:
+            return None
+        start = next(self._next)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if self.is_usable(replica):
+                return replica
+        self.primary_fallbacks += 1
+        return None
+
+    def mark_unhealthy(self, replica: Replica) -> None:
+        """Take a replica out of rotation until its next health check"""
+        replica.healthy = False
+        replica.checked_at = time.monotonic()
+
+    def pin(self, client: str) -> None:
+        if self._pins is not None:
+            self._pins.set(client, True)
+
+    def is_pinned(self, client: str) -> bool:
+        return self._pins is not None and self._pins.get(client) is not None
+
+    def stats(self) -> dict:
+        return {
+            "replicas": [
+                {"url": replica.name, "healthy": replica.healthy, "lag_seconds": replica.lag}
+                for replica in self.replicas
+            ],
+            "primary_fallbacks": self.primary_fallbacks,
+        }
+
+
+replica_router = ReplicaRouter(
+    settings.get_read_replica_urls(),
+    max_lag_seconds=settings.replica_max_lag_seconds,
+    check_interval_seconds=settings.replica_health_check_interval_seconds,
+    pin_seconds=settings.read_your_writes_seconds,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _pin_writer_to_primary(session):
+    """Read-your-writes: send the committing client's reads to the primary for a while"""
+    scope = session.info.get("client_scope")
+    if scope is not None and replica_router.replicas:
+        replica_router.pin(client_key(scope))
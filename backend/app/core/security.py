@@ -1,14 +1,45 @@
+import asyncio
+import hashlib
+import hmac
+import re
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union, Optional
+from typing import Any, Dict, Tuple, Union, Optional
 from jose import jwt
 from passlib.context import CryptContext
+from .cache import TTLCache
 from .config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.password_hash_rounds,
+    # Hashes made with any other cost are flagged for rehash on next login
+    bcrypt__min_rounds=settings.password_hash_rounds,
+    bcrypt__max_rounds=settings.password_hash_rounds,
+)
+
+# bcrypt is CPU-bound by design. Running it on a small dedicated pool keeps a
+# burst of logins from occupying every thread in the request threadpool.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers, thread_name_prefix="password-hash"
+)
+_hash_slots = threading.BoundedSemaphore(
+    settings.password_hash_workers + settings.password_hash_max_pending
+)
+# Incremented on the event loop, decremented on pool threads
+_hash_pending = 0
+_hash_pending_lock = threading.Lock()
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool already has too many pending operations"""
 
 
 def create_access_token(
-    subject: Union[str, Any], expires_delta: timedelta = None
+    subject: Union[str, Any], expires_delta: timedelta = None, token_version: int = 0
 ) -> str:
     """Create access token"""
     if expires_delta:
@@ -17,15 +48,15 @@ def create_access_token(
         expire = datetime.utcnow() + timedelta(
             minutes=settings.access_token_expire_minutes
         )
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {"exp": expire, "sub": str(subject), "ver": token_version}
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
 
-def create_refresh_token(subject: Union[str, Any]) -> str:
+def create_refresh_token(subject: Union[str, Any], token_version: int = 0) -> str:
     """Create refresh token"""
     expire = datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
-    to_encode = {"exp": expire, "sub": str(subject), "type": "refresh"}
+    to_encode = {"exp": expire, "sub": str(subject), "type": "refresh", "ver": token_version}
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
@@ -40,16 +71,127 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def verify_token(token: str) -> Optional[str]:
-    """Verify JWT token and return subject"""
+async def _run_on_hash_pool(func, *args):
+    global _hash_pending
+    if not _hash_slots.acquire(blocking=False):
+        raise PasswordHasherBusy()
+    with _hash_pending_lock:
+        _hash_pending += 1
+    future = _hash_executor.submit(func, *args)
+    # Release on completion rather than on await, so a cancelled request
+    # still counts against the pool until bcrypt actually finishes
+    future.add_done_callback(_release_hash_slot)
+    return await asyncio.wrap_future(future)
+
+
+def _release_hash_slot(_future) -> None:
+    global _hash_pending
+    with _hash_pending_lock:
+        _hash_pending -= 1
+    _hash_slots.release()
+
+
+def hash_pool_stats() -> dict:
+    return {
+        "pending": _hash_pending,
+        "workers": settings.password_hash_workers,
+        "max_pending": settings.password_hash_max_pending,
+    }
+
+
+async def verify_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify password on the hashing pool.
+
+    Returns (valid, new_hash); new_hash is set when the stored hash was made
+    with outdated parameters and should replace it.
+    """
+    return await _run_on_hash_pool(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash password on the hashing pool"""
+    return await _run_on_hash_pool(pwd_context.hash, password)
+
+
+def decode_token(token: str) -> Optional[Dict[str, Any]]:
+    """Verify JWT token and return its claims"""
     try:
         payload = jwt.decode(
             token, settings.secret_key, algorithms=[settings.algorithm]
         )
-        token_data = payload.get("sub")
-        if token_data is None:
-            return None
-        return token_data
     except jwt.JWTError:
         return None
+    if payload.get("sub") is None:
+        return None
+    return payload
+
+
+def verify_token(token: str) -> Optional[str]:
+    """Verify JWT token and return subject"""
+    payload = decode_token(token)
+    if payload is None:
+        return None
+    return payload["sub"]
+
+
+
+API_KEY_PREFIX = "aam"
+_API_KEY_LOOKUP = re.compile(r"[0-9a-f]{12}")  # secrets.token_hex(6), see generate_api_key
+
+
+def generate_api_key() -> Tuple[str, str]:
+    """Create a new API key; returns (key, lookup prefix)"""
+    prefix = secrets.token_hex(6)
+    return f"{API_KEY_PREFIX}_{prefix}_{secrets.token_urlsafe(32)}", prefix
+
+
+def parse_api_key_prefix(key: str) -> Optional[str]:
+    """Extract the lookup prefix from an API key, None if malformed"""
+    parts = key.split("_", 2)
+    if len(parts) != 3 or parts[0] != API_KEY_PREFIX or not _API_KEY_LOOKUP.fullmatch(parts[1]) or not parts[2]:
+        return None
+    return parts[1]
+
+
+def hash_api_key(key: str) -> str:
+    """Keyed hash of an API key for storage.
+
+    Keys are random 256-bit secrets, so a fast keyed hash is enough; bcrypt
+    here would cost as much as a login on every ingestion call.
+    """
+    return hmac.new(settings.secret_key.encode(), key.encode(), hashlib.sha256).hexdigest()
+
+
+# Hashes of API keys that recently authenticated (app/api/deps.py) -> their
+# prefix. client_key only identifies a caller by a key's prefix once the key
+# itself was verified: otherwise random keys would each get a fresh quota
+# bucket, and a known prefix with a bogus secret would drain its project's.
+verified_api_keys = TTLCache(
+    maxsize=settings.api_key_cache_max_size, ttl=settings.api_key_cache_ttl_seconds
+)
+
+
+def client_key(scope) -> str:
+    """Identify the caller of an ASGI request: API key prefix, token subject, or client address.
 
+    Cheap enough for middleware: API keys are only looked up among recently
+    verified ones (unknown keys count as their client address), and tokens
+    are decoded but not checked against the user table.
+    """
+    headers = dict(scope.get("headers") or [])
+    api_key = headers.get(b"x-api-key")
+    if api_key:
+        prefix = verified_api_keys.get(hash_api_key(api_key.decode("latin-1")))
+        if prefix:
+            return f"key:{prefix}"
+    authorization = headers.get(b"authorization", b"").decode("latin-1")
+    if authorization.lower().startswith("bearer "):
+        payload = decode_token(authorization[7:])
+        if payload is not None:
+            return f"user:{payload['sub']}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
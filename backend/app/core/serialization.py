@@ -0,0 +1,36 @@
+"""Fast JSON responses for large payloads built from trusted database rows.
+
+FastAPI's default path validates every returned object against the
+response model, converts it with jsonable_encoder and then runs json.dumps.
+For list and analytics endpoints returning plain rows read from our own
+database, `FastJSONResponse` skips all of that: returning it directly from
+an endpoint bypasses response-model validation, and orjson serializes
+UUID, datetime and nested JSONB natively.
+
+The output matches the default encoding: Decimals as strings, UTC
+datetimes with a "Z" suffix. Keep `response_model` on the route for the
+OpenAPI schema.
+"""
+from decimal import Decimal
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+
+_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson; return it directly to skip validation"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,19 +1,122 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.orm import configure_mappers
 from .core.config import settings
-from .core.database import engine, Base
+from .core.admission import AdmissionController, AdmissionMiddleware
+from .core.compression import CompressionMiddleware
+from .core.partitioning import ensure_future_partitions
+from .core.database import SessionLocal, engine
+from .core.profiler import SQLProfilerMiddleware
+from .core.metrics import CONTENT_TYPE, MetricsMiddleware, pool_samples, registry
+from .core.security import hash_pool_stats
+from .core.replicas import replica_router
+from .api.deps import api_key_cache, principal_cache, unknown_api_key_cache
 from .api.v1 import auth, projects, tasks, analytics
+from .services.sweeper import sweep_stale_tasks
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up():
+    """Prepare the worker for traffic: partitions, mappers, connection pools.
+    
+    The schema itself is managed by Alembic (`alembic upgrade head`), never
+    created here. Every step is best effort; a failure only means the first
+    requests pay for it instead.
+    """
+    maintain_partitions()
+    
+    try:
+        configure_mappers()
+    except Exception:
+        logger.exception("Configuring ORM mappers failed")
+    
+    try:
+        connections = [engine.connect() for _ in range(settings.warm_pool_connections)]
+        for connection in connections:
+            connection.close()
+    except Exception:
+        logger.exception("Warming the connection pool failed")
+    
+    for replica in replica_router.replicas:
+        replica_router.check(replica)
+
+
+def maintain_partitions():
+    """Keep monthly partitions ahead of incoming data (no-op if unpartitioned)"""
+    try:
+        with engine.begin() as connection:
+            created = ensure_future_partitions(connection, settings.partition_months_ahead)
+        if created:
+            logger.info("Created partitions %s", ", ".join(created))
+    except Exception:
+        logger.exception("Creating upcoming partitions failed")
+
+
+def sweep_once():
+    db = SessionLocal()
+    try:
+        swept = sweep_stale_tasks(db)
+        if swept:
+            logger.info("Marked %d stale tasks as %s", swept, settings.stale_task_status)
+    except Exception:
+        logger.exception("Stale task sweep failed")
+    finally:
+        db.close()
+
+
+async def sweep_periodically(interval: int):
+    """Stale task sweeps for the worker's lifetime (see app/services/sweeper.py)"""
+    while True:
+        await asyncio.sleep(interval)
+        await run_in_threadpool(sweep_once)
+
+
+async def maintain_partitions_periodically(interval: int):
+    """Partition maintenance for the worker's lifetime, so a long-running
+    worker never starts writing a month that has no partition yet"""
+    while True:
+        await asyncio.sleep(interval)
+        await run_in_threadpool(maintain_partitions)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so the worker accepts requests immediately
+    warmup = asyncio.create_task(run_in_threadpool(warm_up))
+    background = []
+    if settings.stale_sweep_interval_seconds > 0:
+        background.append(asyncio.create_task(sweep_periodically(settings.stale_sweep_interval_seconds)))
+    if settings.partition_check_interval_seconds > 0:
+        background.append(asyncio.create_task(
+            maintain_partitions_periodically(settings.partition_check_interval_seconds)
+        ))
+    yield
+    if not warmup.done():
+        warmup.cancel()
+    for task in background:
+        task.cancel()
+    engine.dispose()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.project_name,
     version="1.0.0",
-    description="AI Agents Monitoring System API"
+    description="AI Agents Monitoring System API",
+    lifespan=lifespan
 )
 
+# Admission control / load shedding. Added before CORS so that CORS wraps it
+# and 429/503 responses still carry CORS headers.
+admission_controller = AdmissionController()
+if settings.admission_enabled:
+    app.add_middleware(AdmissionMiddleware, controller=admission_controller)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -23,6 +126,63 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compressed request/response bodies; outside CORS and admission so their
+# responses are compressed too
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware)
+
+# SQL profiling, for debugging only
+if settings.debug or settings.sql_profiler_enabled:
+    app.add_middleware(SQLProfilerMiddleware)
+
+# Request metrics. Added last so it is outermost and also sees requests shed
+# by admission control.
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+
+def collect_service_metrics():
+    """Scrape-time gauges: pools, admission queues, caches, replicas"""
+    engines = {"primary": engine}
+    engines.update({replica.name: replica.engine for replica in replica_router.replicas})
+    yield from pool_samples(engines)
+    
+    admission = admission_controller.stats()
+    yield ("admission_in_flight", "gauge", "Admitted requests being handled, per route class",
+           [({"class": name}, stats["in_flight"]) for name, stats in admission.items()])
+    # Ingestion queue depth is admission_waiting{class="ingestion"}
+    yield ("admission_waiting", "gauge", "Requests queued for admission, per route class",
+           [({"class": name}, stats["waiting"]) for name, stats in admission.items()])
+    yield ("admission_rejected_total", "counter", "Requests shed with 429/503, per route class",
+           [({"class": name}, stats["rejected"]) for name, stats in admission.items()])
+    
+    caches = {
+        "principal": principal_cache.stats(),
+        "api_key": api_key_cache.stats(),
+        "api_key_unknown": unknown_api_key_cache.stats(),
+    }
+    yield ("cache_entries", "gauge", "Entries held per cache",
+           [({"cache": name}, stats["size"]) for name, stats in caches.items()])
+    yield ("cache_hits_total", "counter", "Cache hits",
+           [({"cache": name}, stats["hits"]) for name, stats in caches.items()])
+    yield ("cache_misses_total", "counter", "Cache misses",
+           [({"cache": name}, stats["misses"]) for name, stats in caches.items()])
+    
+    hashing = hash_pool_stats()
+    yield ("password_hash_pending", "gauge", "Password hashes running or queued",
+           [({}, hashing["pending"])])
+    
+    replicas = replica_router.stats()
+    yield ("replica_healthy", "gauge", "1 if the replica passed its last health check",
+           [({"replica": r["url"]}, int(r["healthy"])) for r in replicas["replicas"]])
+    yield ("replica_lag_seconds", "gauge", "Replication lag at the last health check",
+           [({"replica": r["url"]}, r["lag_seconds"]) for r in replicas["replicas"]])
+    yield ("replica_primary_fallbacks_total", "counter", "Reads sent to the primary for lack of a usable replica",
+           [({}, replicas["primary_fallbacks"])])
+
+
+registry.register_collector(collect_service_metrics)
+
 # Include routers
 app.include_router(auth.router, prefix=f"{settings.api_v1_str}/auth", tags=["auth"])
 app.include_router(projects.router, prefix=f"{settings.api_v1_str}/projects", tags=["projects"])
@@ -36,6 +196,12 @@ def read_root():
     return {"message": "AI Agents Monitoring System API", "version": "1.0.0"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    """Prometheus metrics endpoint"""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
@@ -1,18 +1,32 @@
 from .user import User
 from .project import Project
+from .project_budget_event import ProjectBudgetEvent
 from .task import Task
 from .file_operation import FileOperation
 from .task_step import TaskStep
 from .agent_model import AgentModel
 from .system_metrics import SystemMetrics
+from .api_key import ApiKey
+from .archived_task import ArchivedTask
+from .deletion_job import DeletionJob
+from .file_snapshot import FileSnapshot
+from .task_model_usage import TaskModelUsage
+from .environment_profile import EnvironmentProfile
 
 __all__ = [
     "User",
     "Project", 
+    "ProjectBudgetEvent",
     "Task",
     "FileOperation",
     "TaskStep",
     "AgentModel",
-    "SystemMetrics"
+    "SystemMetrics",
+    "ApiKey",
+    "ArchivedTask",
+    "DeletionJob",
+    "FileSnapshot",
+    "TaskModelUsage",
+    "EnvironmentProfile"
 ]
 
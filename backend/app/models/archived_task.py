@@ -0,0 +1,35 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Date, DateTime, DECIMAL, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class ArchivedTask(Base):
+    """Manifest entry for a task moved to the cold archive.
+
+    The full task, steps and file operations live in Parquet files (see
+    app/services/archive.py); this row locates them and keeps the rollup
+    columns analytics needs, so aggregates never have to open the files.
+    """
+    __tablename__ = "archived_tasks"
+
+    task_id = Column(UUID(as_uuid=True), primary_key=True)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
+    session_id = Column(String(100), nullable=False, index=True)
+    archive_day = Column(Date, nullable=False)
+    path = Column(String(500), nullable=False)  # relative to settings.archive_dir, same for every table
+
+    # Rollups
+    status = Column(String(20))
+    duration_seconds = Column(Integer)
+    total_steps = Column(Integer, default=0)
+    input_tokens = Column(BigInteger, default=0)
+    output_tokens = Column(BigInteger, default=0)
+    cost_usd = Column(DECIMAL(10, 6), default=0)
+    files_created = Column(Integer, default=0)
+    files_modified = Column(Integer, default=0)
+    files_deleted = Column(Integer, default=0)
+    environment_profile_id = Column(Integer, ForeignKey("environment_profiles.id"))
+
+    created_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, String, Text, DateTime, Integer, BigInteger
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import uuid
+from ..core.database import Base
+
+
+class DeletionJob(Base):
+    """Progress of a background project deletion (see app/services/deletion.py)"""
+    __tablename__ = "deletion_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    project_id = Column(UUID(as_uuid=True), nullable=False, index=True)  # no FK: outlives the project
+    project_name = Column(String(200))
+    status = Column(String(20), nullable=False, default="pending")  # 'pending', 'running', 'completed', 'failed'
+    total_tasks = Column(BigInteger, default=0)
+    deleted_tasks = Column(BigInteger, default=0)
+    chunk_size = Column(Integer)
+    error_message = Column(Text)
+    created_by = Column(UUID(as_uuid=True))
+
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    @property
+    def progress_percent(self) -> float:
+        if self.status == "completed":
+            return 100.0
+        if not self.total_tasks:
+            return 0.0
+        return min(100.0, round((self.deleted_tasks or 0) * 100 / self.total_tasks, 1))
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, DateTime, Integer
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class EnvironmentProfile(Base):
+    """One distinct environment_info blob, stored once and shared by its tasks.
+
+    See app/services/environments.py. Rows are keyed by the SHA-256 of the
+    blob's canonical JSON and never change, so they are cached freely and
+    never deleted (a profile costs one row however many tasks used it).
+    """
+    __tablename__ = "environment_profiles"
+
+    id = Column(Integer, primary_key=True)
+    content_hash = Column(String(64), unique=True, nullable=False)
+    environment_info = Column(JSONB, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -2,14 +2,14 @@ from sqlalchemy import Column, String, Text, DateTime, Integer, BigInteger, Fore
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-import uuid
 from ..core.database import Base
+from ..core.ids import uuid7
 
 
 class FileOperation(Base):
     __tablename__ = "file_operations"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)  # time-ordered, see core/partitioning.py
     task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
     operation_type = Column(String(10), nullable=False)  # 'create', 'modify', 'delete'
     file_path = Column(String(1000), nullable=False)
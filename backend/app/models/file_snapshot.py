@@ -0,0 +1,26 @@
+from sqlalchemy import Column, DateTime, Integer, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+import uuid
+from ..core.database import Base
+
+
+class FileSnapshot(Base):
+    """Replay checkpoint: a task's full workspace after its first N file operations.
+
+    See app/services/replay.py. No FK to tasks (partitioned); removed with
+    the task by the delete, deletion and archive code paths.
+    """
+    __tablename__ = "file_snapshots"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    task_id = Column(UUID(as_uuid=True), nullable=False)
+    operation_count = Column(Integer, nullable=False)  # operations applied, in replay order
+    last_operation_id = Column(UUID(as_uuid=True), nullable=False)  # detects operations inserted since
+    step_number = Column(Integer)  # step of the last applied operation
+    files = Column(JSONB, nullable=False, default={})  # path -> content (null if unknown)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('task_id', 'operation_count', name='uq_file_snapshot_position'),
+    )
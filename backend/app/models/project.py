@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, Date, Integer, DECIMAL
+from sqlalchemy import Column, String, Text, DateTime, Date, Integer, BigInteger, DECIMAL
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -26,9 +26,20 @@ class Project(Base):
     actual_hours = Column(Integer)
     tags = Column(JSONB, default=[])  # Store as JSONB array
     project_metadata = Column(JSONB, default={})
+
+    # Budget tracking - running totals kept in sync on every task cost change
+    spent_usd = Column(DECIMAL(15, 6), nullable=False, default=0, server_default="0")
+    spent_tokens = Column(BigInteger, nullable=False, default=0, server_default="0")
+    budget_alert_level = Column(Integer, nullable=False, default=0, server_default="0")  # highest threshold crossed: 0, 50, 80, 100
+    first_spend_at = Column(DateTime(timezone=True))
+    last_spend_at = Column(DateTime(timezone=True))
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
-    # Relationships
-    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
+    # Relationships. Children are removed by ON DELETE CASCADE in the
+    # database; passive_deletes keeps the ORM from loading them first.
+    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+    budget_events = relationship("ProjectBudgetEvent", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+    api_keys = relationship("ApiKey", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
 
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, DateTime, DECIMAL, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+import uuid
+from ..core.database import Base
+
+
+class ProjectBudgetEvent(Base):
+    __tablename__ = "project_budget_events"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
+    threshold = Column(Integer, nullable=False)  # 50, 80, 100 (% of budget)
+    spent_usd = Column(DECIMAL(15, 6), nullable=False)
+    budget = Column(DECIMAL(15, 2), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    project = relationship("Project", back_populates="budget_events")
@@ -1,15 +1,15 @@
-from sqlalchemy import Column, String, Text, DateTime, Integer, DECIMAL, ForeignKey, BigInteger
+from sqlalchemy import Column, String, Text, DateTime, Integer, DECIMAL, ForeignKey, BigInteger, Index, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship, column_property
-import uuid
 from ..core.database import Base
+from ..core.ids import uuid7
 
 
 class Task(Base):
     __tablename__ = "tasks"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)  # time-ordered, see core/partitioning.py
     project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
     name = Column(String(200), nullable=False)
     description = Column(Text)
@@ -49,13 +49,23 @@ class Task(Base):
     error_message = Column(Text)
     logs = Column(JSONB, default=[])
     performance_metrics = Column(JSONB, default={})
-    environment_info = Column(JSONB, default={})
+    environment_info = Column(JSONB, default={})  # {} once interned into environment_profile_id
+    environment_profile_id = Column(Integer, ForeignKey("environment_profiles.id"))
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
-    # Relationships
+    # Relationships (children go via ON DELETE CASCADE / the partition trigger)
     project = relationship("Project", back_populates="tasks")
-    file_operations = relationship("FileOperation", back_populates="task", cascade="all, delete-orphan")
-    steps = relationship("TaskStep", back_populates="task", cascade="all, delete-orphan")
+    file_operations = relationship("FileOperation", back_populates="task", cascade="all, delete-orphan", passive_deletes=True)
+    steps = relationship("TaskStep", back_populates="task", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # Unfinished tasks only, for the stale task sweeper (app/services/sweeper.py)
+        Index(
+            'ix_tasks_unfinished_updated_at', 'updated_at',
+            postgresql_where=text("status IN ('running', 'pending')"),
+            sqlite_where=text("status IN ('running', 'pending')"),
+        ),
+    )
 
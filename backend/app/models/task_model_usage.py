@@ -0,0 +1,34 @@
+from sqlalchemy import Column, String, DateTime, Integer, DECIMAL, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from ..core.database import Base
+from ..core.ids import uuid7
+
+
+class TaskModelUsage(Base):
+    """One model's share of a task's usage, normalized from Task.cost_breakdown.
+
+    See app/services/model_usage.py. No FK to tasks (partitioned); the task's
+    project, status and creation time are copied so per-model analytics never
+    touch the tasks table. Rows outlive archiving (they are the long-term
+    per-model history) and go with the task's deletion.
+    """
+    __tablename__ = "task_model_usage"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    task_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    project_id = Column(UUID(as_uuid=True), nullable=False)
+    agent_model_id = Column(UUID(as_uuid=True), ForeignKey("agent_models.id", ondelete="SET NULL"))
+    model_name = Column(String(100), nullable=False)  # key in cost_breakdown, kept if unmatched
+    input_tokens = Column(Integer, default=0)
+    output_tokens = Column(Integer, default=0)
+    cost_usd = Column(DECIMAL(10, 6), default=0)
+    task_status = Column(String(20))
+    created_at = Column(DateTime(timezone=True), nullable=False)  # the task's
+
+    agent_model = relationship("AgentModel")
+
+    __table_args__ = (
+        Index('ix_task_model_usage_created_at_model_name', 'created_at', 'model_name'),
+        Index('ix_task_model_usage_project_id_created_at', 'project_id', 'created_at'),
+    )
@@ -1,16 +1,19 @@
-from sqlalchemy import Column, String, Text, DateTime, Integer, DECIMAL, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, String, Text, DateTime, Integer, DECIMAL, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-import uuid
 from ..core.database import Base
+from ..core.ids import uuid7
 
 
 class TaskStep(Base):
     __tablename__ = "task_steps"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)  # time-ordered, see core/partitioning.py
     task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
+    # Enclosing step (span) in the task's step tree; NULL for top-level steps.
+    # No FK: task_steps is partitioned. Validated by the API instead.
+    parent_step_id = Column(UUID(as_uuid=True))
     step_number = Column(Integer, nullable=False)
     step_name = Column(String(200))
     step_description = Column(Text)
@@ -40,4 +43,5 @@ class TaskStep(Base):
     # Constraints
     __table_args__ = (
         UniqueConstraint('task_id', 'step_number', name='uq_task_step_number'),
+        Index('ix_task_steps_task_id_parent_step_id', 'task_id', 'parent_step_id'),
     )
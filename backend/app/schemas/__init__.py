@@ -1,20 +1,32 @@
 from .user import User, UserCreate, UserUpdate, UserInDB
 from .project import Project, ProjectCreate, ProjectUpdate, ProjectInDB
-from .task import Task, TaskCreate, TaskUpdate, TaskInDB
+from .task import Task, TaskCreate, TaskUpdate, TaskInDB, TaskBulkUpdate, TaskBulkUpdateResult
 from .file_operation import FileOperation, FileOperationCreate, FileOperationInDB
-from .task_step import TaskStep, TaskStepCreate, TaskStepUpdate, TaskStepInDB
+from .task_step import TaskStep, TaskStepCreate, TaskStepUpdate, TaskStepInDB, TaskStepNode
 from .agent_model import AgentModel, AgentModelCreate, AgentModelUpdate, AgentModelInDB
 from .system_metrics import SystemMetrics, SystemMetricsInDB
 from .auth import Token, TokenData
+from .api_key import ApiKey, ApiKeyCreate, ApiKeyCreated, ApiKeyInDB
+from .deletion_job import DeletionJob
+from .replay import ReplayFile, WorkspaceState
+from .event import TaskEventBatch, TaskEventBatchResult
+from .task_detail import TaskDetail, TaskStepPage, FileOperationPage
+from .environment_profile import EnvironmentProfile
 
 __all__ = [
     "User", "UserCreate", "UserUpdate", "UserInDB",
     "Project", "ProjectCreate", "ProjectUpdate", "ProjectInDB",
-    "Task", "TaskCreate", "TaskUpdate", "TaskInDB",
+    "Task", "TaskCreate", "TaskUpdate", "TaskInDB", "TaskBulkUpdate", "TaskBulkUpdateResult",
     "FileOperation", "FileOperationCreate", "FileOperationInDB",
-    "TaskStep", "TaskStepCreate", "TaskStepUpdate", "TaskStepInDB",
+    "TaskStep", "TaskStepCreate", "TaskStepUpdate", "TaskStepInDB", "TaskStepNode",
     "AgentModel", "AgentModelCreate", "AgentModelUpdate", "AgentModelInDB",
     "SystemMetrics", "SystemMetricsInDB",
-    "Token", "TokenData"
+    "Token", "TokenData",
+    "ApiKey", "ApiKeyCreate", "ApiKeyCreated", "ApiKeyInDB",
+    "DeletionJob",
+    "ReplayFile", "WorkspaceState",
+    "TaskEventBatch", "TaskEventBatchResult",
+    "TaskDetail", "TaskStepPage", "FileOperationPage",
+    "EnvironmentProfile"
 ]
 
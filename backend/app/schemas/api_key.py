@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+import uuid
+
+
+class ApiKeyCreate(BaseModel):
+    name: str
+    expires_at: Optional[datetime] = None
+
+
+class ApiKeyInDB(BaseModel):
+    id: uuid.UUID
+    project_id: uuid.UUID
+    name: str
+    prefix: str
+    is_active: bool = True
+    expires_at: Optional[datetime] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ApiKey(ApiKeyInDB):
+    pass
+
+
+class ApiKeyCreated(ApiKey):
+    key: str  # only ever returned once, at creation
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+import uuid
+
+
+class DeletionJob(BaseModel):
+    id: uuid.UUID
+    project_id: uuid.UUID
+    project_name: Optional[str] = None
+    status: str
+    total_tasks: int = 0
+    deleted_tasks: int = 0
+    progress_percent: float = 0
+    error_message: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
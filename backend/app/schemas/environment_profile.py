@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+from datetime import datetime
+
+
+class EnvironmentProfile(BaseModel):
+    id: int
+    content_hash: str
+    environment_info: Dict[str, Any]
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
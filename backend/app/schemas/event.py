@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import List, Dict, Any
+from .file_operation import FileOperationCreate
+from .task_step import TaskStepCreate
+
+
+class TaskEventBatch(BaseModel):
+    """Events an agent buffered and sends together (see app/client)"""
+    steps: List[TaskStepCreate] = []
+    logs: List[Dict[str, Any]] = []
+    file_operations: List[FileOperationCreate] = []
+
+
+class TaskEventBatchResult(BaseModel):
+    steps: int
+    logs: int
+    file_operations: int
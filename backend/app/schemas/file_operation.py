@@ -5,7 +5,6 @@ import uuid
 
 
 class FileOperationBase(BaseModel):
-    task_id: uuid.UUID
     operation_type: str  # 'create', 'modify', 'delete'
     file_path: str
     file_name: Optional[str] = None
@@ -26,11 +25,13 @@ class FileOperationBase(BaseModel):
 
 
 class FileOperationCreate(FileOperationBase):
-    pass
+    # Clients may assign ids so retried batches are not stored twice
+    id: Optional[uuid.UUID] = None
 
 
 class FileOperationInDB(FileOperationBase):
     id: uuid.UUID
+    task_id: uuid.UUID
     created_at: datetime
 
     class Config:
@@ -2,6 +2,7 @@ from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 from datetime import datetime, date
 from decimal import Decimal
+import uuid
 
 
 class ProjectBase(BaseModel):
@@ -12,7 +13,7 @@ class ProjectBase(BaseModel):
     repository_url: Optional[str] = None
     status: str = "active"
     priority: str = "medium"
-    owner_id: Optional[str] = None
+    owner_id: Optional[uuid.UUID] = None
     team_members: List[str] = []
     start_date: Optional[date] = None
     end_date: Optional[date] = None
@@ -35,7 +36,7 @@ class ProjectUpdate(BaseModel):
     repository_url: Optional[str] = None
     status: Optional[str] = None
     priority: Optional[str] = None
-    owner_id: Optional[str] = None
+    owner_id: Optional[uuid.UUID] = None
     team_members: Optional[List[str]] = None
     start_date: Optional[date] = None
     end_date: Optional[date] = None
@@ -47,7 +48,10 @@ class ProjectUpdate(BaseModel):
 
 
 class ProjectInDB(ProjectBase):
-    id: str
+    id: uuid.UUID
+    spent_usd: Decimal = Decimal('0')
+    spent_tokens: int = 0
+    budget_alert_level: int = 0
     created_at: datetime
     updated_at: datetime
 
@@ -60,17 +64,47 @@ class Project(ProjectInDB):
 
 
 class ProjectStats(BaseModel):
-    total_tasks: int
-    completed_tasks: int
-    failed_tasks: int
-    pending_tasks: int
-    total_cost: Decimal
-    total_tokens: int
-    total_files_affected: int
+    total_tasks: int = 0
+    completed_tasks: int = 0
+    failed_tasks: int = 0
+    pending_tasks: int = 0
+    total_cost: Decimal = Decimal('0')
+    total_tokens: int = 0
+    total_files_affected: int = 0
+    last_activity_at: Optional[datetime] = None
+
+
+class ProjectWithStats(Project):
+    # Only filled in when the list is requested with include_stats
+    stats: Optional[ProjectStats] = None
+
+
+class ProjectBudgetEvent(BaseModel):
+    threshold: int
+    spent_usd: Decimal
+    budget: Decimal
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ProjectBudget(BaseModel):
+    budget: Optional[Decimal] = None
+    spent_usd: Decimal
+    spent_tokens: int
+    remaining_usd: Optional[Decimal] = None
+    percent_used: Optional[float] = None
+    alert_level: int
+    burn_rate_per_day: Decimal
+    projected_exhaustion_date: Optional[date] = None
+    projected_spend_at_end_date: Optional[Decimal] = None
+    last_spend_at: Optional[datetime] = None
+    events: List[ProjectBudgetEvent] = []
 
 
 class ProjectListResponse(BaseModel):
-    items: List[Project]
+    items: List[ProjectWithStats]
     total: int
     page: int
     page_size: int
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import List, Optional
+import uuid
+
+
+class ReplayFile(BaseModel):
+    path: str
+    content: Optional[str] = None
+    content_known: bool = True  # False when no content or applicable diff was recorded
+
+
+class WorkspaceState(BaseModel):
+    task_id: uuid.UUID
+    step_number: Optional[int] = None
+    operations_applied: int
+    checkpoint_operations: int = 0
+    from_cache: bool = False
+    files: List[ReplayFile]
@@ -67,6 +67,7 @@ class TaskUpdate(BaseModel):
 
 class TaskInDB(TaskBase):
     id: uuid.UUID
+    environment_profile_id: Optional[int] = None
     total_tokens: int
     total_files_affected: int
     created_at: datetime
@@ -79,3 +80,15 @@ class TaskInDB(TaskBase):
 class Task(TaskInDB):
     pass
 
+
+
+class TaskBulkUpdate(BaseModel):
+    """The same partial update applied to every task matched by ids or session_ids"""
+    ids: List[uuid.UUID] = []
+    session_ids: List[str] = []
+    changes: TaskUpdate
+
+
+class TaskBulkUpdateResult(BaseModel):
+    updated: int
+    ids: List[uuid.UUID]
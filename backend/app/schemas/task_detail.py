@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from .environment_profile import EnvironmentProfile
+from .file_operation import FileOperation
+from .task import Task
+from .task_step import TaskStep
+
+
+class TaskStepPage(BaseModel):
+    items: List[TaskStep]
+    # Pass as steps_cursor for the next page; None on the last one
+    next_cursor: Optional[str] = None
+
+
+class FileOperationPage(BaseModel):
+    items: List[FileOperation]
+    # Pass as files_cursor for the next page; None on the last one
+    next_cursor: Optional[str] = None
+
+
+class TaskDetail(Task):
+    """A task with the collections asked for in `expand`"""
+    steps: Optional[TaskStepPage] = None
+    files: Optional[FileOperationPage] = None
+    environment: Optional[EnvironmentProfile] = None
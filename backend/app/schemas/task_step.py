@@ -1,13 +1,12 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 from decimal import Decimal
 import uuid
 
 
 class TaskStepBase(BaseModel):
-    task_id: uuid.UUID
-    step_number: int
+    parent_step_id: Optional[uuid.UUID] = None
     step_name: Optional[str] = None
     step_description: Optional[str] = None
     step_type: Optional[str] = None
@@ -23,7 +22,11 @@ class TaskStepBase(BaseModel):
 
 
 class TaskStepCreate(TaskStepBase):
-    pass
+    # Clients may assign ids, to nest steps before the parent is sent and
+    # so retried batches are not stored twice
+    id: Optional[uuid.UUID] = None
+    # Next free number when omitted
+    step_number: Optional[int] = None
 
 
 class TaskStepUpdate(BaseModel):
@@ -43,6 +46,8 @@ class TaskStepUpdate(BaseModel):
 
 class TaskStepInDB(TaskStepBase):
     id: uuid.UUID
+    task_id: uuid.UUID
+    step_number: int
     created_at: datetime
     updated_at: datetime
 
@@ -53,3 +58,17 @@ class TaskStepInDB(TaskStepBase):
 class TaskStep(TaskStepInDB):
     pass
 
+
+class TaskStepNode(TaskStep):
+    """A step in the task's step tree, with totals for its whole subtree"""
+    depth: int = 0
+    subtree_steps: int = 1
+    subtree_input_tokens: int = 0
+    subtree_output_tokens: int = 0
+    subtree_cost_usd: Decimal = Decimal('0')
+    # Wall time from the earliest start to the latest end in the subtree
+    subtree_duration_seconds: Optional[float] = None
+    children: List["TaskStepNode"] = []
+
+
+TaskStepNode.model_rebuild()
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr
 from typing import Optional
 from datetime import datetime
+import uuid
 
 
 class UserBase(BaseModel):
@@ -25,7 +26,7 @@ class UserUpdate(BaseModel):
 
 
 class UserInDB(UserBase):
-    id: str
+    id: uuid.UUID
     created_at: datetime
     updated_at: datetime
     last_login: Optional[datetime] = None
@@ -0,0 +1,281 @@
+"""Cold archive for tasks past the retention window.
+
+Tasks older than `settings.retention_days` are copied, together with their
+steps and file operations, into zstd-compressed Parquet files and then
+deleted from the database in batches:
+
+    {archive_dir}/tasks/day=2025-01-31/project=<uuid>/part-<uuid>.parquet
+    {archive_dir}/task_steps/day=2025-01-31/project=<uuid>/part-<uuid>.parquet
+    {archive_dir}/file_operations/day=2025-01-31/project=<uuid>/part-<uuid>.parquet
+
+Every archived task gets an ArchivedTask manifest row holding the relative
+file path plus the rollup columns analytics needs. Project spend counters
+are left alone: archiving moves spend to cold storage, it doesn't refund it.
+
+    python -m app.services.archive run [--days 30] [--batch-size 500] [--max-batches N]
+"""
+import argparse
+import json
+import os
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import TYPE_CHECKING, Dict, List, Optional
+from sqlalchemy import Table, delete, insert, select, types
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models.archived_task import ArchivedTask
+from ..models.file_operation import FileOperation
+from ..models.file_snapshot import FileSnapshot
+from ..models.task import Task
+from ..models.task_step import TaskStep
+
+# pyarrow is imported where used: it adds ~150ms to every worker's startup
+# and only the retention job and archived-task reads need it
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+ARCHIVED_TABLES = (Task.__table__, TaskStep.__table__, FileOperation.__table__)
+COMPRESSION = "zstd"
+
+# Manifest rollup columns copied straight from the task row
+_ROLLUP_COLUMNS = (
+    "status", "duration_seconds", "total_steps", "input_tokens", "output_tokens",
+    "cost_usd", "files_created", "files_modified", "files_deleted", "environment_profile_id",
+)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """SQLite hands back naive datetimes; treat them as UTC"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def retention_cutoff(days: Optional[int] = None) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(days=settings.retention_days if days is None else days)
+
+
+def archive_may_contain(start_date: datetime) -> bool:
+    """False when every archived task is older than `start_date`.
+
+    Lets analytics skip the manifest entirely for the usual recent windows.
+    """
+    return _as_utc(start_date) < retention_cutoff()
+
+
+def _arrow_type(column_type) -> "pa.DataType":
+    import pyarrow as pa
+
+    # Order matters: the PostgreSQL UUID/JSONB types subclass the generic ones
+    if isinstance(column_type, (types.Uuid, types.JSON)):
+        return pa.string()
+    if isinstance(column_type, types.Numeric) and not isinstance(column_type, types.Float):
+        return pa.decimal128(column_type.precision or 38, column_type.scale or 0)
+    if isinstance(column_type, types.Integer):
+        return pa.int64()
+    if isinstance(column_type, types.DateTime):
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(column_type, types.Date):
+        return pa.date32()
+    if isinstance(column_type, types.Boolean):
+        return pa.bool_()
+    if isinstance(column_type, types.Float):
+        return pa.float64()
+    return pa.string()
+
+
+def arrow_schema(table: Table, columns: Optional[List[str]] = None) -> "pa.Schema":
+    """Parquet schema mirroring a table; ids and JSON columns are stored as strings"""
+    import pyarrow as pa
+
+    selected = [table.c[name] for name in columns] if columns else table.columns
+    return pa.schema([pa.field(column.name, _arrow_type(column.type)) for column in selected])
+
+
+def _to_arrow_value(column, value):
+    if value is None:
+        return None
+    if isinstance(column.type, types.Uuid):
+        return str(value)
+    if isinstance(column.type, types.JSON):
+        return json.dumps(value, default=str)
+    if isinstance(column.type, types.Numeric) and not isinstance(column.type, types.Float):
+        return Decimal(value).quantize(Decimal(1).scaleb(-(column.type.scale or 0)))
+    if isinstance(value, datetime):
+        return _as_utc(value)
+    return value
+
+
+def _from_arrow_row(table: Table, row: dict) -> dict:
+    for column in table.columns:
+        value = row.get(column.name)
+        if value is not None and isinstance(column.type, types.JSON):
+            row[column.name] = json.loads(value)
+    return row
+
+
+def arrow_table(table: Table, rows: List[dict], columns: Optional[List[str]] = None) -> "pa.Table":
+    """Rows of `table` (mappings) as an Arrow table with arrow_schema's types"""
+    import pyarrow as pa
+
+    selected = [table.c[name] for name in columns] if columns else table.columns
+    data = {
+        column.name: [_to_arrow_value(column, row[column.name]) for row in rows]
+        for column in selected
+    }
+    return pa.table(data, schema=arrow_schema(table, columns))
+
+
+def _write_parquet(table: Table, relative_path: str, rows: List[dict]) -> None:
+    import pyarrow.parquet as pq
+
+    path = os.path.join(settings.archive_dir, table.name, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write then rename so readers never see a half-written file
+    partial = f"{path}.partial"
+    pq.write_table(arrow_table(table, rows), partial, compression=COMPRESSION)
+    os.replace(partial, path)
+
+
+def _read_parquet(table: Table, relative_path: str, key: str, task_id) -> List[dict]:
+    import pyarrow.parquet as pq
+
+    path = os.path.join(settings.archive_dir, table.name, relative_path)
+    if not os.path.exists(path):
+        return []
+    data = pq.read_table(path, filters=[(key, "=", str(task_id))])
+    return [_from_arrow_row(table, row) for row in data.to_pylist()]
+
+
+def archive_batch(db: Session, cutoff: datetime, batch_size: int) -> int:
+    """Archive and delete up to `batch_size` of the oldest tasks created before `cutoff`.
+
+    Files are written before the delete commits, so a failure at worst
+    leaves unreferenced files behind; the rows stay live and are retried.
+    Returns the number of tasks archived.
+    """
+    tasks_table, steps_table, files_table = ARCHIVED_TABLES
+    tasks = db.execute(
+        select(tasks_table)
+        .where(tasks_table.c.created_at < cutoff)
+        .order_by(tasks_table.c.created_at)
+        .limit(batch_size)
+    ).mappings().all()
+    if not tasks:
+        return 0
+
+    task_ids = [task["id"] for task in tasks]
+    steps = defaultdict(list)
+    for step in db.execute(select(steps_table).where(steps_table.c.task_id.in_(task_ids))).mappings():
+        steps[step["task_id"]].append(step)
+    files = defaultdict(list)
+    for operation in db.execute(select(files_table).where(files_table.c.task_id.in_(task_ids))).mappings():
+        files[operation["task_id"]].append(operation)
+
+    groups: Dict[tuple, list] = defaultdict(list)
+    for task in tasks:
+        groups[(_as_utc(task["created_at"]).date(), task["project_id"])].append(task)
+
+    part = f"part-{uuid.uuid4().hex}.parquet"
+    manifest = []
+    for (day, project_id), group in groups.items():
+        relative_path = f"day={day.isoformat()}/project={project_id}/{part}"
+        _write_parquet(tasks_table, relative_path, group)
+        group_steps = [step for task in group for step in steps[task["id"]]]
+        if group_steps:
+            _write_parquet(steps_table, relative_path, group_steps)
+        group_files = [operation for task in group for operation in files[task["id"]]]
+        if group_files:
+            _write_parquet(files_table, relative_path, group_files)
+
+        for task in group:
+            entry = {
+                "task_id": task["id"],
+                "project_id": task["project_id"],
+                "session_id": task["session_id"],
+                "archive_day": day,
+                "path": relative_path,
+                "created_at": task["created_at"],
+            }
+            entry.update({column: task[column] for column in _ROLLUP_COLUMNS})
+            manifest.append(entry)
+
+    db.execute(insert(ArchivedTask.__table__), manifest)
+    db.execute(delete(files_table).where(files_table.c.task_id.in_(task_ids)))
+    # Archived tasks are replayed from their operations; checkpoints go
+    db.execute(delete(FileSnapshot).where(FileSnapshot.task_id.in_(task_ids)))
+    db.execute(delete(steps_table).where(steps_table.c.task_id.in_(task_ids)))
+    db.execute(delete(tasks_table).where(tasks_table.c.id.in_(task_ids)))
+    db.commit()
+    return len(tasks)
+
+
+def run_retention(
+    db: Session,
+    days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+) -> int:
+    """Archive everything past the retention window, one committed batch at a time"""
+    cutoff = retention_cutoff(days)
+    batch_size = batch_size or settings.retention_batch_size
+    archived = batches = 0
+    while max_batches is None or batches < max_batches:
+        count = archive_batch(db, cutoff, batch_size)
+        archived += count
+        batches += 1
+        if count < batch_size:
+            break
+    return archived
+
+
+def find_archived(db: Session, task_id) -> Optional[ArchivedTask]:
+    return db.query(ArchivedTask).filter(ArchivedTask.task_id == task_id).first()
+
+
+def load_task(entry: ArchivedTask) -> Optional[dict]:
+    """Full task row from the archive, shaped like the Task schema"""
+    rows = _read_parquet(Task.__table__, entry.path, "id", entry.task_id)
+    if not rows:
+        return None
+    task = rows[0]
+    task["total_tokens"] = (task["input_tokens"] or 0) + (task["output_tokens"] or 0)
+    task["total_files_affected"] = (
+        (task["files_created"] or 0) + (task["files_modified"] or 0) + (task["files_deleted"] or 0)
+    )
+    return task
+
+
+def load_steps(entry: ArchivedTask) -> List[dict]:
+    steps = _read_parquet(TaskStep.__table__, entry.path, "task_id", entry.task_id)
+    return sorted(steps, key=lambda step: step["step_number"])
+
+
+def load_file_operations(entry: ArchivedTask) -> List[dict]:
+    operations = _read_parquet(FileOperation.__table__, entry.path, "task_id", entry.task_id)
+    return sorted(operations, key=lambda operation: operation["operation_timestamp"] or datetime.min.replace(tzinfo=timezone.utc))
+
+
+def main():
+    from ..core.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Archive tasks past the retention window")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="Archive and delete old tasks")
+    run.add_argument("--days", type=int, default=settings.retention_days)
+    run.add_argument("--batch-size", type=int, default=settings.retention_batch_size)
+    run.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        archived = run_retention(db, args.days, args.batch_size, args.max_batches)
+    finally:
+        db.close()
+    print(f"Archived {archived} tasks to {settings.archive_dir}")
+
+
+if __name__ == "__main__":
+    main()
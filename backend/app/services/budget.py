@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from ..models.project import Project
+from ..models.project_budget_event import ProjectBudgetEvent
+
+# Percentages of Project.budget that emit a ProjectBudgetEvent when crossed
+BUDGET_THRESHOLDS = (50, 80, 100)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """SQLite hands back naive datetimes; treat them as UTC"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _alert_level(spent: Decimal, budget: Optional[Decimal]) -> int:
+    """Highest threshold reached by `spent`, 0 if none or no budget is set"""
+    if not budget or budget <= 0:
+        return 0
+    percent = Decimal(spent) * 100 / Decimal(budget)
+    reached = [threshold for threshold in BUDGET_THRESHOLDS if percent >= threshold]
+    return reached[-1] if reached else 0
+
+
+def apply_task_cost_change(
+    db: Session, project_id, cost_delta=0, token_delta: int = 0
+) -> None:
+    """Add a task's cost/token delta to its project's running counters.
+
+    The increment is done in SQL so concurrent task updates never lose spend.
+    The caller owns the transaction.
+    """
+    cost_delta = Decimal(cost_delta or 0)
+    token_delta = int(token_delta or 0)
+    if not cost_delta and not token_delta:
+        return
+
+    db.query(Project).filter(Project.id == project_id).update(
+        {
+            Project.spent_usd: Project.spent_usd + cost_delta,
+            Project.spent_tokens: Project.spent_tokens + token_delta,
+            Project.first_spend_at: func.coalesce(Project.first_spend_at, func.now()),
+            Project.last_spend_at: func.now(),
+        },
+        synchronize_session=False,
+    )
+    check_budget_thresholds(db, project_id)
+
+
+def check_budget_thresholds(db: Session, project_id) -> None:
+    """Emit events for thresholds newly crossed since the last check"""
+    row = db.query(
+        Project.budget, Project.spent_usd, Project.budget_alert_level
+    ).filter(Project.id == project_id).first()
+    if row is None:
+        return
+
+    level = _alert_level(row.spent_usd or 0, row.budget)
+    if level == row.budget_alert_level:
+        return
+
+    # Conditional update so two concurrent writers don't both emit the same event
+    updated = db.query(Project).filter(
+        Project.id == project_id,
+        Project.budget_alert_level == row.budget_alert_level,
+    ).update({Project.budget_alert_level: level}, synchronize_session=False)
+    if not updated or level < row.budget_alert_level:
+        # Spend went down (task deleted / cost corrected) or budget raised:
+        # re-arm the lower thresholds without emitting anything
+        return
+
+    for threshold in BUDGET_THRESHOLDS:
+        if row.budget_alert_level < threshold <= level:
+            db.add(ProjectBudgetEvent(
+                project_id=project_id,
+                threshold=threshold,
+                spent_usd=row.spent_usd,
+                budget=row.budget,
+            ))
+
+
+def get_budget_status(project: Project, now: Optional[datetime] = None) -> dict:
+    """Budget usage and burn-rate projection from the running counters"""
+    now = now or datetime.now(timezone.utc)
+    spent = Decimal(project.spent_usd or 0)
+    budget = Decimal(project.budget) if project.budget is not None else None
+
+    burn_rate_per_day = Decimal(0)
+    if project.first_spend_at and spent > 0:
+        elapsed_days = (now - _as_utc(project.first_spend_at)).total_seconds() / 86400
+        # Avoid absurd projections from the first few minutes of spend
+        burn_rate_per_day = spent / Decimal(max(elapsed_days, 1))
+
+    status = {
+        "budget": budget,
+        "spent_usd": spent,
+        "spent_tokens": project.spent_tokens or 0,
+        "remaining_usd": None,
+        "percent_used": None,
+        "alert_level": project.budget_alert_level or 0,
+        "burn_rate_per_day": burn_rate_per_day,
+        "projected_exhaustion_date": None,
+        "projected_spend_at_end_date": None,
+        "last_spend_at": project.last_spend_at,
+    }
+
+    if budget:
+        remaining = budget - spent
+        status["remaining_usd"] = remaining
+        status["percent_used"] = float(spent * 100 / budget)
+        if burn_rate_per_day > 0:
+            if remaining <= 0:
+                status["projected_exhaustion_date"] = now.date()
+            else:
+                days_left = float(remaining / burn_rate_per_day)
+                status["projected_exhaustion_date"] = (now + timedelta(days=days_left)).date()
+
+    if project.end_date and project.end_date > now.date():
+        days_to_end = (project.end_date - now.date()).days
+        status["projected_spend_at_end_date"] = spent + burn_rate_per_day * days_to_end
+
+    return status
@@ -0,0 +1,135 @@
+"""Background deletion of large projects.
+
+Deleting a project through the ORM used to load every task, step and file
+operation before deleting them one by one. Instead, DELETE /projects/{id}
+records a DeletionJob, hides the project and revokes its API keys, then
+returns; the job removes tasks in chunks of `deletion_chunk_size`, one
+transaction per chunk, updating its progress after each. The project row
+goes last, with any remaining children handled by ON DELETE CASCADE.
+
+A job interrupted by a restart can be resumed:
+
+    python -m app.services.deletion <job_id>
+"""
+import argparse
+import glob
+import logging
+import os
+import shutil
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.api_key import ApiKey
+from ..models.archived_task import ArchivedTask
+from ..models.deletion_job import DeletionJob
+from ..models.file_operation import FileOperation
+from ..models.file_snapshot import FileSnapshot
+from ..models.task_model_usage import TaskModelUsage
+from ..models.project import Project
+from ..models.project_budget_event import ProjectBudgetEvent
+from ..models.task import Task
+from ..models.task_step import TaskStep
+
+logger = logging.getLogger(__name__)
+
+# Projects being deleted keep this status until the job removes the row
+DELETING_STATUS = "deleting"
+
+
+def start_project_deletion(db: Session, project: Project, user_id=None) -> DeletionJob:
+    """Create the job and take the project out of service; the caller runs the job"""
+    job = DeletionJob(
+        project_id=project.id,
+        project_name=project.name,
+        status="pending",
+        total_tasks=db.query(func.count(Task.id)).filter(Task.project_id == project.id).scalar(),
+        deleted_tasks=0,
+        chunk_size=settings.deletion_chunk_size,
+        created_by=user_id,
+    )
+    project.status = DELETING_STATUS
+    # Through the ORM so the API key cache listeners fire
+    for api_key in db.query(ApiKey).filter(ApiKey.project_id == project.id, ApiKey.is_active.is_(True)):
+        api_key.is_active = False
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _delete_task_chunk(db: Session, project_id, chunk_size: int) -> int:
+    task_ids = db.execute(
+        select(Task.id).where(Task.project_id == project_id).limit(chunk_size)
+    ).scalars().all()
+    if not task_ids:
+        return 0
+    # Children explicitly: on the partitioned tables there is no FK to cascade
+    db.execute(delete(FileOperation).where(FileOperation.task_id.in_(task_ids)))
+    db.execute(delete(FileSnapshot).where(FileSnapshot.task_id.in_(task_ids)))
+    db.execute(delete(TaskModelUsage).where(TaskModelUsage.task_id.in_(task_ids)))
+    db.execute(delete(TaskStep).where(TaskStep.task_id.in_(task_ids)))
+    db.execute(delete(Task).where(Task.id.in_(task_ids)))
+    return len(task_ids)
+
+
+def _remove_archive_files(project_id) -> None:
+    pattern = os.path.join(settings.archive_dir, "*", "day=*", f"project={project_id}")
+    for path in glob.glob(pattern):
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def run_project_deletion(job_id) -> None:
+    """Execute a deletion job to completion (BackgroundTasks entry point)"""
+    db = SessionLocal()
+    try:
+        job = db.get(DeletionJob, job_id)
+        if job is None or job.status == "completed":
+            return
+        job.status = "running"
+        job.started_at = job.started_at or datetime.now(timezone.utc)
+        job.error_message = None
+        db.commit()
+
+        try:
+            chunk_size = job.chunk_size or settings.deletion_chunk_size
+            while True:
+                deleted = _delete_task_chunk(db, job.project_id, chunk_size)
+                if not deleted:
+                    break
+                job.deleted_tasks = (job.deleted_tasks or 0) + deleted
+                db.commit()
+
+            db.execute(delete(ArchivedTask).where(ArchivedTask.project_id == job.project_id))
+            # Usage rows outlive archiving, so archived tasks still have some
+            db.execute(delete(TaskModelUsage).where(TaskModelUsage.project_id == job.project_id))
+            db.execute(delete(ProjectBudgetEvent).where(ProjectBudgetEvent.project_id == job.project_id))
+            db.execute(delete(ApiKey).where(ApiKey.project_id == job.project_id))
+            db.execute(delete(Project).where(Project.id == job.project_id))
+            job.status = "completed"
+            job.finished_at = datetime.now(timezone.utc)
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            logger.exception("Deletion job %s failed", job_id)
+            job.status = "failed"
+            job.error_message = str(exc)
+            db.commit()
+            return
+
+        _remove_archive_files(job.project_id)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resume a project deletion job")
+    parser.add_argument("job_id")
+    args = parser.parse_args()
+    run_project_deletion(uuid.UUID(args.job_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Environment profiles: Task.environment_info interned by content hash.
+
+Agents send the same environment_info (OS, runtime, agent config) with
+nearly every task. Ingest stores each distinct blob once in
+environment_profiles, keyed by the SHA-256 of its canonical JSON, and the
+task keeps only environment_profile_id (its own environment_info is left
+empty). Reads put the blob back (`attach`), so responses are unchanged;
+GET /tasks/{id}?expand=environment adds the profile itself and
+/analytics/environments groups tasks by its id.
+
+Profiles never change, so hash -> id and id -> blob are cached per process
+and a known environment costs no queries at ingest.
+
+Tasks stored before profiles existed are interned by:
+
+    python -m app.services.environments backfill [--batch-size 1000]
+"""
+import argparse
+import hashlib
+import json
+from typing import Dict, Iterable, Optional
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..models.environment_profile import EnvironmentProfile
+from ..models.task import Task
+
+profile_ids = TTLCache(maxsize=settings.environment_cache_size, ttl=None)  # content hash -> id
+profile_infos = TTLCache(maxsize=settings.environment_cache_size, ttl=None)  # id -> environment_info
+
+
+def content_hash(info: dict) -> str:
+    canonical = json.dumps(info, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _find(db, digest: str) -> Optional[int]:
+    return db.scalar(select(EnvironmentProfile.id).where(EnvironmentProfile.content_hash == digest))
+
+
+def intern(db, info: Optional[dict]) -> Optional[int]:
+    """Id of the profile for `info`, stored if new (None for an empty blob); the caller commits.
+
+    `db` may be a Session or a Connection.
+    """
+    if not info:
+        return None
+    digest = content_hash(info)
+    profile_id = profile_ids.get(digest)
+    if profile_id is not None:
+        return profile_id
+    profile_id = _find(db, digest)
+    if profile_id is not None:
+        # Only ids read back are cached: a new row may still be rolled back
+        profile_ids.set(digest, profile_id)
+        profile_infos.set(profile_id, info)
+        return profile_id
+    try:
+        with db.begin_nested():
+            return db.scalar(
+                insert(EnvironmentProfile)
+                .values(content_hash=digest, environment_info=info)
+                .returning(EnvironmentProfile.id)
+            )
+    except IntegrityError:  # stored concurrently
+        return _find(db, digest)
+
+
+def intern_fields(db, fields: dict) -> dict:
+    """Task column values with a given environment_info swapped for its profile id"""
+    if "environment_info" in fields:
+        fields["environment_profile_id"] = intern(db, fields["environment_info"])
+        fields["environment_info"] = {}
+    return fields
+
+
+def profiles(db: Session, ids: Iterable[Optional[int]]) -> Dict[int, dict]:
+    """environment_info by profile id, from the cache or one query"""
+    found = {}
+    for profile_id in set(ids) - {None}:
+        found[profile_id] = profile_infos.get(profile_id)
+    missing = [profile_id for profile_id, info in found.items() if info is None]
+    if missing:
+        rows = db.execute(
+            select(EnvironmentProfile.id, EnvironmentProfile.environment_info)
+            .where(EnvironmentProfile.id.in_(missing))
+        )
+        for profile_id, info in rows:
+            profile_infos.set(profile_id, info)
+            found[profile_id] = info
+    return {profile_id: info for profile_id, info in found.items() if info is not None}
+
+
+def attach(db: Session, tasks: list) -> list:
+    """Put the interned environment_info back on `tasks` (ORM objects or row dicts)"""
+    get = lambda task, name: task.get(name) if isinstance(task, dict) else getattr(task, name)
+    infos = profiles(db, (get(task, "environment_profile_id") for task in tasks))
+    for task in tasks:
+        info = infos.get(get(task, "environment_profile_id"))
+        if info is None:
+            continue
+        if isinstance(task, dict):
+            task["environment_info"] = info
+        else:
+            # Not a change to flush: the row keeps its empty blob
+            set_committed_value(task, "environment_info", info)
+    return tasks
+
+
+def backfill(db: Session, batch_size: int = 1000) -> int:
+    """Intern the environment_info of every live task, a committed batch at a time"""
+    tasks = Task.__table__
+    done, last_id = 0, None
+    while True:
+        statement = (
+            select(tasks.c.id, tasks.c.environment_info)
+            .where(tasks.c.environment_profile_id.is_(None))
+            .order_by(tasks.c.id)
+            .limit(batch_size)
+        )
+        if last_id is not None:
+            statement = statement.where(tasks.c.id > last_id)
+        batch = db.execute(statement).all()
+        if not batch:
+            return done
+        by_profile: Dict[int, list] = {}
+        for task_id, info in batch:
+            if info:
+                by_profile.setdefault(intern(db, info), []).append(task_id)
+        for profile_id, task_ids in by_profile.items():
+            db.execute(
+                update(tasks)
+                .where(tasks.c.id.in_(task_ids))
+                .values(environment_profile_id=profile_id, environment_info={})
+            )
+            done += len(task_ids)
+        db.commit()
+        last_id = batch[-1][0]
+
+
+def main():
+    from ..core.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Intern task environment_info into environment_profiles")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("backfill", help="Intern the environment_info of every live task")
+    run.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        done = backfill(db, args.batch_size)
+    finally:
+        db.close()
+    print(f"Interned the environment of {done} tasks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Batched task events (POST /tasks/{task_id}/events).
+
+Agents buffer steps, log entries and file operations and send them in
+batches (see app/client); a batch is stored in one transaction with one
+statement per kind. Steps may arrive before their parents (a span is sent
+when it ends, so children end first), so parents are not checked here.
+
+Delivery is at least once: a batch whose response was lost is sent again.
+Steps and file operations carry client-assigned ids, and ones already
+stored for the task are skipped; log entries have no ids and may repeat.
+An id repeated within a batch, or already used by another task, rejects
+the whole batch.
+
+Step numbers are unique per task. The partitioned task_steps table can't
+enforce that on PostgreSQL, so a batch is numbered and checked while holding
+the task's advisory lock (shared with POST /tasks/{task_id}/steps).
+"""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import cast, func, insert, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+from ..core.partitioning import advisory_xact_lock
+from ..models.file_operation import FileOperation
+from ..models.task import Task
+from ..models.task_step import TaskStep
+from ..schemas.event import TaskEventBatch
+
+
+class InvalidBatch(ValueError):
+    """A batch that can't be stored as sent; nothing of it is stored"""
+
+
+class IdConflict(InvalidBatch):
+    """A client-assigned id is already used by another task's step or file operation"""
+
+
+def _scoped(model, task_id, created_after: Optional[datetime]) -> list:
+    filters = [model.task_id == task_id]
+    if created_after is not None:
+        filters.append(model.created_at >= created_after)
+    return filters
+
+
+def _new_rows(db: Session, model, task_id, items) -> list:
+    """Rows for the items not stored yet (by client-assigned id)"""
+    rows = [item.dict(exclude_none=True) for item in items]
+    ids = [row["id"] for row in rows if "id" in row]
+    if len(set(ids)) < len(ids):
+        raise InvalidBatch(f"Duplicate ids in {model.__tablename__}")
+    if ids:
+        # Not scoped to the task, so another task's id is caught here rather
+        # than as a primary key violation on insert
+        stored = dict(db.execute(select(model.id, model.task_id).where(model.id.in_(ids))).all())
+        if any(owner != task_id for owner in stored.values()):
+            raise IdConflict(f"Ids in {model.__tablename__} already belong to another task")
+        rows = [row for row in rows if row.get("id") not in stored]
+    for row in rows:
+        row["task_id"] = task_id
+    return rows
+
+
+def _append_logs(db: Session, task_filters: list, logs: list) -> None:
+    if db.get_bind().dialect.name == "postgresql":
+        # In place, so concurrent batches for one task don't overwrite each other
+        db.execute(
+            update(Task)
+            .where(*task_filters)
+            .values(logs=func.coalesce(Task.logs, cast([], JSONB)).op("||")(cast(logs, JSONB)))
+            .execution_options(synchronize_session=False)
+        )
+        return
+    task = db.query(Task).filter(*task_filters).with_for_update().one()
+    task.logs = list(task.logs or []) + logs
+
+
+def record_events(
+    db: Session,
+    task_id,
+    task_filters: list,
+    batch: TaskEventBatch,
+    created_after: Optional[datetime] = None,
+) -> dict:
+    """Store a batch of events for a live task; the caller commits.
+
+    Steps without a step_number are numbered after the task's last step, in
+    batch order. Returns how many of each kind were stored.
+    """
+    advisory_xact_lock(db, f"task_steps:{task_id}")
+    steps = _new_rows(db, TaskStep, task_id, batch.steps)
+    numbered = [row["step_number"] for row in steps if "step_number" in row]
+    if len(set(numbered)) < len(numbered) or (numbered and db.scalar(
+        select(TaskStep.id).where(TaskStep.step_number.in_(numbered), *_scoped(TaskStep, task_id, created_after)).limit(1)
+    )):
+        raise InvalidBatch("Step number already exists")
+    unnumbered = [row for row in steps if "step_number" not in row]
+    if unnumbered:
+        last_number = db.scalar(
+            select(func.max(TaskStep.step_number)).where(*_scoped(TaskStep, task_id, created_after))
+        ) or 0
+        last_number = max([last_number, *numbered])
+        for offset, row in enumerate(unnumbered, start=1):
+            row["step_number"] = last_number + offset
+    if steps:
+        db.execute(insert(TaskStep), steps)
+
+    file_operations = _new_rows(db, FileOperation, task_id, batch.file_operations)
+    if file_operations:
+        db.execute(insert(FileOperation), file_operations)
+
+    if batch.logs:
+        _append_logs(db, task_filters, batch.logs)
+    else:
+        # Activity keeps the task from being swept as stale (app/services/sweeper.py)
+        db.execute(
+            update(Task).where(*task_filters).values(updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+
+    return {"steps": len(steps), "logs": len(batch.logs), "file_operations": len(file_operations)}
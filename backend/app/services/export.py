@@ -0,0 +1,174 @@
+"""Streaming bulk export of tasks (GET /tasks/export).
+
+Rows are read through a server-side cursor (`yield_per`, which implies
+`stream_results` on PostgreSQL) and encoded batch by batch, so memory use
+stays at one batch of `export_batch_size` rows however many tasks match.
+Formats:
+
+* ndjson: one JSON object per line,
+* csv: header row, JSON columns as JSON text,
+* parquet: one zstd row group per batch (same types as the archive files).
+
+ndjson and csv can be gzipped on the fly; Parquet is compressed already.
+"""
+import csv
+import io
+import json
+import uuid
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, Iterator, List, Optional
+from sqlalchemy import func, select, types
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.serialization import dumps
+from ..models.environment_profile import EnvironmentProfile
+from ..models.task import Task
+
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+EXPORT_COLUMNS = [column.name for column in Task.__table__.columns]
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _column(name: str):
+    table = Task.__table__
+    if name == "environment_info":
+        # Interned blobs come from their profile (app/services/environments.py)
+        return func.coalesce(EnvironmentProfile.environment_info, table.c.environment_info).label(name)
+    return table.c[name]
+
+
+def _batches(db: Session, filters: list, columns: List[str]) -> Iterator[List[dict]]:
+    table = Task.__table__
+    statement = (
+        select(*(_column(name) for name in columns))
+        .select_from(table.outerjoin(EnvironmentProfile, EnvironmentProfile.id == table.c.environment_profile_id))
+        .where(*filters)
+        .order_by(table.c.created_at, table.c.id)
+        .execution_options(yield_per=settings.export_batch_size)
+    )
+    result = db.execute(statement)
+    try:
+        for partition in result.mappings().partitions():
+            yield partition
+    finally:
+        result.close()
+
+
+def _ndjson(batches: Iterable[List[dict]]) -> Iterator[bytes]:
+    for batch in batches:
+        yield b"".join(dumps(dict(row)) + b"\n" for row in batch)
+
+
+def _csv_value(value, is_json: bool):
+    if value is None:
+        return ""
+    if is_json:
+        return json.dumps(value, default=_json_default)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _csv(batches: Iterable[List[dict]], columns: List[str]) -> Iterator[bytes]:
+    json_columns = {
+        name for name in columns if isinstance(Task.__table__.c[name].type, types.JSON)
+    }
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        for row in batch:
+            writer.writerow([_csv_value(row[name], name in json_columns) for name in columns])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class _StreamSink:
+    """Write-only file for ParquetWriter that hands out what was written so far"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+def _parquet(batches: Iterable[List[dict]], columns: List[str]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from .archive import COMPRESSION, arrow_schema, arrow_table
+
+    sink = _StreamSink()
+    writer = pq.ParquetWriter(
+        pa.PythonFile(sink, mode="w"), arrow_schema(Task.__table__, columns), compression=COMPRESSION
+    )
+    try:
+        for batch in batches:
+            writer.write_table(arrow_table(Task.__table__, batch, columns))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def _gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_tasks(
+    db: Session,
+    filters: list,
+    export_format: str,
+    columns: Optional[List[str]] = None,
+    gzip: bool = False,
+) -> Iterator[bytes]:
+    """Encoded export of the tasks matching `filters`, as a stream of byte chunks"""
+    columns = columns or EXPORT_COLUMNS
+    batches = _batches(db, filters, columns)
+    if export_format == "ndjson":
+        chunks = _ndjson(batches)
+    elif export_format == "csv":
+        chunks = _csv(batches, columns)
+    else:
+        chunks = _parquet(batches, columns)
+    return _gzip(chunks) if gzip else chunks
@@ -0,0 +1,133 @@
+"""Per-model usage: Task.cost_breakdown normalized into task_model_usage.
+
+cost_breakdown maps a model name to what the task used of it:
+
+    {"gpt-4o": {"input_tokens": 1200, "output_tokens": 300, "cost_usd": 0.0042}}
+
+(a bare number is taken as the cost). Each entry becomes a TaskModelUsage
+row, linked to the AgentModel with that model_name when there is one
+(case-insensitive, active models first). Rows are rewritten whenever the
+task's cost_breakdown changes and follow its status, so /analytics/models
+aggregates them with plain indexed GROUP BYs instead of extracting JSON
+from every task.
+
+Tasks created before the table existed are filled in by:
+
+    python -m app.services.model_usage backfill [--batch-size 1000]
+"""
+import argparse
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+from ..models.agent_model import AgentModel
+from ..models.task import Task
+from ..models.task_model_usage import TaskModelUsage
+
+_NAME_LENGTH = TaskModelUsage.__table__.c.model_name.type.length
+
+
+def parse_cost_breakdown(breakdown) -> List[dict]:
+    """(model_name, tokens, cost) entries of a cost_breakdown; malformed entries are skipped"""
+    if not isinstance(breakdown, dict):
+        return []
+    entries = []
+    for name, usage in breakdown.items():
+        if not isinstance(usage, dict):
+            usage = {"cost_usd": usage}
+        try:
+            entries.append({
+                "model_name": str(name)[:_NAME_LENGTH],
+                "input_tokens": int(usage.get("input_tokens") or 0),
+                "output_tokens": int(usage.get("output_tokens") or 0),
+                "cost_usd": Decimal(str(usage.get("cost_usd", usage.get("cost")) or 0)),
+            })
+        except (TypeError, ValueError, InvalidOperation):
+            continue
+    return entries
+
+
+def _agent_model_ids(db: Session, names: Iterable[str]) -> Dict[str, object]:
+    names = {name.lower() for name in names}
+    if not names:
+        return {}
+    rows = (
+        db.query(func.lower(AgentModel.model_name), AgentModel.id)
+        .filter(func.lower(AgentModel.model_name).in_(names))
+        .order_by(func.coalesce(AgentModel.is_active, False))  # active ones last, so they win below
+        .all()
+    )
+    return {name: model_id for name, model_id in rows}
+
+
+def replace_usage(db: Session, tasks: list) -> None:
+    """Rewrite the usage rows of `tasks` (ORM objects or row dicts); the caller commits"""
+    get = lambda task, name: task[name] if isinstance(task, dict) else getattr(task, name)
+    rows = []
+    for task in tasks:
+        for entry in parse_cost_breakdown(get(task, "cost_breakdown")):
+            entry.update(
+                task_id=get(task, "id"),
+                project_id=get(task, "project_id"),
+                task_status=get(task, "status"),
+                created_at=get(task, "created_at"),
+            )
+            rows.append(entry)
+
+    model_ids = _agent_model_ids(db, (row["model_name"] for row in rows))
+    for row in rows:
+        row["agent_model_id"] = model_ids.get(row["model_name"].lower())
+
+    db.execute(delete(TaskModelUsage).where(TaskModelUsage.task_id.in_([get(task, "id") for task in tasks])))
+    if rows:
+        db.execute(insert(TaskModelUsage), rows)
+
+
+def set_usage_status(db: Session, task_ids: list, status: str) -> None:
+    """Follow a status change of the tasks; the caller commits"""
+    if task_ids:
+        db.execute(
+            update(TaskModelUsage)
+            .where(TaskModelUsage.task_id.in_(task_ids))
+            .values(task_status=status)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def backfill(db: Session, batch_size: int = 1000) -> int:
+    """Usage rows for every live task, rewritten a committed batch at a time"""
+    tasks = Task.__table__
+    columns = [tasks.c.id, tasks.c.project_id, tasks.c.status, tasks.c.created_at, tasks.c.cost_breakdown]
+    done, last_id = 0, None
+    while True:
+        statement = select(*columns).order_by(tasks.c.id).limit(batch_size)
+        if last_id is not None:
+            statement = statement.where(tasks.c.id > last_id)
+        batch = [dict(row) for row in db.execute(statement).mappings()]
+        if not batch:
+            return done
+        replace_usage(db, batch)
+        db.commit()
+        done += len(batch)
+        last_id = batch[-1]["id"]
+
+
+def main():
+    from ..core.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Normalize task cost breakdowns into task_model_usage")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("backfill", help="Rewrite the usage rows of every live task")
+    run.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        done = backfill(db, args.batch_size)
+    finally:
+        db.close()
+    print(f"Rewrote model usage for {done} tasks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""Session replay: a task's workspace as it was after any step.
+
+File operations are applied in replay order (step_number, then timestamp;
+operations without a step number come last and only count towards a full
+replay). An operation sets the file to its content_after, else applies its
+unified diff to the current content; a file whose content can't be derived
+is returned with `content_known=False`.
+
+Reconstruction is bounded by checkpoints: every
+`replay_checkpoint_interval` operations a FileSnapshot of the whole
+workspace is stored (lazily, the first time a replay passes that point), so
+a replay restores the nearest snapshot and applies at most one interval of
+operations. A snapshot records the last operation it includes; if
+operations are later inserted before it, it no longer matches and is
+rebuilt. Rebuilt states are kept in an LRU keyed the same way.
+
+    python -m app.services.replay <task_id> [--step N]
+"""
+import argparse
+import re
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..models.file_operation import FileOperation
+from ..models.file_snapshot import FileSnapshot
+
+# (task_id, operations applied, last operation id) -> {path: content}.
+# Entries never go stale (the key pins the exact operation prefix), so no TTL.
+state_cache = TTLCache(maxsize=settings.replay_cache_size, ttl=None)
+
+# Full operations are loaded this many at a time
+_LOAD_CHUNK = 500
+
+_HUNK = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+@dataclass
+class Workspace:
+    task_id: uuid.UUID
+    step_number: Optional[int]
+    operations_applied: int
+    checkpoint_operations: int  # restored from a snapshot rather than replayed
+    from_cache: bool
+    files: Dict[str, Optional[str]]
+
+
+def apply_unified_diff(text: str, diff: str) -> Optional[str]:
+    """Apply a single-file unified diff; None if it doesn't match `text`"""
+    source = text.splitlines(keepends=True)
+    lines = diff.splitlines(keepends=True)
+    result: List[str] = []
+    position = index = 0
+    while index < len(lines):
+        match = _HUNK.match(lines[index])
+        index += 1
+        if not match:
+            continue  # ---/+++ headers
+        # "-0,0" (empty source) starts before line 1
+        start = int(match.group(1)) - (0 if match.group(2) == "0" else 1)
+        if start < position:
+            return None
+        result.extend(source[position:start])
+        position = start
+        while index < len(lines) and not lines[index].startswith("@@"):
+            tag, body = lines[index][:1], lines[index][1:]
+            index += 1
+            if tag in (" ", "-"):
+                if position >= len(source) or source[position].rstrip("\r\n") != body.rstrip("\r\n"):
+                    return None
+                if tag == " ":
+                    result.append(source[position])
+                position += 1
+            elif tag == "+":
+                result.append(body)
+            # "\ No newline at end of file" and stray lines are ignored
+    result.extend(source[position:])
+    return "".join(result)
+
+
+def apply_operation(files: Dict[str, Optional[str]], operation) -> None:
+    """Apply one file operation (ORM object or archived row dict) in place"""
+    get = operation.get if isinstance(operation, dict) else lambda name: getattr(operation, name)
+    path = get("file_path")
+    if get("operation_type") == "delete":
+        files.pop(path, None)
+        return
+    if get("content_after") is not None:
+        files[path] = get("content_after")
+        return
+    current = files.get(path, "" if get("operation_type") == "create" else None)
+    diff = get("diff_content")
+    files[path] = apply_unified_diff(current, diff) if diff and current is not None else None
+
+
+def _replay_key(operation) -> tuple:
+    get = operation.get if isinstance(operation, dict) else lambda name: getattr(operation, name)
+    step_number, timestamp = get("step_number"), get("operation_timestamp")
+    return (step_number is None, step_number or 0, timestamp is None, timestamp, str(get("id")))
+
+
+def _target(index: list, step_number: Optional[int]) -> int:
+    """Operations applied by the end of `step_number` (a prefix in replay order)"""
+    if step_number is None:
+        return len(index)
+    return sum(1 for operation in index if operation.step_number is not None and operation.step_number <= step_number)
+
+
+def _operation_filters(task_id, created_after: Optional[datetime]) -> list:
+    filters = [FileOperation.task_id == task_id]
+    if created_after is not None:
+        filters.append(FileOperation.created_at >= created_after)
+    return filters
+
+
+def _latest_checkpoint(db: Session, task_id, index: list, target: int, save_checkpoints: bool) -> Optional[FileSnapshot]:
+    snapshots = (
+        db.query(FileSnapshot)
+        .filter(FileSnapshot.task_id == task_id, FileSnapshot.operation_count <= target)
+        .order_by(FileSnapshot.operation_count.desc())
+        .all()
+    )
+    for snapshot in snapshots:
+        if index[snapshot.operation_count - 1].id == snapshot.last_operation_id:
+            return snapshot
+        if save_checkpoints:
+            db.delete(snapshot)  # operations were inserted before it
+    if save_checkpoints and snapshots:
+        db.flush()
+    return None
+
+
+def rebuild_workspace(
+    db: Session,
+    task_id,
+    step_number: Optional[int] = None,
+    created_after: Optional[datetime] = None,
+    save_checkpoints: bool = True,
+) -> Workspace:
+    """Workspace of a live task after `step_number` (None: after every operation).
+
+    New snapshots are added to the session when `save_checkpoints` is set;
+    the caller commits.
+    """
+    index = sorted(
+        db.query(FileOperation.id, FileOperation.step_number, FileOperation.operation_timestamp)
+        .filter(*_operation_filters(task_id, created_after)),
+        key=_replay_key,
+    )
+    target = _target(index, step_number)
+    if not target:
+        return Workspace(task_id, step_number, 0, 0, False, {})
+
+    key = (str(task_id), target, index[target - 1].id)
+    cached = state_cache.get(key)
+    if cached is not None:
+        return Workspace(task_id, step_number, target, 0, True, cached)
+
+    checkpoint = _latest_checkpoint(db, task_id, index, target, save_checkpoints)
+    files = dict(checkpoint.files) if checkpoint else {}
+    position = start = checkpoint.operation_count if checkpoint else 0
+
+    interval = settings.replay_checkpoint_interval
+    remaining = [operation.id for operation in index[start:target]]
+    for offset in range(0, len(remaining), _LOAD_CHUNK):
+        chunk = remaining[offset:offset + _LOAD_CHUNK]
+        operations = (
+            db.query(FileOperation)
+            .filter(FileOperation.id.in_(chunk), *_operation_filters(task_id, created_after))
+            .all()
+        )
+        for operation in sorted(operations, key=_replay_key):
+            apply_operation(files, operation)
+            position += 1
+            if save_checkpoints and interval and position % interval == 0:
+                db.add(FileSnapshot(
+                    task_id=task_id,
+                    operation_count=position,
+                    last_operation_id=operation.id,
+                    step_number=operation.step_number,
+                    files=dict(files),
+                ))
+
+    state_cache.set(key, files)
+    return Workspace(task_id, step_number, target, start, False, files)
+
+
+def replay_operations(task_id, operations: List[dict], step_number: Optional[int] = None) -> Workspace:
+    """Workspace from operations already in memory (archived tasks); no checkpoints"""
+    ordered = sorted(operations, key=_replay_key)
+    target = len(ordered) if step_number is None else sum(
+        1 for operation in ordered
+        if operation["step_number"] is not None and operation["step_number"] <= step_number
+    )
+    files: Dict[str, Optional[str]] = {}
+    for operation in ordered[:target]:
+        apply_operation(files, operation)
+    return Workspace(task_id, step_number, target, 0, False, files)
+
+
+def main():
+    from ..core.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild a task's workspace and store its checkpoints")
+    parser.add_argument("task_id")
+    parser.add_argument("--step", type=int, default=None, help="Step to stop after (default: all)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        workspace = rebuild_workspace(db, uuid.UUID(args.task_id), args.step)
+        db.commit()
+    finally:
+        db.close()
+    print(f"{workspace.operations_applied} operations, {len(workspace.files)} files")
+    for path in sorted(workspace.files):
+        print(f"  {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Task steps as a tree of spans.
+
+A step may have a parent (`parent_step_id`): a plan step encloses tool
+calls, which enclose LLM calls. `load_step_tree` fetches a task's steps with
+the totals of each step's subtree in one query: a recursive CTE builds the
+(ancestor, descendant) pairs, which are then aggregated per ancestor. Only
+the nesting itself is done in Python, in a single pass.
+
+Token and cost totals sum each step's own figures, so a step should record
+only what it used itself, not what its children did. The subtree duration is
+wall time: earliest start to latest end anywhere in the subtree.
+"""
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional
+from sqlalchemy import func, literal, select
+from sqlalchemy.orm import Session
+from ..models.task_step import TaskStep
+
+# Guards the recursion against a malformed (cyclic) tree
+MAX_DEPTH = 256
+
+_STEP_COLUMNS = [column.name for column in TaskStep.__table__.columns]
+
+
+def _scoped(table, task_id, created_after: Optional[datetime]) -> list:
+    conditions = [table.c.task_id == task_id]
+    if created_after is not None:
+        # Lets PostgreSQL skip partitions older than the task
+        conditions.append(table.c.created_at >= created_after)
+    return conditions
+
+
+def _tree_query(task_id, created_after: Optional[datetime]):
+    steps = TaskStep.__table__
+
+    closure = (
+        select(steps.c.id.label("ancestor_id"), steps.c.id.label("step_id"), literal(0).label("hops"))
+        .where(*_scoped(steps, task_id, created_after))
+        .cte("step_closure", recursive=True)
+    )
+    child = steps.alias("child")
+    closure = closure.union_all(
+        select(closure.c.ancestor_id, child.c.id, closure.c.hops + 1)
+        .join(child, child.c.parent_step_id == closure.c.step_id)
+        .where(*_scoped(child, task_id, created_after), closure.c.hops < MAX_DEPTH)
+    )
+
+    member = steps.alias("member")
+    rollups = (
+        select(
+            closure.c.ancestor_id.label("step_id"),
+            func.count().label("subtree_steps"),
+            func.sum(member.c.input_tokens).label("subtree_input_tokens"),
+            func.sum(member.c.output_tokens).label("subtree_output_tokens"),
+            func.sum(member.c.step_cost_usd).label("subtree_cost_usd"),
+            func.min(member.c.start_time).label("subtree_start"),
+            func.max(member.c.end_time).label("subtree_end"),
+        )
+        .join(member, member.c.id == closure.c.step_id)
+        .where(*_scoped(member, task_id, created_after))
+        .group_by(closure.c.ancestor_id)
+        .subquery("rollups")
+    )
+    # A step's depth is its distance from the root, the longest path ending at it
+    depths = (
+        select(closure.c.step_id, func.max(closure.c.hops).label("depth"))
+        .group_by(closure.c.step_id)
+        .subquery("depths")
+    )
+
+    return (
+        select(
+            steps,
+            depths.c.depth,
+            rollups.c.subtree_steps,
+            rollups.c.subtree_input_tokens,
+            rollups.c.subtree_output_tokens,
+            rollups.c.subtree_cost_usd,
+            rollups.c.subtree_start,
+            rollups.c.subtree_end,
+        )
+        .join(rollups, rollups.c.step_id == steps.c.id)
+        .join(depths, depths.c.step_id == steps.c.id)
+        .where(*_scoped(steps, task_id, created_after))
+        .order_by(steps.c.step_number)
+    )
+
+
+def _seconds_between(start: Optional[datetime], end: Optional[datetime]) -> Optional[float]:
+    if start is None or end is None:
+        return None
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    return (end - start).total_seconds()
+
+
+def _nest(nodes: List[dict]) -> List[dict]:
+    """Attach nodes to their parents; returns the roots. Keeps the input order."""
+    by_id = {node["id"]: node for node in nodes}
+    roots = []
+    for node in nodes:
+        node["children"] = []
+    for node in nodes:
+        parent = by_id.get(node["parent_step_id"])
+        # Steps whose parent is missing are shown at the top level
+        (parent["children"] if parent is not None else roots).append(node)
+    return roots
+
+
+def load_step_tree(db: Session, task_id, created_after: Optional[datetime] = None) -> List[dict]:
+    """A live task's steps as nested nodes with subtree totals, in one query"""
+    nodes = []
+    for row in db.execute(_tree_query(task_id, created_after)).mappings():
+        node = {name: row[name] for name in _STEP_COLUMNS}
+        node.update(
+            depth=row["depth"],
+            subtree_steps=row["subtree_steps"],
+            subtree_input_tokens=row["subtree_input_tokens"] or 0,
+            subtree_output_tokens=row["subtree_output_tokens"] or 0,
+            subtree_cost_usd=row["subtree_cost_usd"] or Decimal(0),
+            subtree_duration_seconds=_seconds_between(row["subtree_start"], row["subtree_end"]),
+        )
+        nodes.append(node)
+    return _nest(nodes)
+
+
+def build_step_tree(steps: List[dict]) -> List[dict]:
+    """Same result as load_step_tree, from step rows already in memory (archived tasks)"""
+    nodes = sorted((dict(step) for step in steps), key=lambda step: step["step_number"])
+    roots = _nest(nodes)
+
+    # Pre-order walk for depths; reversed, it visits children before parents
+    order: List[dict] = []
+    stack = [(root, 0) for root in reversed(roots)]
+    while stack:
+        node, depth = stack.pop()
+        node["depth"] = depth
+        order.append(node)
+        stack.extend((child, depth + 1) for child in reversed(node["children"]))
+
+    bounds: Dict[object, tuple] = {}
+    for node in reversed(order):
+        steps_total, input_tokens, output_tokens = 1, node["input_tokens"] or 0, node["output_tokens"] or 0
+        cost = Decimal(node["step_cost_usd"] or 0)
+        starts = [node["start_time"]] if node["start_time"] else []
+        ends = [node["end_time"]] if node["end_time"] else []
+        for child in node["children"]:
+            steps_total += child["subtree_steps"]
+            input_tokens += child["subtree_input_tokens"]
+            output_tokens += child["subtree_output_tokens"]
+            cost += child["subtree_cost_usd"]
+            child_start, child_end = bounds[child["id"]]
+            starts += [child_start] if child_start else []
+            ends += [child_end] if child_end else []
+        bounds[node["id"]] = (min(starts) if starts else None, max(ends) if ends else None)
+        node.update(
+            subtree_steps=steps_total,
+            subtree_input_tokens=input_tokens,
+            subtree_output_tokens=output_tokens,
+            subtree_cost_usd=cost,
+            subtree_duration_seconds=_seconds_between(*bounds[node["id"]]),
+        )
+    return roots
@@ -0,0 +1,116 @@
+"""Stale task sweeper: unfinished tasks whose agent went away.
+
+A task still `running` or `pending` whose row hasn't changed for
+`stale_task_timeout_minutes` is marked `stale_task_status` (timed_out by
+default), with its end time and an error message filled in if missing. Any
+write to the task counts as activity, including steps and event batches
+recorded for it.
+
+Candidates come from the partial index ix_tasks_unfinished_updated_at,
+which only holds unfinished tasks, so a sweep costs the same however many
+finished tasks there are. Tasks are updated `stale_sweep_chunk_size` at a
+time, each chunk in its own short transaction; on PostgreSQL rows locked by
+a concurrent update (or another worker's sweep) are skipped, not waited on.
+
+    python -m app.services.sweeper [--timeout-minutes 60] [--dry-run]
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models.task import Task
+from .model_usage import set_usage_status
+
+UNFINISHED_STATUSES = ("running", "pending")
+
+
+def stale_cutoff(timeout_minutes: Optional[int] = None) -> datetime:
+    minutes = settings.stale_task_timeout_minutes if timeout_minutes is None else timeout_minutes
+    return datetime.now(timezone.utc) - timedelta(minutes=minutes)
+
+
+def _stale_filters(cutoff: datetime) -> list:
+    # Same predicate as the partial index, so the planner can use it
+    return [Task.status.in_(UNFINISHED_STATUSES), Task.updated_at < cutoff]
+
+
+def count_stale_tasks(db: Session, timeout_minutes: Optional[int] = None) -> int:
+    return db.query(func.count(Task.id)).filter(*_stale_filters(stale_cutoff(timeout_minutes))).scalar()
+
+
+def sweep_chunk(db: Session, cutoff: datetime, chunk_size: int, timeout_minutes: int) -> int:
+    """Mark one chunk of stale tasks and commit; returns how many were marked"""
+    tasks = Task.__table__
+    stale = db.execute(
+        select(tasks.c.id)
+        .where(*_stale_filters(cutoff))
+        .order_by(tasks.c.updated_at)
+        .limit(chunk_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not stale:
+        db.rollback()
+        return 0
+    swept = db.execute(
+        update(tasks)
+        # The stale check again: a task may have reported in since the select
+        .where(tasks.c.id.in_(stale), *_stale_filters(cutoff))
+        .values(
+            status=settings.stale_task_status,
+            end_time=func.coalesce(tasks.c.end_time, tasks.c.updated_at),
+            error_message=func.coalesce(
+                tasks.c.error_message, f"No update for {timeout_minutes} minutes; marked by the sweeper"
+            ),
+        )
+        .returning(tasks.c.id)
+    ).scalars().all()
+    set_usage_status(db, swept, settings.stale_task_status)
+    db.commit()
+    return len(swept)
+
+
+def sweep_stale_tasks(
+    db: Session,
+    timeout_minutes: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    max_chunks: Optional[int] = None,
+) -> int:
+    """Mark every stale task, one committed chunk at a time"""
+    timeout_minutes = settings.stale_task_timeout_minutes if timeout_minutes is None else timeout_minutes
+    cutoff = stale_cutoff(timeout_minutes)
+    chunk_size = chunk_size or settings.stale_sweep_chunk_size
+    swept = chunks = 0
+    while max_chunks is None or chunks < max_chunks:
+        count = sweep_chunk(db, cutoff, chunk_size, timeout_minutes)
+        swept += count
+        chunks += 1
+        if count < chunk_size:
+            break
+    return swept
+
+
+def main():
+    from ..core.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Mark running/pending tasks without recent updates as timed out")
+    parser.add_argument("--timeout-minutes", type=int, default=settings.stale_task_timeout_minutes)
+    parser.add_argument("--chunk-size", type=int, default=settings.stale_sweep_chunk_size)
+    parser.add_argument("--max-chunks", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="Only count the stale tasks")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.dry_run:
+            print(f"{count_stale_tasks(db, args.timeout_minutes)} stale tasks")
+            return
+        swept = sweep_stale_tasks(db, args.timeout_minutes, args.chunk_size, args.max_chunks)
+    finally:
+        db.close()
+    print(f"Marked {swept} stale tasks as {settings.stale_task_status}")
+
+
+if __name__ == "__main__":
+    main()
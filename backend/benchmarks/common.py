@@ -0,0 +1,62 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks drive the API in-process through httpx, so the database has to be
+configured (via DATABASE_URL) before anything imports `app`.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+DEFAULT_SQLITE_PATH = BENCHMARK_DIR / "bench.db"
+
+
+def configure_database(database_url: Optional[str] = None, fresh: bool = True) -> str:
+    """Point the app at `database_url`, or at a throwaway SQLite file"""
+    if database_url is None:
+        if fresh and DEFAULT_SQLITE_PATH.exists():
+            DEFAULT_SQLITE_PATH.unlink()
+        database_url = f"sqlite:///{DEFAULT_SQLITE_PATH}"
+    os.environ["DATABASE_URL"] = database_url
+    # Benchmarks measure the endpoints, not the load shedder in front of them
+    os.environ.setdefault("ADMISSION_ENABLED", "false")
+    return database_url
+
+
+def create_schema() -> None:
+    """Create all tables directly; SQLite can't run the PostgreSQL migrations"""
+    from app.core.database import Base, engine
+    import app.models  # noqa: F401  (registers every table on Base.metadata)
+
+    Base.metadata.create_all(bind=engine)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds from a list of durations in seconds"""
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "count": count,
+        "mean_ms": (sum(values) / count * 1000) if count else 0.0,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": (values[-1] * 1000) if count else 0.0,
+    }
+
+
+def write_report(report: dict, output: Optional[str] = None) -> None:
+    """Print the report as JSON and optionally save it for later comparison"""
+    text = json.dumps(report, indent=2, sort_keys=True, default=str)
+    print(text)
+    if output:
+        Path(output).write_text(text + "\n")
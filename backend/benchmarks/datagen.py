@@ -0,0 +1,334 @@
+"""Seeded synthetic workload generator.
+
+Fills the database with realistic-looking projects, tasks, steps, file
+operations and logs. The same seed always produces the same rows, so runs on
+different machines or releases benchmark identical data:
+
+    python -m benchmarks.datagen --tasks 100000 --projects 50 --seed 42
+
+Rows are generated and inserted in batches with Core inserts, so memory stays
+flat from 10k up to 10M tasks. Task ids are version-7 UUIDs matching their
+created_at, like ids minted by the API.
+
+Run from the backend directory. Uses a throwaway SQLite database unless
+--database-url is given; pass --keep to add to an existing database.
+"""
+import argparse
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterator, List
+
+from .common import configure_database, create_schema, write_report
+
+AGENT_TYPES = ("claude-code", "cursor", "copilot", "aider", "devin", "custom")
+MODELS = {
+    # model: (USD per 1k input tokens, USD per 1k output tokens)
+    "claude-3-5-sonnet": (Decimal("0.003"), Decimal("0.015")),
+    "gpt-4o": (Decimal("0.0025"), Decimal("0.01")),
+    "gpt-4o-mini": (Decimal("0.00015"), Decimal("0.0006")),
+    "gemini-1.5-pro": (Decimal("0.00125"), Decimal("0.005")),
+}
+STATUSES = (("completed", 70), ("failed", 10), ("running", 5), ("pending", 15))
+STEP_TYPES = ("analysis", "code_generation", "file_operation", "api_call", "test_run", "review")
+EXTENSIONS = (".py", ".ts", ".tsx", ".js", ".md", ".json", ".yaml", ".sql", ".css")
+DIRECTORIES = ("src", "app", "tests", "docs", "lib", "api", "components", "services")
+LOG_LEVELS = (("INFO", 80), ("DEBUG", 10), ("WARNING", 7), ("ERROR", 3))
+PHRASE_LENGTHS = (2, 3, 4, 5, 6, 8, 10, 12, 20)
+WORDS = (
+    "refactor", "parser", "endpoint", "cache", "migration", "login", "report", "export",
+    "dashboard", "retry", "timeout", "schema", "query", "index", "webhook", "queue",
+)
+
+
+def _weighted(rng: random.Random, choices) -> str:
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def _phrase(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, k=words))
+
+
+class WorkloadGenerator:
+    """Deterministic row factory; the insert loop lives in `generate`"""
+
+    def __init__(self, seed: int, projects: int, days: int, now: datetime):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.days = days
+        self.now = now
+        self.project_ids = []
+        # Free text comes from a seeded pool per length: composing every
+        # phrase word by word was most of the generation time
+        self._phrases = {length: [_phrase(self.rng, length) for _ in range(256)] for length in PHRASE_LENGTHS}
+        self.projects = [self._project(index) for index in range(projects)]
+        self.sessions = 0
+
+    def _text(self, words: int) -> str:
+        return self.rng.choice(self._phrases[words])
+
+    def _uuid(self, moment: datetime):
+        from app.core.ids import uuid7_at
+
+        return uuid7_at(int(moment.timestamp() * 1000), self.rng.getrandbits(80))
+
+    def _model_usage(self, task: dict) -> List[dict]:
+        """What ingest writes to task_model_usage for the task (ids derived, not drawn)"""
+        from app.services.model_usage import parse_cost_breakdown
+
+        return [
+            dict(
+                entry,
+                id=uuid.uuid5(task["id"], entry["model_name"]),
+                task_id=task["id"],
+                project_id=task["project_id"],
+                task_status=task["status"],
+                created_at=task["created_at"],
+            )
+            for entry in parse_cost_breakdown(task["cost_breakdown"])
+        ]
+
+    def _project(self, index: int) -> dict:
+        rng = self.rng
+        created_at = self.now - timedelta(days=self.days + rng.randint(1, 60))
+        project_id = self._uuid(created_at)
+        self.project_ids.append(project_id)
+        return {
+            "id": project_id,
+            "name": f"{self._text(2).title()} {index}",
+            "code": f"BENCH-{self.seed}-{index:05d}",
+            "description": self._text(12),
+            "status": rng.choice(("active", "active", "active", "inactive", "completed")),
+            "priority": rng.choice(("low", "medium", "high")),
+            "team_members": [f"user{rng.randint(1, 200)}" for _ in range(rng.randint(1, 6))],
+            "budget": Decimal(rng.choice((50, 100, 250, 500, 1000, 5000))),
+            "tags": rng.sample(WORDS, rng.randint(0, 3)),
+            "project_metadata": {"team": rng.choice(("platform", "web", "data", "infra"))},
+            "created_at": created_at,
+        }
+
+    def task_with_children(self):
+        """One task row plus its step and file operation rows"""
+        rng = self.rng
+        # Skewed towards recent days, like real traffic growth
+        age = timedelta(seconds=self.days * 86400 * (rng.random() ** 1.5))
+        created_at = self.now - age
+        task_id = self._uuid(created_at)
+        status = _weighted(rng, STATUSES)
+        model = rng.choice(tuple(MODELS))
+        input_price, output_price = MODELS[model]
+
+        step_count = rng.randint(1, 12)
+        steps, input_tokens, output_tokens, cost = [], 0, 0, Decimal(0)
+        moment = created_at
+        for number in range(1, step_count + 1):
+            step_input = int(rng.lognormvariate(7, 1))
+            step_output = int(rng.lognormvariate(6, 1))
+            step_cost = (Decimal(step_input) * input_price + Decimal(step_output) * output_price) / 1000
+            duration = rng.randint(1, 120)
+            failed = status == "failed" and number == step_count
+            steps.append({
+                "id": self._uuid(moment),
+                "task_id": task_id,
+                # Nested about three children per step, without drawing from rng
+                # so seeds keep producing the same data
+                "parent_step_id": steps[number // 3 - 1]["id"] if number >= 3 else None,
+                "step_number": number,
+                "step_name": self._text(3),
+                "step_description": self._text(10),
+                "step_type": rng.choice(STEP_TYPES),
+                "status": "failed" if failed else "completed",
+                "start_time": moment,
+                "end_time": moment + timedelta(seconds=duration),
+                "duration_seconds": duration,
+                "input_tokens": step_input,
+                "output_tokens": step_output,
+                "step_cost_usd": step_cost.quantize(Decimal("0.000001")),
+                "result_data": {"summary": self._text(5), "ok": not failed},
+                "error_message": f"{self._text(4)} failed" if failed else None,
+                "created_at": moment,
+            })
+            input_tokens += step_input
+            output_tokens += step_output
+            cost += step_cost
+            moment += timedelta(seconds=duration)
+
+        files, counts = [], {"create": 0, "modify": 0, "delete": 0}
+        for _ in range(rng.randint(0, 6)):
+            operation = rng.choice(("create", "modify", "modify", "modify", "delete"))
+            counts[operation] += 1
+            name = f"{rng.choice(WORDS)}_{rng.randint(1, 999)}{rng.choice(EXTENSIONS)}"
+            added = rng.randint(0, 200) if operation != "delete" else 0
+            removed = rng.randint(0, 80) if operation != "create" else 0
+            files.append({
+                "id": self._uuid(moment),
+                "task_id": task_id,
+                "operation_type": operation,
+                "file_path": f"{rng.choice(DIRECTORIES)}/{rng.choice(DIRECTORIES)}/{name}",
+                "file_name": name,
+                "file_extension": name[name.rindex("."):],
+                "file_size_bytes": rng.randint(100, 50000),
+                "lines_added": added,
+                "lines_removed": removed,
+                "lines_modified": rng.randint(0, 40),
+                "diff_content": "\n".join(f"+ {self._text(6)}" for _ in range(min(added, 5))),
+                "operation_timestamp": moment,
+                "step_number": rng.randint(1, step_count),
+                "created_at": moment,
+            })
+
+        logs = [
+            {
+                "timestamp": (created_at + timedelta(seconds=offset * 5)).isoformat(),
+                "level": _weighted(rng, LOG_LEVELS),
+                "message": self._text(8),
+            }
+            for offset in range(rng.randint(0, 10))
+        ]
+        duration = int((moment - created_at).total_seconds())
+        finished = status in ("completed", "failed")
+        self.sessions += 1
+        task = {
+            "id": task_id,
+            "project_id": rng.choice(self.project_ids),
+            "name": f"{self._text(3).capitalize()}",
+            "description": self._text(20),
+            "session_id": f"bench-{self.sessions:09d}-{rng.getrandbits(32):08x}",
+            "agent_type": rng.choice(AGENT_TYPES),
+            "agent_version": f"{rng.randint(0, 3)}.{rng.randint(0, 20)}.{rng.randint(0, 9)}",
+            "status": status,
+            "priority": rng.choice(("low", "medium", "medium", "high")),
+            "start_time": created_at,
+            "end_time": moment if finished else None,
+            "duration_seconds": duration if finished else None,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cost_usd": cost.quantize(Decimal("0.000001")),
+            "cost_breakdown": {
+                model: {"input_tokens": input_tokens, "output_tokens": output_tokens, "cost_usd": float(cost)}
+            },
+            "total_steps": step_count,
+            "completed_steps": sum(1 for step in steps if step["status"] == "completed"),
+            "failed_steps": sum(1 for step in steps if step["status"] == "failed"),
+            "files_created": counts["create"],
+            "files_modified": counts["modify"],
+            "files_deleted": counts["delete"],
+            "error_message": steps[-1]["error_message"] if status == "failed" else None,
+            "logs": logs,
+            "performance_metrics": {"tokens_per_second": round(output_tokens / max(duration, 1), 2)},
+            "environment_info": {
+                "os": rng.choice(("linux", "darwin", "windows")),
+                "python": rng.choice(("3.10", "3.11", "3.12")),
+                "model": model,
+            },
+            "created_at": created_at,
+        }
+        return task, steps, files
+
+    def batches(self, tasks: int, batch_size: int) -> Iterator[Dict[str, List[dict]]]:
+        remaining = tasks
+        while remaining > 0:
+            batch = {"tasks": [], "task_steps": [], "file_operations": [], "task_model_usage": []}
+            for _ in range(min(batch_size, remaining)):
+                task, steps, files = self.task_with_children()
+                batch["tasks"].append(task)
+                batch["task_steps"].extend(steps)
+                batch["file_operations"].extend(files)
+                batch["task_model_usage"].extend(self._model_usage(task))
+            remaining -= len(batch["tasks"])
+            yield batch
+
+
+def generate(
+    tasks: int,
+    projects: int = 20,
+    seed: int = 42,
+    days: int = 90,
+    batch_size: int = 2000,
+    progress: bool = True,
+) -> dict:
+    """Insert a seeded workload into the configured database; returns row counts"""
+    from sqlalchemy import func, insert, select, update
+    from app.core.database import engine
+    from app.models.file_operation import FileOperation
+    from app.models.project import Project
+    from app.models.task import Task
+    from app.models.task_model_usage import TaskModelUsage
+    from app.models.task_step import TaskStep
+    from app.services import environments
+
+    tables = {
+        "tasks": Task.__table__,
+        "task_steps": TaskStep.__table__,
+        "file_operations": FileOperation.__table__,
+        "task_model_usage": TaskModelUsage.__table__,
+    }
+    # Pin "now" to the day so a seed gives the same rows all day long
+    now = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    generator = WorkloadGenerator(seed, projects, days, now)
+    counts = {
+        "projects": len(generator.projects), "tasks": 0, "task_steps": 0, "file_operations": 0, "task_model_usage": 0,
+    }
+    started = time.perf_counter()
+
+    with engine.begin() as connection:
+        connection.execute(insert(Project.__table__), generator.projects)
+
+    for batch in generator.batches(tasks, batch_size):
+        with engine.begin() as connection:
+            for task in batch["tasks"]:
+                environments.intern_fields(connection, task)  # as ingest does
+            for name, rows in batch.items():
+                if rows:
+                    connection.execute(insert(tables[name]), rows)
+                counts[name] += len(rows)
+        if progress:
+            elapsed = time.perf_counter() - started
+            print(f"\r{counts['tasks']}/{tasks} tasks, {counts['tasks'] / elapsed:,.0f}/s",
+                  end="", file=sys.stderr, flush=True)
+    if progress:
+        print(file=sys.stderr)
+
+    # Keep the projects' running spend counters consistent with their tasks
+    task_table = tables["tasks"]
+    project_table = Project.__table__
+    spend = select(func.coalesce(func.sum(task_table.c.cost_usd), 0)).where(
+        task_table.c.project_id == project_table.c.id
+    ).scalar_subquery()
+    tokens = select(func.coalesce(func.sum(task_table.c.input_tokens + task_table.c.output_tokens), 0)).where(
+        task_table.c.project_id == project_table.c.id
+    ).scalar_subquery()
+    with engine.begin() as connection:
+        connection.execute(
+            update(project_table)
+            .where(project_table.c.id.in_(generator.project_ids))
+            .values(spent_usd=spend, spent_tokens=tokens)
+        )
+
+    counts["seconds"] = time.perf_counter() - started
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Database to fill (default: throwaway SQLite)")
+    parser.add_argument("--tasks", type=int, default=10000, help="Tasks to generate (10k to 10M)")
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--days", type=int, default=90, help="Spread created_at over this many days")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=2000, help="Tasks per insert transaction")
+    parser.add_argument("--keep", action="store_true", help="Don't recreate the default SQLite file")
+    args = parser.parse_args()
+
+    configure_database(args.database_url, fresh=not args.keep)
+    if args.database_url is None:
+        create_schema()
+    write_report(generate(args.tasks, args.projects, args.seed, args.days, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""Endpoint benchmark suite.
+
+Drives every router in app/api/v1 in-process through httpx and reports
+throughput and p50/p95/p99 latency per endpoint:
+
+    python -m benchmarks.endpoints --tasks 10000 --output baseline.json
+    python -m benchmarks.endpoints --baseline baseline.json --output current.json
+
+    # against a local PostgreSQL, migrated with `alembic upgrade head`
+    python -m benchmarks.endpoints --database-url postgresql+psycopg2://... --tasks 100000
+
+The data comes from benchmarks.datagen with a fixed seed, so reports from
+different releases are comparable. With --baseline, each endpoint also gets
+its throughput and p95 change, and regressions beyond --threshold are listed.
+
+Run from the backend directory. Uses a throwaway SQLite database unless
+--database-url is given.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from itertools import count
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from .common import configure_database, create_schema, summarize, write_report
+
+USERNAME = "bench-user"
+PASSWORD = "bench-password"
+_unique = count()
+
+
+@dataclass
+class Endpoint:
+    name: str
+    method: str
+    path: str  # formatted per request: {task_id}, {project_id}, {created_task_id}
+    body: Optional[Callable[["Context"], dict]] = None
+    requests: Optional[int] = None  # override for expensive endpoints
+    postgresql_only: bool = False
+
+
+class Context:
+    """Sample ids and credentials shared by the requests of a run"""
+
+    def __init__(self, seed: int, headers: dict, task_ids: List[str], project_ids: List[str]):
+        self.rng = random.Random(seed)
+        self.headers = headers
+        self.task_ids = task_ids
+        self.project_ids = project_ids
+        self.created_task_ids: List[str] = []
+
+    def path(self, template: str) -> str:
+        values = {
+            "task_id": self.rng.choice(self.task_ids),
+            "project_id": self.rng.choice(self.project_ids),
+        }
+        if "{created_task_id}" in template:
+            # Deletes consume tasks made by the create benchmark
+            values["created_task_id"] = (
+                self.created_task_ids.pop() if self.created_task_ids else self.rng.choice(self.task_ids)
+            )
+        return template.format(**values)
+
+
+def _new_task(ctx: Context) -> dict:
+    return {
+        "project_id": ctx.rng.choice(ctx.project_ids),
+        "name": "Benchmark task",
+        "session_id": f"bench-endpoint-{time.time_ns()}-{next(_unique)}",
+        "status": "running",
+        "input_tokens": 1200,
+        "output_tokens": 300,
+        "cost_usd": "0.0081",
+        "logs": [{"level": "INFO", "message": "started"}],
+    }
+
+
+def _new_project(ctx: Context) -> dict:
+    return {"name": "Benchmark project", "code": f"BENCH-EP-{time.time_ns()}-{next(_unique)}"}
+
+
+ENDPOINTS = [
+    # auth
+    Endpoint("auth.login_json", "POST", "/api/v1/auth/login-json",
+             body=lambda ctx: {"username": USERNAME, "password": PASSWORD}, requests=50),
+    Endpoint("auth.me", "GET", "/api/v1/auth/me"),
+    Endpoint("auth.cache_stats", "GET", "/api/v1/auth/cache-stats"),
+    # projects
+    Endpoint("projects.list", "GET", "/api/v1/projects/?page_size=20"),
+    Endpoint("projects.list_search", "GET", "/api/v1/projects/?search=cache&page_size=20"),
+    Endpoint("projects.list_with_stats", "GET", "/api/v1/projects/?page_size=20&include_stats=true"),
+    Endpoint("projects.get", "GET", "/api/v1/projects/{project_id}"),
+    Endpoint("projects.stats", "GET", "/api/v1/projects/{project_id}/stats"),
+    Endpoint("projects.budget", "GET", "/api/v1/projects/{project_id}/budget"),
+    Endpoint("projects.api_keys", "GET", "/api/v1/projects/{project_id}/api-keys"),
+    Endpoint("projects.create", "POST", "/api/v1/projects/", body=_new_project),
+    Endpoint("projects.update", "PUT", "/api/v1/projects/{project_id}",
+             body=lambda ctx: {"description": f"benchmark update {next(_unique)}"}),
+    # tasks
+    Endpoint("tasks.list", "GET", "/api/v1/tasks/?limit=50"),
+    Endpoint("tasks.list_by_project", "GET", "/api/v1/tasks/?project_id={project_id}&limit=50"),
+    Endpoint("tasks.list_search", "GET", "/api/v1/tasks/?search=cache&limit=50"),
+    Endpoint("tasks.multi_get", "GET", "/api/v1/tasks/?ids={task_id}&session_ids=missing"),
+    Endpoint("tasks.get", "GET", "/api/v1/tasks/{task_id}"),
+    Endpoint("tasks.detail_expanded", "GET", "/api/v1/tasks/{task_id}?expand=steps,files"),
+    Endpoint("tasks.steps", "GET", "/api/v1/tasks/{task_id}/steps"),
+    Endpoint("tasks.step_tree", "GET", "/api/v1/tasks/{task_id}/steps/tree"),
+    Endpoint("tasks.files", "GET", "/api/v1/tasks/{task_id}/files"),
+    Endpoint("tasks.logs", "GET", "/api/v1/tasks/{task_id}/logs"),
+    Endpoint("tasks.export_ndjson", "GET", "/api/v1/tasks/export?project_id={project_id}", requests=20),
+    Endpoint("tasks.export_parquet", "GET", "/api/v1/tasks/export?project_id={project_id}&format=parquet",
+             requests=20),
+    Endpoint("tasks.create", "POST", "/api/v1/tasks/", body=_new_task),
+    Endpoint("tasks.update", "PUT", "/api/v1/tasks/{task_id}",
+             body=lambda ctx: {"completed_steps": ctx.rng.randint(1, 12)}),
+    Endpoint("tasks.delete", "DELETE", "/api/v1/tasks/{created_task_id}"),
+    # analytics
+    Endpoint("analytics.dashboard", "GET", "/api/v1/analytics/dashboard?days=30", requests=50),
+    Endpoint("analytics.performance", "GET", "/api/v1/analytics/tasks/performance?days=30", requests=50),
+    Endpoint("analytics.costs", "GET", "/api/v1/analytics/costs?days=30", requests=50),
+    Endpoint("analytics.usage_trends", "GET", "/api/v1/analytics/usage-trends?days=90", requests=50,
+             postgresql_only=True),  # date_trunc
+    Endpoint("analytics.models", "GET", "/api/v1/analytics/models?days=30", requests=50),
+    Endpoint("analytics.models_daily", "GET", "/api/v1/analytics/models/daily?days=30", requests=50),
+]
+
+
+async def _run_endpoint(client: httpx.AsyncClient, ctx: Context, endpoint: Endpoint,
+                        requests: int, concurrency: int) -> dict:
+    latencies, statuses = [], Counter()
+    remaining = count()
+
+    async def worker():
+        while next(remaining) < requests:
+            path = ctx.path(endpoint.path)
+            body = endpoint.body(ctx) if endpoint.body else None
+            started = time.perf_counter()
+            response = await client.request(endpoint.method, path, headers=ctx.headers, json=body)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+            if endpoint.name == "tasks.create" and response.status_code == 200:
+                ctx.created_task_ids.append(response.json()["id"])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    elapsed = time.perf_counter() - started
+    return {
+        "method": endpoint.method,
+        "path": endpoint.path,
+        "requests": requests,
+        "throughput_rps": requests / elapsed if elapsed else 0.0,
+        "status_counts": {str(code): total for code, total in sorted(statuses.items())},
+        "error_rate": sum(total for code, total in statuses.items() if code >= 400) / requests,
+        "latency": summarize(latencies),
+    }
+
+
+def _prepare_user() -> None:
+    from app.core.database import SessionLocal
+    from app.core.security import get_password_hash
+    from app.models.user import User
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == USERNAME).first()
+        if user is None:
+            user = User(username=USERNAME, email="bench@example.com", password_hash=get_password_hash(PASSWORD))
+            db.add(user)
+        user.role = "admin"  # for auth.cache_stats
+        db.commit()
+    finally:
+        db.close()
+
+
+def _sample_ids(seed: int, size: int) -> Dict[str, List[str]]:
+    from app.core.database import SessionLocal
+    from app.models.project import Project
+    from app.models.task import Task
+
+    db = SessionLocal()
+    try:
+        task_ids = [str(row.id) for row in db.query(Task.id).limit(size * 20)]
+        project_ids = [str(row.id) for row in db.query(Project.id)]
+    finally:
+        db.close()
+    if not task_ids or not project_ids:
+        raise SystemExit("No data to benchmark; run with --tasks > 0 or fill the database first")
+    rng = random.Random(seed)
+    return {"task_ids": rng.sample(task_ids, min(size, len(task_ids))), "project_ids": project_ids}
+
+
+async def run(args, dialect: str) -> dict:
+    from app.main import app
+
+    _prepare_user()
+    samples = _sample_ids(args.seed, args.sample_size)
+    selected = [
+        endpoint for endpoint in ENDPOINTS
+        if (not args.only or any(endpoint.name.startswith(prefix) for prefix in args.only))
+    ]
+
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        response = await client.post("/api/v1/auth/login-json", json={"username": USERNAME, "password": PASSWORD})
+        response.raise_for_status()
+        ctx = Context(args.seed, {"Authorization": f"Bearer {response.json()['access_token']}"}, **samples)
+
+        for endpoint in selected:
+            if endpoint.postgresql_only and dialect != "postgresql":
+                results[endpoint.name] = {"skipped": "PostgreSQL only"}
+                continue
+            requests = endpoint.requests or args.requests
+            # Warm caches and connection pools before measuring
+            await _run_endpoint(client, ctx, endpoint, min(args.warmup, requests), 1)
+            results[endpoint.name] = await _run_endpoint(client, ctx, endpoint, requests, args.concurrency)
+            print(f"{endpoint.name}: {results[endpoint.name]['throughput_rps']:.1f} req/s", flush=True)
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[dict]:
+    """Annotate results with changes against a baseline report; returns regressions"""
+    regressions = []
+    previous = baseline.get("endpoints", {})
+    for name, result in results.items():
+        before = previous.get(name)
+        if "skipped" in result or not before or "skipped" in before:
+            continue
+        p95_change = (
+            (result["latency"]["p95_ms"] - before["latency"]["p95_ms"]) / before["latency"]["p95_ms"] * 100
+            if before["latency"]["p95_ms"] else 0.0
+        )
+        throughput_change = (
+            (result["throughput_rps"] - before["throughput_rps"]) / before["throughput_rps"] * 100
+            if before["throughput_rps"] else 0.0
+        )
+        result["vs_baseline"] = {"p95_change_pct": p95_change, "throughput_change_pct": throughput_change}
+        if p95_change > threshold or throughput_change < -threshold:
+            regressions.append({"endpoint": name, **result["vs_baseline"]})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Database to run against (default: throwaway SQLite)")
+    parser.add_argument("--tasks", type=int, default=10000, help="Tasks to generate first (0 to use existing data)")
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--sample-size", type=int, default=500, help="Task ids to draw requests from")
+    parser.add_argument("--only", nargs="*", help="Endpoint name prefixes to run, e.g. tasks analytics.costs")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    database_url = configure_database(args.database_url)
+    dialect = database_url.split(":", 1)[0].split("+")[0]
+    if args.database_url is None:
+        create_schema()
+
+    report = {
+        "benchmark": "endpoints",
+        "database": dialect,
+        "config": {
+            "tasks": args.tasks, "projects": args.projects, "seed": args.seed,
+            "requests": args.requests, "concurrency": args.concurrency,
+        },
+    }
+    if args.tasks:
+        from .datagen import generate
+
+        report["datagen"] = generate(args.tasks, args.projects, args.seed)
+
+    report["endpoints"] = asyncio.run(run(args, dialect))
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            report["regressions"] = compare(report["endpoints"], json.load(baseline_file), args.threshold)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Login storm benchmark.
+
+Measures login throughput and the latency of ordinary (non-auth) endpoints
+while many clients log in at once, e.g. a CI fleet re-authenticating:
+
+    python -m benchmarks.login_storm --concurrency 64 --duration 10
+
+Run from the backend directory. Uses a throwaway SQLite database unless
+--database-url is given.
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+
+from .common import configure_database, create_schema, summarize, write_report
+
+USERNAME = "bench-user"
+PASSWORD = "bench-password"
+PROBE_PATHS = ("/health", "/api/v1/tasks/?limit=10")
+
+
+async def _probe(client, headers, stop, latencies, interval):
+    while not stop.is_set():
+        for path in PROBE_PATHS:
+            started = time.perf_counter()
+            await client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+
+
+async def _login_worker(client, stop, latencies, statuses):
+    credentials = {"username": USERNAME, "password": PASSWORD}
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.post("/api/v1/auth/login-json", json=credentials)
+        latencies.append(time.perf_counter() - started)
+        statuses[response.status_code] += 1
+
+
+async def _run_phase(client, headers, duration, concurrency, probe_interval):
+    stop = asyncio.Event()
+    probe_latencies, login_latencies = [], []
+    statuses = Counter()
+
+    workers = [
+        asyncio.create_task(_login_worker(client, stop, login_latencies, statuses))
+        for _ in range(concurrency)
+    ]
+    workers.append(asyncio.create_task(
+        _probe(client, headers, stop, probe_latencies, probe_interval)
+    ))
+
+    started = time.perf_counter()
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*workers)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "elapsed_seconds": elapsed,
+        "logins_per_second": statuses[200] / elapsed,
+        "login_status_counts": dict(statuses),
+        "login_latency": summarize(login_latencies),
+        "non_auth_latency": summarize(probe_latencies),
+    }
+
+
+async def run(args) -> dict:
+    from app.main import app
+    from app.core.config import settings
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        response = await client.post("/api/v1/auth/register", json={
+            "username": USERNAME, "email": "bench@example.com", "password": PASSWORD
+        })
+        response.raise_for_status()
+        response = await client.post("/api/v1/auth/login-json", json={
+            "username": USERNAME, "password": PASSWORD
+        })
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        baseline = await _run_phase(client, headers, args.warmup, 0, args.probe_interval)
+        storm = await _run_phase(client, headers, args.duration, args.concurrency, args.probe_interval)
+
+    return {
+        "benchmark": "login_storm",
+        "password_hash_rounds": settings.password_hash_rounds,
+        "password_hash_workers": settings.password_hash_workers,
+        "baseline": baseline,
+        "storm": storm,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Database to run against (default: throwaway SQLite)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent login clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Storm duration in seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Baseline (no storm) duration in seconds")
+    parser.add_argument("--probe-interval", type=float, default=0.05, help="Pause between non-auth probes")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    configure_database(args.database_url)
+    create_schema()
+    write_report(asyncio.run(run(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
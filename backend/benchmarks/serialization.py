@@ -0,0 +1,124 @@
+"""Serialization benchmark for task list pages.
+
+Compares, per page of tasks, the default FastAPI path against the fast path
+read_tasks uses (app/core/serialization.py):
+
+* orm: query Task objects, validate them into the Task response model
+  (from_attributes), dump in JSON mode and json.dumps the result,
+* fast: select plain rows and serialize them with orjson.
+
+Fetch and serialization are timed separately and reported per row, and the
+two outputs are checked to decode to the same JSON.
+
+    python -m benchmarks.serialization --tasks 5000 --page-size 100 --runs 50
+
+Run from the backend directory. Uses a throwaway SQLite database unless
+--database-url is given.
+"""
+import argparse
+import json
+import statistics
+import time
+from typing import Callable, List
+
+from .common import configure_database, create_schema, write_report
+
+
+def _time(function: Callable, runs: int) -> List[float]:
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def _per_row(durations: List[float], rows: int) -> dict:
+    return {
+        "median_us_per_row": statistics.median(durations) / rows * 1e6,
+        "min_us_per_row": min(durations) / rows * 1e6,
+    }
+
+
+def run(page_size: int, runs: int) -> dict:
+    from pydantic import TypeAdapter
+    from sqlalchemy import select
+    from app.api.v1.tasks import _TASK_LIST_COLUMNS
+    from app.core.database import SessionLocal
+    from app.core.serialization import dumps
+    from app.models.task import Task
+    from app.schemas.task import Task as TaskSchema
+
+    adapter = TypeAdapter(List[TaskSchema])
+    db = SessionLocal()
+    try:
+        def fetch_orm():
+            db.expunge_all()  # a request starts with an empty identity map
+            return db.query(Task).limit(page_size).all()
+
+        def fetch_rows():
+            return [dict(row) for row in db.execute(select(*_TASK_LIST_COLUMNS).limit(page_size)).mappings()]
+
+        objects, rows = fetch_orm(), fetch_rows()
+        if not rows:
+            raise SystemExit("No tasks to serialize; run with --tasks > 0")
+
+        def serialize_orm():
+            # What FastAPI does with a response_model and the default JSONResponse
+            content = adapter.dump_python(adapter.validate_python(objects), mode="json")
+            return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+        def serialize_rows():
+            return dumps(rows)
+
+        count = len(rows)
+        results = {
+            "rows_per_page": count,
+            "orm": {
+                "fetch": _per_row(_time(fetch_orm, runs), count),
+                "serialize": _per_row(_time(serialize_orm, runs), count),
+            },
+            "fast": {
+                "fetch": _per_row(_time(fetch_rows, runs), count),
+                "serialize": _per_row(_time(serialize_rows, runs), count),
+            },
+            "equivalent_output": json.loads(serialize_orm()) == json.loads(serialize_rows()),
+        }
+        for path in ("orm", "fast"):
+            results[path]["total_us_per_row"] = sum(
+                results[path][stage]["median_us_per_row"] for stage in ("fetch", "serialize")
+            )
+        results["speedup"] = results["orm"]["total_us_per_row"] / results["fast"]["total_us_per_row"]
+        return results
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Database to run against (default: throwaway SQLite)")
+    parser.add_argument("--tasks", type=int, default=2000, help="Tasks to generate first (0 to use existing data)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=50, help="Timed repetitions per stage")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    database_url = configure_database(args.database_url)
+    if args.database_url is None:
+        create_schema()
+    if args.tasks:
+        from .datagen import generate
+
+        generate(args.tasks, seed=args.seed, progress=False)
+
+    write_report({
+        "benchmark": "serialization",
+        "database": database_url.split(":", 1)[0],
+        "config": {"tasks": args.tasks, "page_size": args.page_size, "runs": args.runs},
+        "results": run(args.page_size, args.runs),
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Startup time benchmark.
+
+Measures, in fresh interpreter processes, how long a worker takes to come up:
+
+* import time of `app.main` (and the slowest imports under it),
+* time from process spawn to the first /health response under uvicorn,
+* time to the first authenticated, database-backed response.
+
+    python -m benchmarks.startup --runs 5 --output startup-1.2.0.json
+
+Run from the backend directory. Uses a throwaway SQLite database unless
+--database-url is given. Keep the JSON reports to compare releases.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from .common import BENCHMARK_DIR, configure_database, create_schema, write_report
+
+BACKEND_DIR = BENCHMARK_DIR.parent
+USERNAME = "bench-user"
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(BACKEND_DIR)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def _stats(values) -> dict:
+    return {
+        "runs": len(values),
+        "median_ms": statistics.median(values) * 1000,
+        "min_ms": min(values) * 1000,
+        "max_ms": max(values) * 1000,
+    }
+
+
+def measure_import(runs: int) -> dict:
+    """Import time of app.main, in-process and including interpreter start"""
+    import_times, process_times = [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET],
+            cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True, check=True,
+        ).stdout
+        process_times.append(time.perf_counter() - started)
+        import_times.append(float(output.strip().splitlines()[-1]))
+    return {"import": _stats(import_times), "process": _stats(process_times)}
+
+
+def slowest_imports(top: int) -> list:
+    """Top-level modules by cumulative import time, from `python -X importtime`"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True, check=True,
+    ).stderr
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        # Our modules individually, third-party ones by package (a package's
+        # outermost import has the largest cumulative time)
+        module = name.strip()
+        root = module if module.startswith("app.") else module.split(".")[0]
+        totals[root] = max(totals.get(root, 0), int(cumulative))
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{"module": module, "cumulative_ms": micros / 1000} for module, micros in ranked]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(client: httpx.Client, url: str, headers: dict, deadline: float) -> float:
+    while time.perf_counter() < deadline:
+        try:
+            if client.get(url, headers=headers).status_code == 200:
+                return time.perf_counter()
+        except httpx.TransportError:
+            pass
+        time.sleep(0.005)
+    raise TimeoutError(f"No 200 from {url}")
+
+
+def measure_first_response(runs: int, headers: dict, timeout: float) -> dict:
+    """Spawn uvicorn and time the first /health and first database-backed responses"""
+    health_times, db_times = [], []
+    for _ in range(runs):
+        port = _free_port()
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=_env(),
+        )
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=5) as client:
+                deadline = started + timeout
+                health_times.append(_wait_for(client, "/health", {}, deadline) - started)
+                db_times.append(_wait_for(client, "/api/v1/tasks/?limit=1", headers, deadline) - started)
+        finally:
+            server.terminate()
+            server.wait()
+    return {"health": _stats(health_times), "first_db_request": _stats(db_times)}
+
+
+def _create_user() -> dict:
+    from app.core.database import SessionLocal
+    from app.core.security import create_access_token, get_password_hash
+    from app.models.user import User
+
+    db = SessionLocal()
+    try:
+        if not db.query(User).filter(User.username == USERNAME).first():
+            db.add(User(username=USERNAME, email="bench@example.com", password_hash=get_password_hash("x")))
+            db.commit()
+    finally:
+        db.close()
+    return {"Authorization": f"Bearer {create_access_token(USERNAME)}"}
+
+
+def _revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Database to run against (default: throwaway SQLite)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per measurement")
+    parser.add_argument("--top-imports", type=int, default=10, help="Slowest imports to list")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for a server to respond")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    database_url = configure_database(args.database_url)
+    if args.database_url is None:
+        create_schema()
+    headers = _create_user()
+
+    write_report({
+        "benchmark": "startup",
+        "revision": _revision(),
+        "python": sys.version.split()[0],
+        "database": database_url.split(":", 1)[0],
+        "import": measure_import(args.runs),
+        "slowest_imports": slowest_imports(args.top_imports),
+        "time_to_first_response": measure_first_response(args.runs, headers, args.timeout),
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
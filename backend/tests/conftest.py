@@ -0,0 +1,64 @@
+"""Shared fixtures. The app runs against a throwaway SQLite file, so the
+database has to be configured before anything imports `app`."""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+_DB_DIR = tempfile.mkdtemp(prefix="monitoring-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/tests.db"
+os.environ.setdefault("ADMISSION_ENABLED", "false")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture(scope="session")
+def app():
+    import app.models  # noqa: F401  (registers every table on Base.metadata)
+    from app.core.database import Base, engine
+    from app.main import app as application
+
+    Base.metadata.create_all(bind=engine)
+    return application
+
+
+@pytest.fixture
+def db(app):
+    from app.core.database import SessionLocal
+
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(app):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def auth_headers(db):
+    import uuid
+    from app.core.security import create_access_token
+    from app.models.user import User
+
+    user = User(username=f"user-{uuid.uuid4().hex[:8]}", email=f"{uuid.uuid4().hex[:8]}@example.com",
+                password_hash="x", role="admin")
+    db.add(user)
+    db.commit()
+    return {"Authorization": f"Bearer {create_access_token(user.username)}"}
+
+
+@pytest.fixture
+def project(db):
+    import uuid
+    from app.models.project import Project
+
+    project = Project(name="Tests", code=f"T-{uuid.uuid4().hex[:8]}", budget=100)
+    db.add(project)
+    db.commit()
+    return project
@@ -0,0 +1,99 @@
+import gzip
+
+import pytest
+
+from app.core import compression
+from app.core.compression import BadBody, BodyTooLarge, _Decompressor, choose_encoding
+
+
+def _inflate(encoding: str, body: bytes, limit: int) -> bytes:
+    decompressor = _Decompressor(encoding, limit)
+    output = decompressor.decompress(body)
+    decompressor.finish()
+    return output
+
+
+@pytest.fixture
+def zstandard():
+    return pytest.importorskip("zstandard")
+
+
+def test_gzip_round_trip():
+    assert _inflate("gzip", gzip.compress(b"payload"), 100) == b"payload"
+
+
+def test_gzip_bomb_is_rejected():
+    bomb = gzip.compress(b"\0" * 10_000_000)
+    with pytest.raises(BodyTooLarge) as raised:
+        _inflate("gzip", bomb, 64 * 1024)
+    assert raised.value.status_code == 413
+
+
+def test_zstd_bomb_is_rejected(zstandard):
+    bomb = zstandard.ZstdCompressor().compress(b"\0" * 10_000_000)
+    with pytest.raises(BodyTooLarge) as raised:
+        _inflate("zstd", bomb, 64 * 1024)
+    assert raised.value.status_code == 413
+
+
+def test_body_exactly_at_the_limit_is_accepted():
+    assert _inflate("gzip", gzip.compress(b"x" * 1000), 1000) == b"x" * 1000
+
+
+def test_truncated_gzip_is_rejected():
+    body = gzip.compress(b"some json payload" * 100)
+    with pytest.raises(BadBody) as raised:
+        _inflate("gzip", body[:len(body) // 2], 1_000_000)
+    assert raised.value.status_code == 400
+
+
+def test_corrupt_gzip_is_rejected():
+    with pytest.raises(BadBody):
+        _inflate("gzip", b"not gzip at all", 1_000_000)
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "zstd"])
+def test_empty_body_is_accepted(encoding):
+    if encoding == "zstd":
+        pytest.importorskip("zstandard")
+    assert _inflate(encoding, b"", 100) == b""
+
+
+def test_empty_encoded_body_reaches_the_endpoint(client):
+    # Parsed as a missing body (422), not rejected as bad gzip (400)
+    response = client.post("/api/v1/auth/login-json", content=b"", headers={"Content-Encoding": "gzip"})
+    assert response.status_code == 422
+
+
+def test_bomb_through_the_middleware_gets_413(client, monkeypatch):
+    monkeypatch.setattr(compression.settings, "max_decompressed_body_bytes", 1024)
+    response = client.post(
+        "/api/v1/auth/login-json",
+        content=gzip.compress(b"{" + b" " * 1_000_000 + b"}"),
+        headers={"Content-Encoding": "gzip", "Content-Type": "application/json"},
+    )
+    assert response.status_code == 413
+
+
+def test_choose_encoding_skips_refused_encodings(zstandard):
+    assert choose_encoding("zstd;q=0, gzip") == "gzip"
+    assert choose_encoding("gzip;q=0, zstd;q=0") is None
+    assert choose_encoding("identity") is None
+
+
+def test_choose_encoding_wildcard(zstandard):
+    assert choose_encoding("*") == "zstd"
+    assert choose_encoding("*;q=0.5, zstd;q=0") == "gzip"
+    assert choose_encoding("br, *;q=0") is None
+
+
+def test_choose_encoding_tie_prefers_zstd(zstandard):
+    assert choose_encoding("gzip, zstd") == "zstd"
+    assert choose_encoding("gzip;q=0.8, zstd;q=0.8") == "zstd"
+    assert choose_encoding("gzip;q=0.9, zstd;q=0.8") == "gzip"
+
+
+def test_choose_encoding_without_zstandard(monkeypatch):
+    monkeypatch.setattr(compression, "zstandard", None)
+    assert choose_encoding("zstd, gzip;q=0.1") == "gzip"
+    assert choose_encoding("zstd") is None
@@ -0,0 +1,34 @@
+from app.services.replay import apply_unified_diff
+
+
+def test_diff_against_empty_source():
+    diff = "--- /dev/null\n+++ b/a.py\n@@ -0,0 +1,2 @@\n+first\n+second\n"
+    assert apply_unified_diff("", diff) == "first\nsecond\n"
+
+
+def test_mismatched_context_returns_none():
+    diff = "@@ -1,2 +1,2 @@\n one\n-two\n+TWO\n"
+    assert apply_unified_diff("one\nthree\n", diff) is None
+    assert apply_unified_diff("uno\ntwo\n", diff) is None
+
+
+def test_removed_line_past_end_returns_none():
+    assert apply_unified_diff("one\n", "@@ -1,2 +1,1 @@\n one\n-two\n") is None
+
+
+def test_multiple_hunks():
+    source = "".join(f"line {n}\n" for n in range(1, 11))
+    diff = (
+        "--- a/f\n+++ b/f\n"
+        "@@ -2,2 +2,2 @@\n line 2\n-line 3\n+LINE 3\n"
+        "@@ -8,2 +8,3 @@\n line 8\n+inserted\n line 9\n"
+    )
+    expected = source.replace("line 3\n", "LINE 3\n").replace("line 8\n", "line 8\ninserted\n")
+    assert apply_unified_diff(source, diff) == expected
+
+
+def test_overlapping_hunks_return_none():
+    source = "a\nb\nc\n"
+    diff = "@@ -2,1 +2,1 @@\n-b\n+B\n@@ -1,1 +1,1 @@\n-a\n+A\n"
+    assert apply_unified_diff(source, diff) is None
+
@@ -0,0 +1,23 @@
+import uuid
+
+from app.models.file_operation import FileOperation
+from app.models.task_step import TaskStep
+
+
+def test_delete_task_removes_its_steps_and_file_operations(client, auth_headers, project, db):
+    response = client.post("/api/v1/tasks/", headers=auth_headers, json={
+        "project_id": str(project.id), "name": "doomed", "session_id": f"doomed-{uuid.uuid4()}",
+    })
+    task_id = response.json()["id"]
+    events = {
+        "steps": [{"step_name": f"step {n}"} for n in range(3)],
+        "file_operations": [{"file_path": "a.py", "operation_type": "create"}],
+    }
+    assert client.post(f"/api/v1/tasks/{task_id}/events", headers=auth_headers, json=events).status_code == 200
+
+    assert client.delete(f"/api/v1/tasks/{task_id}", headers=auth_headers).status_code == 200
+
+    task_uuid = uuid.UUID(task_id)
+    assert db.query(TaskStep).filter(TaskStep.task_id == task_uuid).count() == 0
+    assert db.query(FileOperation).filter(FileOperation.task_id == task_uuid).count() == 0
+    assert client.get(f"/api/v1/tasks/{task_id}", headers=auth_headers).status_code == 404
@@ -0,0 +1,62 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+
+def _create_task(client, headers, project) -> str:
+    response = client.post("/api/v1/tasks/", headers=headers, json={
+        "project_id": str(project.id), "name": "paged", "session_id": f"paged-{uuid.uuid4()}",
+    })
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def _pages(client, headers, task_id, collection: str, limit: int) -> list:
+    pages, cursor = [], None
+    while True:
+        params = {"expand": collection, f"{collection}_limit": limit}
+        if cursor:
+            params[f"{collection}_cursor"] = cursor
+        response = client.get(f"/api/v1/tasks/{task_id}", headers=headers, params=params)
+        assert response.status_code == 200
+        page = response.json()[collection]
+        pages.append(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_steps_cursor_walks_every_page(client, auth_headers, project):
+    task_id = _create_task(client, auth_headers, project)
+    steps = [{"step_name": f"step {n}", "step_number": n} for n in range(1, 8)]
+    assert client.post(f"/api/v1/tasks/{task_id}/events", headers=auth_headers, json={"steps": steps}).status_code == 200
+
+    pages = _pages(client, auth_headers, task_id, "steps", 3)
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [step["step_number"] for page in pages for step in page] == list(range(1, 8))
+
+
+def test_files_cursor_walks_every_page_with_tied_timestamps(client, auth_headers, project):
+    task_id = _create_task(client, auth_headers, project)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    # Pairs of operations share a timestamp, so the cursor has to break ties by id
+    operations = [
+        {"id": str(uuid.uuid4()), "file_path": f"f{n}.py", "operation_type": "create",
+         "operation_timestamp": (start + timedelta(seconds=n // 2)).isoformat()}
+        for n in range(5)
+    ]
+    response = client.post(f"/api/v1/tasks/{task_id}/events", headers=auth_headers, json={"file_operations": operations})
+    assert response.status_code == 200
+
+    pages = _pages(client, auth_headers, task_id, "files", 2)
+    assert [len(page) for page in pages] == [2, 2, 1]
+    seen = [operation["id"] for page in pages for operation in page]
+    expected = sorted(operations, key=lambda operation: (operation["operation_timestamp"], operation["id"]))
+    assert seen == [operation["id"] for operation in expected]
+
+
+def test_malformed_cursor_is_rejected(client, auth_headers, project):
+    task_id = _create_task(client, auth_headers, project)
+    response = client.get(
+        f"/api/v1/tasks/{task_id}", headers=auth_headers, params={"expand": "steps", "steps_cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 400
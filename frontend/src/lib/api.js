@@ -89,6 +89,8 @@ export const projectsAPI = projectAPI;
 export const tasksAPI = {
   getAll: (params) => api.get('/api/v1/tasks', { params }),
   getById: (id) => api.get(`/api/v1/tasks/${id}`),
+  // Task with its steps and file operations in one request (paged: *_limit / *_cursor)
+  getDetail: (id, params) => api.get(`/api/v1/tasks/${id}`, { params: { expand: 'steps,files', ...params } }),
   create: (data) => api.post('/api/v1/tasks', data),
   update: (id, data) => api.put(`/api/v1/tasks/${id}`, data),
   delete: (id) => api.delete(`/api/v1/tasks/${id}`),